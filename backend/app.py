@@ -4,18 +4,129 @@ Extracts engagement data (reactions and comments) from LinkedIn posts
 """
 
 import os
+import random
 import requests
-from flask import Flask, request, jsonify, send_file
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import parse_accept_header
 from flask_cors import CORS
+import codecs
 import csv
 import io
-from datetime import datetime
-from urllib.parse import urlparse, quote
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, quote, unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import bisect
+import functools
+import gzip
+import hashlib
+import itertools
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import NamedTuple
+import json
+import math
+import queue
 import re
+import sqlite3
+import sys
+import threading
+import uuid
+from concurrent.futures import Future
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPoolExecutor
+import time
+import zlib
+from sample_data import SAMPLE_ENDPOINTS, load_sample_items, unique_item
+
+# Optional: cross-worker request coalescing needs POSIX file locks
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Optional: columnar exports (Parquet / Arrow IPC) need pyarrow
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Optional: bulk ROAS scoring runs vectorized with NumPy, row by row without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Optional: faster JSON encoding with orjson, and brotli alongside gzip for response compression
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto")
+JSON_COMPACT = os.environ.get("JSON_COMPACT", "true").lower() == "true"
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson when installed (JSON_ENCODER=stdlib opts out)
+
+    Output matches the default provider apart from whitespace and non-ASCII characters, which
+    orjson writes as UTF-8 instead of escaping.
+    """
+
+    use_orjson = orjson is not None and JSON_ENCODER != 'stdlib'
+    compact = True if JSON_COMPACT else None
+
+    def dumps(self, obj, **kwargs):
+        """Serialize to a str; keyword options are only understood by the stdlib encoder"""
+        if kwargs or not self.use_orjson:
+            if self.compact and 'indent' not in kwargs:
+                kwargs.setdefault('separators', (',', ':'))
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serialize to UTF-8 bytes, skipping the str round trip when orjson is used"""
+        if not self.use_orjson:
+            return (self.dumps(obj, indent=2) if indent else self.dumps(obj, separators=(',', ':'))).encode('utf-8')
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.orjson_default, option=option)
+
+    @staticmethod
+    def orjson_default(o):
+        # orjson encodes plain tuples only; NamedTuples and the rest go through Flask's fallbacks
+        if isinstance(o, tuple):
+            return list(o)
+        return DefaultJSONProvider.default(o)
+
+    def response(self, *args, **kwargs):
+        """Like jsonify: pretty-printed only when compact output is off and the app is in debug mode"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
 
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
+app.json = FastJSONProvider(app)
 CORS(app)
 
+# Upstream pages are logged at DEBUG, retries and startup modes at INFO, failures at WARNING
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+app.logger.setLevel(LOG_LEVEL)
+
 
 @app.route('/')
 def serve_frontend():
@@ -28,6 +139,111 @@ def serve_roas_calculator():
     """Serve the ROAS calculator page"""
     return app.send_static_file('roas-calculator.html')
 
+# Metrics: name -> (type, help). Each gunicorn worker keeps its own registry.
+METRIC_DEFINITIONS = {
+    'extractor_http_requests_total': ('counter', 'API requests by route, method and status'),
+    'extractor_http_request_duration_seconds': ('histogram', 'API request latency by route'),
+    'extractor_stage_duration_seconds': ('histogram', 'Time spent in each pipeline stage'),
+    'extractor_upstream_requests_total': ('counter', 'RapidAPI calls by endpoint and status (quota usage)'),
+    'extractor_upstream_request_duration_seconds': ('histogram', 'RapidAPI call latency by endpoint and status'),
+    'extractor_upstream_retries_total': ('counter', 'RapidAPI calls retried after 429/5xx or connection errors'),
+    'extractor_upstream_quota_remaining': ('gauge', 'Remaining RapidAPI requests reported by the upstream'),
+    'extractor_upstream_quota_limit': ('gauge', 'RapidAPI request quota reported by the upstream'),
+    'extractor_rate_limit_tokens': ('gauge', 'Tokens left in the shared upstream rate limit bucket'),
+    'extractor_rate_limit_wait_seconds': ('histogram', 'Time upstream calls waited for a rate limit token by lane'),
+    'extractor_cache_requests_total': ('counter', 'Response cache lookups by result'),
+    'extractor_coalesced_requests_total': ('counter', 'Post extractions served by another in-flight fetch, by scope'),
+    'extractor_profiles_extracted_total': ('counter', 'Profiles extracted by engagement type'),
+    'extractor_enrichment_profiles_total': ('counter', 'Profiles enriched by source (cache, upstream, shared, failed, skipped)')
+}
+METRIC_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class MetricsRegistry:
+    """Minimal thread-safe Prometheus-style registry of counters, gauges and histograms"""
+
+    def __init__(self, definitions=METRIC_DEFINITIONS, buckets=METRIC_BUCKETS):
+        self.definitions = definitions
+        self.buckets = buckets
+        self._values = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        # Label values are exposed as text anyway; keeping them str lets render sort a mix of 200 and 'error'
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """Increment a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge"""
+        with self._lock:
+            self._values[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Record a histogram observation"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of a block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+        
+        lines = []
+        for name, (metric_type, help_text) in self.definitions.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == 'histogram':
+                for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        lines.append(f"{name}_bucket{self._format_labels(labels, [('le', bound)])} {bucket_count}")
+                    lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {total}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+            else:
+                for (metric, labels), value in sorted(values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{self._format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
 # RapidAPI Configuration
 RAPIDAPI_HOST = "fresh-linkedin-profile-data.p.rapidapi.com"
 RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY", "56b6f4dce1mshc3398ebe2b7bdf7p1a8c18jsn91e4f7fa09ae")
@@ -37,212 +253,2530 @@ HEADERS = {
     "x-rapidapi-key": RAPIDAPI_KEY
 }
 
+RAPIDAPI_BASE_URL = os.environ.get("RAPIDAPI_BASE_URL", f"https://{RAPIDAPI_HOST}")
+RAPIDAPI_POOL_SIZE = int(os.environ.get("RAPIDAPI_POOL_SIZE", 10))
+RAPIDAPI_MAX_RETRIES = int(os.environ.get("RAPIDAPI_MAX_RETRIES", 3))
+RAPIDAPI_CONNECT_TIMEOUT = float(os.environ.get("RAPIDAPI_CONNECT_TIMEOUT", 5))
+RAPIDAPI_READ_TIMEOUT = float(os.environ.get("RAPIDAPI_READ_TIMEOUT", 30))
+
+
+class RapidAPIError(Exception):
+    """Raised when the upstream API returns an error or keeps failing after retries"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RapidAPIClient:
+    """Pooled keep-alive client for the RapidAPI LinkedIn endpoints with retry/backoff"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, base_url=RAPIDAPI_BASE_URL, headers=None, pool_size=RAPIDAPI_POOL_SIZE,
+                 max_retries=RAPIDAPI_MAX_RETRIES, connect_timeout=RAPIDAPI_CONNECT_TIMEOUT,
+                 read_timeout=RAPIDAPI_READ_TIMEOUT, backoff_base=0.5, backoff_max=10.0,
+                 max_retry_after=30.0, limiter=None, recorder=None):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = limiter
+        self.recorder = recorder
+        self.max_retries = max_retries
+        self.timeout = (connect_timeout, read_timeout)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.session = self._open_session(HEADERS if headers is None else headers, pool_size)
+
+    def _open_session(self, headers, pool_size):
+        """Keep-alive requests session; retries are handled in get so Retry-After and jitter apply uniformly"""
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(headers)
+        return session
+
+    def _retry_after_seconds(self, response):
+        """Parse a Retry-After header given either as seconds or as an HTTP date"""
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0.0), self.max_retry_after)
+
+    def _backoff_delay(self, attempt, response=None):
+        """Exponential backoff with full jitter, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = self._retry_after_seconds(response)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def get(self, path, params=None, lane='interactive', budget=None):
+        """GET an endpoint and return its JSON body, retrying 429/5xx and connection errors
+
+        Every attempt, retries included, is charged to budget (a RequestAllowance) when one is given.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        endpoint = path.strip('/')
+        
+        for attempt in range(self.max_retries + 1):
+            response = None
+            if budget is not None:
+                budget.spend()
+            if self.limiter is not None:
+                self.limiter.acquire(lane)
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = RapidAPIError(f"Request to {path} failed: {e}")
+                self._record(endpoint, 'error', started)
+            else:
+                self._record(endpoint, response.status_code, started, response)
+                if response.status_code == 200:
+                    data = response.json()
+                    if self.recorder is not None:
+                        self.recorder.save(endpoint, params, data, time.perf_counter() - started)
+                    return data
+                error = RapidAPIError(
+                    f"{path} returned HTTP {response.status_code}: {response.text[:200]}",
+                    status_code=response.status_code
+                )
+                if response.status_code not in self.RETRY_STATUSES:
+                    raise error
+                if response.status_code == 429 and self.limiter is not None:
+                    # The upstream says we are over the plan limit: make every worker back off
+                    self.limiter.drain()
+            
+            if attempt < self.max_retries:
+                metrics.inc('extractor_upstream_retries_total', endpoint=endpoint)
+                delay = self._backoff_delay(attempt, response)
+                app.logger.info("Retrying %s in %.2fs (%s)", path, delay, error)
+                time.sleep(delay)
+        
+        raise error
+
+    def _record(self, endpoint, status, started, response=None):
+        """Record latency, status and the quota headers RapidAPI returns"""
+        metrics.observe('extractor_upstream_request_duration_seconds', time.perf_counter() - started,
+                        endpoint=endpoint, status=status)
+        metrics.inc('extractor_upstream_requests_total', endpoint=endpoint, status=status)
+        if response is not None:
+            for header, gauge in (('x-ratelimit-requests-remaining', 'extractor_upstream_quota_remaining'),
+                                  ('x-ratelimit-requests-limit', 'extractor_upstream_quota_limit')):
+                value = response.headers.get(header)
+                if value and value.isdigit():
+                    metrics.set(gauge, int(value))
+            if self.limiter is not None:
+                self._record_quota(response.headers.get('x-ratelimit-requests-remaining'),
+                                   response.headers.get('x-ratelimit-requests-limit'))
+
+    def _record_quota(self, remaining, limit):
+        """Share the quota the upstream reported with every worker"""
+        self.limiter.record_quota(remaining, limit)
+
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+
+
+# Upstream fetches run on a bounded pool so reactions and comments load in parallel
+UPSTREAM_MAX_WORKERS = int(os.environ.get("UPSTREAM_MAX_WORKERS", 8))
+upstream_executor = ThreadPoolExecutor(max_workers=UPSTREAM_MAX_WORKERS, thread_name_prefix="upstream")
+
+# Batch extraction limits
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", 4))
+BATCH_MAX_POSTS = int(os.environ.get("BATCH_MAX_POSTS", 500))
+
+# Pagination: how many pages to walk per post and how many to prefetch at once
+RAPIDAPI_MAX_PAGES = int(os.environ.get("RAPIDAPI_MAX_PAGES", 50))
+PAGE_PREFETCH_WORKERS = int(os.environ.get("PAGE_PREFETCH_WORKERS", 4))
+page_executor = ThreadPoolExecutor(max_workers=PAGE_PREFETCH_WORKERS, thread_name_prefix="page")
+
+
+# Local state (job store, persistent indexes) lives under DATA_DIR
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+
+def connect_db(path):
+    """Open a SQLite connection suitable for sharing a file between gunicorn workers"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+@contextmanager
+def db_session(path):
+    """Open a short-lived connection that commits on success and always closes"""
+    conn = connect_db(path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# Shared upstream rate limit: one token bucket for every worker, with interactive calls ahead of batch work
+RAPIDAPI_RATE_LIMIT_RPM = float(os.environ.get("RAPIDAPI_RATE_LIMIT_RPM", 120))
+RAPIDAPI_RATE_LIMIT_BURST = float(os.environ.get("RAPIDAPI_RATE_LIMIT_BURST", 20))
+RAPIDAPI_RATE_LIMIT_BATCH_RESERVE = float(os.environ.get("RAPIDAPI_RATE_LIMIT_BATCH_RESERVE", 0.25))
+RAPIDAPI_RATE_LIMIT_MAX_WAIT = float(os.environ.get("RAPIDAPI_RATE_LIMIT_MAX_WAIT", 60))
+RATE_LIMIT_DB_PATH = os.environ.get("RATE_LIMIT_DB_PATH", os.path.join(DATA_DIR, "ratelimit.db"))
+
+
+class UpstreamRateLimiter:
+    """SQLite-backed token bucket shared across gunicorn workers with interactive and batch lanes
+
+    Batch callers may not spend the last batch_reserve share of the bucket, and hold off entirely
+    while an interactive caller anywhere is waiting for a token.
+    """
+
+    LANES = ('interactive', 'batch')
+
+    def __init__(self, db_path=RATE_LIMIT_DB_PATH, requests_per_minute=RAPIDAPI_RATE_LIMIT_RPM,
+                 burst=RAPIDAPI_RATE_LIMIT_BURST, batch_reserve=RAPIDAPI_RATE_LIMIT_BATCH_RESERVE,
+                 max_wait=RAPIDAPI_RATE_LIMIT_MAX_WAIT):
+        self.db_path = db_path
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, burst)
+        self.reserve = self.capacity * batch_reserve
+        self.max_wait = max_wait
+        if not self.enabled:
+            return
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                "interactive_until REAL NOT NULL DEFAULT 0, quota_remaining INTEGER, quota_limit INTEGER)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO bucket (id, tokens, updated_at) VALUES (1, ?, ?)",
+                (self.capacity, time.time())
+            )
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def try_acquire(self, lane):
+        """Try to take one token; returns 0 on success or the seconds to wait before retrying"""
+        now = time.time()
+        with db_session(self.db_path) as conn:
+            # BEGIN IMMEDIATE takes the write lock so the read-modify-write is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            tokens, updated_at, interactive_until = conn.execute(
+                "SELECT tokens, updated_at, interactive_until FROM bucket WHERE id = 1"
+            ).fetchone()
+            tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * self.rate)
+            floor = 0.0 if lane == 'interactive' else self.reserve
+            
+            if lane != 'interactive' and interactive_until > now:
+                wait_seconds = interactive_until - now
+            elif tokens - 1 >= floor:
+                tokens -= 1
+                wait_seconds = 0.0
+            else:
+                wait_seconds = (floor + 1 - tokens) / self.rate
+                if lane == 'interactive':
+                    interactive_until = max(interactive_until, now + wait_seconds)
+            
+            conn.execute(
+                "UPDATE bucket SET tokens = ?, updated_at = ?, interactive_until = ? WHERE id = 1",
+                (tokens, now, interactive_until)
+            )
+        metrics.set('extractor_rate_limit_tokens', round(tokens, 2))
+        return wait_seconds
+
+    def acquire(self, lane='interactive'):
+        """Block until a token is available for the lane; raises RapidAPIError after max_wait"""
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        lane = lane if lane in self.LANES else 'batch'
+        
+        while True:
+            wait_seconds = self.try_acquire(lane)
+            waited = time.perf_counter() - started
+            if not wait_seconds:
+                metrics.observe('extractor_rate_limit_wait_seconds', waited, lane=lane)
+                return
+            if waited + wait_seconds > self.max_wait:
+                metrics.observe('extractor_rate_limit_wait_seconds', waited, lane=lane)
+                raise RapidAPIError('Upstream rate limit budget exhausted, try again shortly', status_code=429)
+            time.sleep(min(wait_seconds, 1.0))
+
+    def drain(self):
+        """Empty the bucket after the upstream rejected a call with 429"""
+        if not self.enabled:
+            return
+        with db_session(self.db_path) as conn:
+            conn.execute("UPDATE bucket SET tokens = 0, updated_at = ? WHERE id = 1", (time.time(),))
+
+    def record_quota(self, remaining, limit):
+        """Remember the plan quota the upstream last reported, for every worker to see"""
+        if not self.enabled or not (remaining and remaining.isdigit()):
+            return
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "UPDATE bucket SET quota_remaining = ?, quota_limit = ? WHERE id = 1",
+                (int(remaining), int(limit) if limit and limit.isdigit() else None)
+            )
+
+    def stats(self):
+        """Current bucket level and the last upstream-reported quota"""
+        if not self.enabled:
+            return {'enabled': False}
+        with db_session(self.db_path) as conn:
+            tokens, updated_at, quota_remaining, quota_limit = conn.execute(
+                "SELECT tokens, updated_at, quota_remaining, quota_limit FROM bucket WHERE id = 1"
+            ).fetchone()
+        return {
+            'enabled': True,
+            'requests_per_minute': round(self.rate * 60, 2),
+            'burst': self.capacity,
+            'batch_reserve': round(self.reserve, 2),
+            'tokens_available': round(min(self.capacity, tokens + max(0.0, time.time() - updated_at) * self.rate), 2),
+            'upstream_quota_remaining': quota_remaining,
+            'upstream_quota_limit': quota_limit
+        }
+
+
+upstream_limiter = UpstreamRateLimiter()
+
+
+# Record/replay: RAPIDAPI_MODE=record saves every upstream response as a fixture, replay serves
+# fixtures (and synthetic posts of any size) without touching the network or the quota
+RAPIDAPI_MODE = os.environ.get("RAPIDAPI_MODE", "live").lower()
+RAPIDAPI_FIXTURES_DIR = os.environ.get("RAPIDAPI_FIXTURES_DIR", os.path.join(DATA_DIR, "fixtures"))
+RAPIDAPI_REPLAY_SYNTHETIC_SIZE = int(os.environ.get("RAPIDAPI_REPLAY_SYNTHETIC_SIZE", 0))
+RAPIDAPI_REPLAY_PAGE_SIZE = int(os.environ.get("RAPIDAPI_REPLAY_PAGE_SIZE", 100))
+RAPIDAPI_REPLAY_LATENCY_MS = float(os.environ.get("RAPIDAPI_REPLAY_LATENCY_MS", 150))
+RAPIDAPI_REPLAY_JITTER_MS = float(os.environ.get("RAPIDAPI_REPLAY_JITTER_MS", 50))
+RAPIDAPI_REPLAY_LATENCY_SCALE = float(os.environ.get("RAPIDAPI_REPLAY_LATENCY_SCALE", 1.0))
+SYNTHETIC_COMMENTS_RATIO = 0.1
+
+
+class FixtureStore:
+    """Upstream responses saved as gzipped JSON, one file per endpoint, activity ID and page"""
+
+    def __init__(self, root=RAPIDAPI_FIXTURES_DIR):
+        self.root = root
+
+    def path(self, endpoint, params=None):
+        """Fixture file for a request; requests without an activity ID are keyed by a hash of their params"""
+        params = params or {}
+        urn = str(params.get('urn', ''))
+        if urn.isdigit():
+            return os.path.join(self.root, endpoint, urn, f"{int(params.get('page', 1))}.json.gz")
+        key = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, endpoint, f"{key}.json.gz")
+
+    def has_post(self, endpoint, urn):
+        """Whether any page of this post was recorded"""
+        return str(urn).isdigit() and os.path.isdir(os.path.join(self.root, endpoint, str(urn)))
+
+    def save(self, endpoint, params, body, elapsed):
+        """Write a response and how long the upstream took to return it"""
+        path = self.path(endpoint, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            'endpoint': endpoint,
+            'params': params,
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'recorded_at': datetime.now(timezone.utc).isoformat(),
+            'body': body
+        }
+        # Write then rename, so a concurrent replay never reads half a file
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(record, f)
+        os.replace(temp_path, path)
+
+    def load(self, endpoint, params=None):
+        """Return the saved record for a request, or None"""
+        try:
+            with gzip.open(self.path(endpoint, params), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+class ReplayRapidAPIClient(RapidAPIClient):
+    """Serves recorded fixtures, or synthetic posts of any size, in place of the RapidAPI endpoints
+
+    Recorded pages are returned after the latency they took when recorded. Posts with no fixtures
+    are generated when synthetic_size is set (or post_sizes names the post), cycling the items in
+    sample_responses/ with unique profile URLs; profile lookups then get synthetic details too.
+    """
+
+    SYNTHETIC_ENDPOINTS = SAMPLE_ENDPOINTS
+
+    def __init__(self, store, synthetic_size=RAPIDAPI_REPLAY_SYNTHETIC_SIZE, page_size=RAPIDAPI_REPLAY_PAGE_SIZE,
+                 latency_ms=RAPIDAPI_REPLAY_LATENCY_MS, jitter_ms=RAPIDAPI_REPLAY_JITTER_MS,
+                 latency_scale=RAPIDAPI_REPLAY_LATENCY_SCALE):
+        super().__init__(base_url=f"file://{os.path.abspath(store.root)}", pool_size=1)
+        self.store = store
+        self.synthetic_size = synthetic_size
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency_scale = latency_scale
+        self.post_sizes = {}
+        self.templates = None
+
+    def respond(self, path, params=None):
+        """Return the body for a request and the latency to serve it with, in seconds"""
+        endpoint = path.strip('/')
+        params = params or {}
+        
+        record = self.store.load(endpoint, params)
+        if record is not None:
+            return record['body'], record.get('elapsed_ms', self.latency_ms) / 1000 * self.latency_scale
+        
+        urn = str(params.get('urn', ''))
+        latency = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000 * self.latency_scale
+        
+        # Pages past the last recorded one come back empty, as upstream does
+        if self.store.has_post(endpoint, urn):
+            return {'data': [], 'message': 'ok'}, latency
+        
+        if endpoint == 'get-linkedin-profile' and self.synthetic_size and params.get('linkedin_url'):
+            return self.synthetic_profile(params['linkedin_url']), latency
+        
+        size = self.post_sizes.get(urn, self.synthetic_size)
+        if endpoint not in self.SYNTHETIC_ENDPOINTS or not size:
+            raise RapidAPIError(f"No recorded fixture for {endpoint} {params}", status_code=404)
+        return self.synthetic_page(endpoint, size, max(1, int(params.get('page', 1)))), latency
+
+    def synthetic_page(self, endpoint, size, page):
+        """One page of a generated post with size engagements, a tenth of them comments"""
+        if self.templates is None:
+            self.templates = {name: load_sample_items(name) for name in self.SYNTHETIC_ENDPOINTS}
+        
+        comments = int(size * SYNTHETIC_COMMENTS_RATIO)
+        total = comments if endpoint == 'get-post-comments' else size - comments
+        templates = self.templates[endpoint]
+        start = (page - 1) * self.page_size
+        items = [
+            unique_item(templates[index % len(templates)], index)
+            for index in range(start, min(start + self.page_size, total))
+        ]
+        return {'data': items, 'message': 'ok', 'total': total}
+
+    @staticmethod
+    def synthetic_profile(linkedin_url):
+        """Profile details for any URL, stable per URL"""
+        seed = zlib.crc32(linkedin_url.encode('utf-8'))
+        return {
+            'data': {
+                'linkedin_url': linkedin_url,
+                'job_title': ('Growth Lead', 'Founder', 'Account Executive', 'Product Manager')[seed % 4],
+                'company': f"Company {seed % 997}",
+                'company_industry': ('Software', 'Marketing', 'Financial Services')[seed % 3],
+                'location': ('London, United Kingdom', 'Austin, Texas, United States', 'Berlin, Germany')[seed % 3],
+                'follower_count': seed % 20000,
+                'connection_count': min(500, seed % 3000)
+            },
+            'message': 'ok'
+        }
+
+    def get(self, path, params=None, lane='interactive', budget=None):
+        """Return a replayed response after its latency; raises RapidAPIError when there is none"""
+        endpoint = path.strip('/')
+        if budget is not None:
+            budget.spend()
+        started = time.perf_counter()
+        try:
+            body, latency = self.respond(path, params)
+        except RapidAPIError as e:
+            self._record(endpoint, e.status_code, started)
+            raise
+        time.sleep(latency)
+        self._record(endpoint, 200, started)
+        return body
+
+
+def create_rapidapi_client(mode=RAPIDAPI_MODE):
+    """Build the upstream client for RAPIDAPI_MODE: live, record or replay"""
+    if mode == 'replay':
+        app.logger.info("RapidAPI replay mode: serving fixtures from %s", RAPIDAPI_FIXTURES_DIR)
+        return ReplayRapidAPIClient(FixtureStore())
+    if mode == 'record':
+        app.logger.info("RapidAPI record mode: saving responses to %s", RAPIDAPI_FIXTURES_DIR)
+        return RapidAPIClient(limiter=upstream_limiter, recorder=FixtureStore())
+    if mode != 'live':
+        raise ValueError(f"RAPIDAPI_MODE must be live, record or replay, not {mode!r}")
+    return RapidAPIClient(limiter=upstream_limiter)
+
+
+rapidapi_client = create_rapidapi_client()
+
+
+# Response cache for upstream payloads, keyed by activity ID
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", 900))
+CACHE_MAX_MB = float(os.environ.get("CACHE_MAX_MB", 64))
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", "")
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache with optional SQLite persistence shared across workers
+
+    The in-memory LRU is bounded by the JSON size of the cached pages rather than their number,
+    so a post spanning many pages takes its share of max_bytes instead of evicting every other post.
+    """
+
+    def __init__(self, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=int(CACHE_MAX_MB * 1024 * 1024),
+                 db_path=CACHE_DB_PATH):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0 and self.max_bytes > 0
+
+    def _db(self):
+        """Return a SQLite connection for this process, creating the table on first use"""
+        if not self.db_path:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = connect_db(self.db_path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _remember(self, key, expires_at, value, size):
+        """Insert into the in-memory LRU, evicting the least recently used entries past max_bytes"""
+        self._forget(key)
+        self._entries[key] = (expires_at, value, size)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            self.size_bytes -= self._entries.popitem(last=False)[1][2]
+
+    def _forget(self, key):
+        """Drop key from the in-memory LRU"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        if not self.enabled:
+            return None
+        
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc('extractor_cache_requests_total', result='hit')
+                return entry[1]
+            self._forget(key)
+            
+            db = self._db()
+            if db is not None:
+                row = db.execute(
+                    "SELECT expires_at, value FROM response_cache WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row:
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value, len(row[1]))
+                    self.hits += 1
+                    metrics.inc('extractor_cache_requests_total', result='hit')
+                    return value
+            
+            self.misses += 1
+            metrics.inc('extractor_cache_requests_total', result='miss')
+            return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key for the configured TTL"""
+        if not self.enabled:
+            return
+        
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        encoded = json.dumps(value)
+        with self._lock:
+            self._remember(key, expires_at, value, len(encoded))
+            
+            db = self._db()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, encoded)
+                )
+                db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+                db.commit()
+
+    def stats(self):
+        """Return hit/miss counters and sizing for the health endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'size': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'persistent': bool(self.db_path)
+            }
+
+
+response_cache = ResponseCache()
+
+
+# Post URLs are scanned once, left to right: the path kind, then the first post ID form after it
+LINKEDIN_POST_PATH_PATTERN = re.compile(r"linkedin\.com/(posts|pulse|feed/update|embed/feed/update)/")
+LINKEDIN_POST_ID_PATTERN = re.compile(r"""
+    [-:/A]                                              # IDs follow a separator (or the A of %3A)
+    (?:
+        (activity|ugcPost|share)(?:[:-]|%3[aA])(\d+)    # activity-123, urn:li:ugcPost:123, urn%3Ali%3Ashare%3A123
+      | (\d{19,20})(?=-|\?|$)                           # -1234567890123456789- in a slug
+    )
+""", re.VERBOSE)
+
+# The post endpoints take an activity ID as their urn; share and ugcPost URNs name the same
+# post by a different ID, so they are recognised but not extracted
+EXTRACTABLE_POST_TYPES = frozenset({'activity', 'pulse'})
+
+POST_URL_FORMATS = {
+    'posts': 'https://www.linkedin.com/posts/{slug}',
+    'pulse': 'https://www.linkedin.com/pulse/{slug}'
+}
+
+
+class LinkedInPostURL(NamedTuple):
+    """Parsed post URL: post_type is activity, ugcPost, share, pulse or post; post_id may be None
+
+    post_id is the ID as written in the URL; only those of EXTRACTABLE_POST_TYPES are activity IDs.
+    """
+    post_type: str
+    post_id: str
+    canonical_url: str
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_linkedin_post_url(url):
+    """Parse a LinkedIn post URL in a single left-to-right scan; returns None if it is not a post URL"""
+    url = url or ''
+    path_match = LINKEDIN_POST_PATH_PATTERN.search(url)
+    if not path_match:
+        return None
+    
+    kind = path_match.group(1)
+    id_match = LINKEDIN_POST_ID_PATTERN.search(url, path_match.end() - 1)
+    
+    if id_match:
+        urn_type, urn_id, bare_id = id_match.groups()
+        post_id = urn_id or bare_id
+        post_type = urn_type or ('pulse' if kind == 'pulse' else 'activity')
+        return LinkedInPostURL(post_type, post_id, f"https://www.linkedin.com/feed/update/urn:li:{urn_type or 'activity'}:{post_id}/")
+    
+    # No ID: keep the slug so the URL is still recognisable, minus query string and fragment
+    slug = url[path_match.end():].split('?', 1)[0].split('#', 1)[0].strip('/')
+    post_format = POST_URL_FORMATS.get(kind, 'https://www.linkedin.com/feed/update/{slug}')
+    return LinkedInPostURL('pulse' if kind == 'pulse' else 'post', None, post_format.format(slug=slug) + '/')
+
 
 def validate_linkedin_post_url(url):
-    """Validate if the URL is a valid LinkedIn post URL"""
+    """Validate if the URL is a LinkedIn post URL we can extract a post ID from"""
     if not url:
         return False, "URL is required"
     
-    patterns = [
-        r'linkedin\.com/posts/',
-        r'linkedin\.com/feed/update/',
-        r'linkedin\.com/pulse/',
-        r'linkedin\.com/embed/feed/update/'
-    ]
+    parsed = parse_linkedin_post_url(url)
+    if parsed is None:
+        return False, "Invalid LinkedIn post URL. Please provide a valid LinkedIn post or activity URL."
     
-    for pattern in patterns:
-        if re.search(pattern, url):
-            return True, "Valid LinkedIn post URL"
+    if parsed.post_id is None or parsed.post_type not in EXTRACTABLE_POST_TYPES:
+        return False, "Could not find a post ID in this LinkedIn URL. Please use the post's share link or activity URL."
     
-    return False, "Invalid LinkedIn post URL. Please provide a valid LinkedIn post or activity URL."
+    return True, "Valid LinkedIn post URL"
 
 
 def extract_post_id(url):
-    """Extract the post/activity ID from a LinkedIn URL"""
-    # Try different patterns to extract the numeric activity ID
-    patterns = [
-        r'activity[:-](\d+)',                    # activity-1234567890 or activity:1234567890
-        r'ugcPost[:-](\d+)',                     # ugcPost-1234567890
-        r'update/urn:li:activity:(\d+)',         # /update/urn:li:activity:1234567890
-        r'update/urn:li:ugcPost:(\d+)',          # /update/urn:li:ugcPost:1234567890
-        r'-(\d{19,20})-',                        # -1234567890123456789- (19-20 digit IDs in URLs)
-        r'-(\d{19,20})(?:\?|$)',                 # -1234567890123456789? or end of string
-    ]
+    """Extract the activity ID from a LinkedIn URL; None for share and ugcPost URNs"""
+    parsed = parse_linkedin_post_url(url)
+    return parsed.post_id if parsed and parsed.post_type in EXTRACTABLE_POST_TYPES else None
+
+
+def page_items(page_data):
+    """Return the list of engagement items in an upstream page payload"""
+    items = page_data.get('data', []) if isinstance(page_data, dict) else page_data
     
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    if not isinstance(items, list):
+        items = [items] if items else []
     
-    # If no ID found, return None
-    return None
+    return items
 
 
-def get_post_reactions(post_url):
-    """Fetch reactions for a LinkedIn post using RapidAPI"""
+def fetch_post_page(kind, activity_id, page, pagination_token=None, lane='interactive', budget=None):
+    """Fetch one page of reactions or comments, served from the response cache when possible"""
+    cache_key = f"{kind}:{activity_id}:{page}"
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # The API requires just the numeric activity ID with the 'urn' parameter
+    params = {'urn': activity_id, 'page': page}
+    if pagination_token:
+        params['pagination_token'] = pagination_token
+    
+    data = rapidapi_client.get(f'get-post-{kind}', params=params, lane=lane, budget=budget) or {}
+    app.logger.debug("%s page %s of %s: %s, total %s", kind, page, activity_id,
+                     data.get('message', 'no message'), data.get('total', 0))
+    
+    if data.get('message') == 'ok' or data.get('data'):
+        response_cache.set(cache_key, data)
+    
+    return data
+
+
+def iter_prefetched_pages(kind, activity_id, pages, lane='interactive', budget=None):
+    """Yield the items of each page in order while a bounded window of later pages loads concurrently"""
+    pages = iter(pages)
+    window = deque(
+        page_executor.submit(fetch_post_page, kind, activity_id, page, lane=lane, budget=budget)
+        for page in itertools.islice(pages, PAGE_PREFETCH_WORKERS)
+    )
+    
+    try:
+        while window:
+            items = page_items(window.popleft().result())
+            next_page = next(pages, None)
+            if next_page is not None:
+                window.append(page_executor.submit(fetch_post_page, kind, activity_id, next_page, lane=lane, budget=budget))
+            if not items:
+                return
+            yield items
+    finally:
+        for future in window:
+            future.cancel()
+
+
+def iter_sequential_pages(kind, activity_id, pages, lane='interactive', budget=None):
+    """Yield the items of each page one page at a time, stopping at the first empty page"""
+    for page in pages:
+        items = page_items(fetch_post_page(kind, activity_id, page, lane=lane, budget=budget))
+        if not items:
+            return
+        yield items
+
+
+def plan_remaining_pages(first_page, items, max_pages):
+    """How to walk a post's pages after the first, shared by the sync walker and the ASGI one
+
+    Returns (mode, pages): mode is None when there is nothing more to fetch, 'cursor' when each page
+    needs the previous page's pagination_token, 'total' when the reported total bounds the pages so
+    they can be prefetched concurrently, and 'probe' when pages are fetched in order until one is empty.
+    """
+    if not items or max_pages <= 1 or not isinstance(first_page, dict):
+        return None, range(0)
+    
+    if 'pagination_token' in first_page:
+        return 'cursor', range(2, max_pages + 1)
+    
+    try:
+        total = int(first_page.get('total'))
+    except (TypeError, ValueError):
+        return 'probe', range(2, max_pages + 1)
+    
+    if total <= len(items):
+        return None, range(0)
+    return 'total', range(2, min(max_pages, math.ceil(total / len(items))) + 1)
+
+
+def iter_post_pages(kind, activity_id, max_pages=None, prefetch=True, lane='interactive', budget=None):
+    """Yield a post's reaction or comment items a page at a time, walking pages up to max_pages"""
+    max_pages = RAPIDAPI_MAX_PAGES if max_pages is None else max_pages
+    
+    first_page = fetch_post_page(kind, activity_id, 1, lane=lane, budget=budget)
+    items = page_items(first_page)
+    if items:
+        yield items
+    
+    mode, pages = plan_remaining_pages(first_page, items, max_pages)
+    if mode == 'cursor':
+        token = first_page.get('pagination_token')
+        for page in pages:
+            if not token:
+                return
+            page_data = fetch_post_page(kind, activity_id, page, token, lane=lane, budget=budget)
+            items = page_items(page_data)
+            if not items:
+                return
+            yield items
+            token = page_data.get('pagination_token')
+    elif mode == 'total' and prefetch:
+        yield from iter_prefetched_pages(kind, activity_id, pages, lane, budget)
+    elif mode:
+        yield from iter_sequential_pages(kind, activity_id, pages, lane, budget)
+
+
+def get_post_reactions(post_url, prefetch=True, lane='interactive', budget=None):
+    """Yield pages of reactions for a LinkedIn post using RapidAPI (raises RapidAPIError on upstream failure)"""
     # Extract the activity ID from the URL
     activity_id = extract_post_id(post_url)
     
     if not activity_id:
-        print(f"Could not extract activity ID from URL: {post_url}")
+        app.logger.warning("Could not extract activity ID from URL: %s", post_url)
+        return
+    
+    yield from iter_post_pages('reactions', activity_id, prefetch=prefetch, lane=lane, budget=budget)
+
+
+def get_post_comments(post_url, prefetch=True, lane='interactive', budget=None):
+    """Yield pages of comments for a LinkedIn post using RapidAPI (raises RapidAPIError on upstream failure)"""
+    # Extract the activity ID from the URL
+    activity_id = extract_post_id(post_url)
+    
+    if not activity_id:
+        app.logger.warning("Could not extract activity ID from URL: %s", post_url)
+        return
+    
+    yield from iter_post_pages('comments', activity_id, prefetch=prefetch, lane=lane, budget=budget)
+
+
+def iter_engagement_pages(data):
+    """Accept a page payload, a list of items or a lazy iterator of item lists and yield the lists"""
+    if not data:
+        return iter(())
+    if isinstance(data, (dict, list)):
+        return iter((page_items(data),))
+    return iter(data)
+
+
+class ReactionType(str, Enum):
+    """LinkedIn reaction types, interned so each profile shares one instance"""
+    LIKE = 'LIKE'
+    PRAISE = 'PRAISE'
+    EMPATHY = 'EMPATHY'
+    APPRECIATION = 'APPRECIATION'
+    INTEREST = 'INTEREST'
+    ENTERTAINMENT = 'ENTERTAINMENT'
+    CELEBRATE = 'CELEBRATE'
+    LOVE = 'LOVE'
+    INSIGHTFUL = 'INSIGHTFUL'
+    SUPPORT = 'SUPPORT'
+    FUNNY = 'FUNNY'
+    CURIOUS = 'CURIOUS'
+
+
+REACTION_TYPES = {member.value: member for member in ReactionType}
+
+
+def intern_reaction_type(value):
+    """Return the ReactionType member for value, or the interned raw string for unknown types"""
+    if not value:
+        return ReactionType.LIKE
+    return REACTION_TYPES.get(value) or sys.intern(str(value))
+
+
+class Profile(NamedTuple):
+    """Compact engager record; serialized to the API's JSON shape only at the response boundary"""
+    profile_url: str
+    name: str
+    headline: str
+    engagement_type: str
+    reaction_type: object = None
+    comment_text: str = None
+    profile_picture: str = ''
+
+    def to_dict(self):
+        """Return the profile in the JSON shape the API has always returned"""
+        data = {'profile_url': self.profile_url, 'name': self.name, 'headline': self.headline}
+        if self.reaction_type is not None:
+            data['reaction_type'] = str(getattr(self.reaction_type, 'value', self.reaction_type))
+        if self.comment_text is not None:
+            data['comment_text'] = self.comment_text
+        data['engagement_type'] = self.engagement_type
+        data['profile_picture'] = self.profile_picture
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a profile from its to_dict() form"""
+        reaction_type = data.get('reaction_type')
+        return cls(
+            data.get('profile_url', ''),
+            data.get('name', ''),
+            data.get('headline', ''),
+            data.get('engagement_type', ''),
+            intern_reaction_type(reaction_type) if reaction_type is not None else None,
+            data.get('comment_text'),
+            data.get('profile_picture', '')
+        )
+
+
+# Builds a Profile from a complete value tuple without going through the Python-level __new__
+make_profile = tuple.__new__
+
+
+class MergedProfile(NamedTuple):
+    """One person with every engagement they made: the first engagement's fields plus all of them"""
+    profile_url: str
+    name: str
+    headline: str
+    engagement_type: str
+    reaction_type: object = None
+    comment_text: str = None
+    profile_picture: str = ''
+    engagement_types: tuple = ()
+    reaction_types: tuple = ()
+    comments: tuple = ()
+    posts: tuple = ()
+    enrichment: dict = None
+
+    def to_dict(self):
+        """Return the Profile JSON shape, extended with every reaction type and comment"""
+        data = Profile.to_dict(self)
+        data['engagement_types'] = list(self.engagement_types)
+        data['reaction_types'] = [str(getattr(value, 'value', value)) for value in self.reaction_types]
+        data['comments'] = list(self.comments)
+        if self.posts:
+            data['posts'] = list(self.posts)
+        if self.enrichment is not None:
+            data['enrichment'] = self.enrichment
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a merged profile from its to_dict() form"""
+        return cls(
+            *Profile.from_dict(data),
+            tuple(data.get('engagement_types', ())),
+            tuple(intern_reaction_type(value) for value in data.get('reaction_types', ())),
+            tuple(data.get('comments', ())),
+            tuple(data.get('posts', ())),
+            data.get('enrichment')
+        )
+
+
+def profiles_to_dicts(profiles):
+    """Serialize Profile and MergedProfile records (dicts pass through unchanged)"""
+    return [profile if isinstance(profile, dict) else profile.to_dict() for profile in profiles]
+
+
+EMPTY_OBJECT = {}
+
+
+def build_reaction_profile(item):
+    """Build a Profile from one reaction item, or None when it has no profile URL"""
+    # The API returns: { "reactor": { "name", "headline", "linkedin_url", "urn" }, "type": "LIKE/PRAISE/etc" }
+    reactor = item.get('reactor')
+    if not isinstance(reactor, dict):
+        reactor = EMPTY_OBJECT
+    profile_url = (
+        reactor.get('linkedin_url') or reactor.get('profile_url') or
+        item.get('linkedin_url') or item.get('profile_url') or item.get('profileUrl')
+    )
+    if not profile_url:
         return None
+    if not profile_url.startswith('http'):
+        profile_url = 'https://www.linkedin.com/in/' + profile_url
     
-    # The API requires just the numeric activity ID with the 'urn' parameter
-    endpoint = f"https://{RAPIDAPI_HOST}/get-post-reactions?urn={activity_id}"
+    detail = item.get('type') or item.get('reaction_type') or item.get('reactionType')
+    return make_profile(Profile, (
+        profile_url,
+        reactor.get('name') or item.get('name') or item.get('full_name') or '',
+        reactor.get('headline') or item.get('headline') or item.get('title') or '',
+        'reaction',
+        REACTION_TYPES.get(detail) or intern_reaction_type(detail),
+        None,
+        reactor.get('profile_picture') or item.get('profile_picture') or ''
+    ))
+
+
+def build_comment_profile(item):
+    """Build a Profile from one comment item, or None when it has no profile URL"""
+    commenter = item.get('commenter')
+    if not isinstance(commenter, dict):
+        commenter = item.get('author')
+        if not isinstance(commenter, dict):
+            commenter = EMPTY_OBJECT
+    profile_url = (
+        item.get('profile_url') or item.get('linkedin_url') or item.get('profileUrl') or
+        item.get('commenter_profile_url') or commenter.get('profile_url') or commenter.get('linkedin_url')
+    )
+    if not profile_url:
+        return None
+    if not profile_url.startswith('http'):
+        profile_url = 'https://www.linkedin.com/in/' + profile_url
+    
+    return make_profile(Profile, (
+        profile_url,
+        item.get('name') or item.get('commenter_name') or item.get('author_name') or commenter.get('name') or '',
+        item.get('headline') or item.get('commenter_headline') or commenter.get('headline') or '',
+        'comment',
+        None,
+        item.get('comment') or item.get('text') or item.get('comment_text') or '',
+        item.get('profile_picture') or commenter.get('profile_picture') or ''
+    ))
+
+
+# Each item is read on its own, so items of one response may carry different fields. The .get chains
+# stop at the first key of the usual shape; resolving keys once per shape was measured slower than that.
+PROFILE_BUILDERS = {
+    'reaction': build_reaction_profile,
+    'comment': build_comment_profile
+}
+
+
+def iter_profiles(items, engagement_type, totals=None):
+    """Yield a Profile per engagement item, building a page of items at a time
+
+    Parse time and count are recorded as metrics when the items run out, or added to totals
+    ([seconds, count]) for callers that parse one post in several calls and record it once.
+    """
+    build = PROFILE_BUILDERS[engagement_type]
+    perf_counter = time.perf_counter
+    elapsed = 0.0
+    count = 0
     
     try:
-        print(f"Fetching reactions for activity ID: {activity_id}")
-        response = requests.get(endpoint, headers=HEADERS, timeout=30)
-        print(f"Reactions response status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"Reactions response: {data.get('message', 'no message')}, total: {data.get('total', 0)}")
-            if data and data.get('message') == 'ok':
-                return data
-            elif data and data.get('data'):
-                return data
-        else:
-            print(f"Reactions API error: {response.text}")
+        for page in iter_engagement_pages(items):
+            # Only the parsing is timed, once per page; waiting on upstream pages is measured by the client
+            started = perf_counter()
+            profiles = [profile for item in page if isinstance(item, dict) and (profile := build(item)) is not None]
+            elapsed += perf_counter() - started
             
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
+            count += len(profiles)
+            yield from profiles
+    finally:
+        if totals is None:
+            record_extraction(engagement_type, elapsed, count)
+        else:
+            totals[0] += elapsed
+            totals[1] += count
+
+
+def record_extraction(engagement_type, elapsed, count):
+    """Record the parse time and profile count of one post's reactions or comments"""
+    metrics.observe('extractor_stage_duration_seconds', elapsed, stage=f'extract_{engagement_type}')
+    metrics.inc('extractor_profiles_extracted_total', count, engagement_type=engagement_type)
+
+
+def iter_profiles_from_reactions(reactions_data):
+    """Yield a Profile for each reaction as items arrive"""
+    return iter_profiles(reactions_data, 'reaction')
+
+
+def extract_profiles_from_reactions(reactions_data):
+    """Extract unique profile URLs from reactions data"""
+    return list(iter_profiles_from_reactions(reactions_data))
+
+
+def iter_profiles_from_comments(comments_data):
+    """Yield a Profile for each comment as items arrive"""
+    return iter_profiles(comments_data, 'comment')
+
+
+def extract_profiles_from_comments(comments_data):
+    """Extract unique profile URLs from comments data"""
+    return list(iter_profiles_from_comments(comments_data))
+
+
+def collect_profiles(profile_iter):
+    """Drain a profile generator, keeping profiles gathered before any upstream failure"""
+    started = time.perf_counter()
+    profiles = []
+    error = None
     
-    return None
+    try:
+        for profile in profile_iter:
+            profiles.append(profile)
+    except Exception as e:
+        error = e
+    
+    return profiles, error, round((time.perf_counter() - started) * 1000, 1)
 
 
-def get_post_comments(post_url):
-    """Fetch comments for a LinkedIn post using RapidAPI"""
-    # Extract the activity ID from the URL
-    activity_id = extract_post_id(post_url)
+# Profile identities: /in/ slugs (any locale subdomain, query or suffix) and member IDs or URNs
+PROFILE_IDENTITY_PATTERN = re.compile(r"""
+    linkedin\.com/(?:in|pub)/(?P<slug>[^/?#\s]+)
+  | urn:li:(?:member|person|fsd_profile|fs_miniProfile):(?P<urn>[\w-]+)
+""", re.VERBOSE | re.IGNORECASE)
+MEMBER_ID_PATTERN = re.compile(r"AC[\w-]{20,}$")
+
+
+def normalize_profile_url(url):
+    """Normalize a profile URL into the canonical identity used for deduplication"""
+    url = url or ''
+    match = PROFILE_IDENTITY_PATTERN.search(url)
+    if not match:
+        return url.split('?', 1)[0].split('#', 1)[0].lower().rstrip('/')
     
+    member_id = match.group('urn')
+    slug = match.group('slug')
+    if member_id is None and MEMBER_ID_PATTERN.match(slug):
+        member_id = slug
+    
+    # Member IDs are case-sensitive; public slugs are not and may be percent-encoded
+    if member_id is not None:
+        return f"member:{member_id}"
+    return f"in:{unquote(slug).lower()}"
+
+
+class EngagementIndex:
+    """Canonical-identity index merging every engagement of a person into one record, in linear time
+
+    Profiles can be added from any number of posts as they stream in; memory grows with the number
+    of distinct people, not with the number of engagements.
+    """
+
+    def __init__(self):
+        # key -> [first profile, engagement types, reaction types, comments, posts]
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def add(self, profile, post=None):
+        """Merge one engagement into the index; returns its identity key, or None if it has no URL"""
+        key = normalize_profile_url(profile.profile_url)
+        if not key:
+            return None
+        
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [profile, [], [], [], []]
+        
+        engagement_types, reaction_types, comments, posts = entry[1], entry[2], entry[3], entry[4]
+        if isinstance(profile, MergedProfile):
+            # Already merged (e.g. one post's result): fold in everything it carries
+            new_engagement_types, new_reaction_types = profile.engagement_types, profile.reaction_types
+            comments.extend(profile.comments)
+            new_posts = profile.posts if post is None else (*profile.posts, post)
+        else:
+            new_engagement_types = (profile.engagement_type,)
+            new_reaction_types = (profile.reaction_type,) if profile.reaction_type is not None else ()
+            if profile.comment_text is not None:
+                comments.append(profile.comment_text)
+            new_posts = (post,) if post is not None else ()
+        
+        for values, merged in ((new_engagement_types, engagement_types), (new_reaction_types, reaction_types),
+                               (new_posts, posts)):
+            for value in values:
+                if value not in merged:
+                    merged.append(value)
+        return key
+
+    def add_all(self, profiles, post=None):
+        """Merge a stream of engagements; returns the index"""
+        for profile in profiles:
+            self.add(profile, post)
+        return self
+
+    def get(self, key):
+        """Return the merged record for an identity key, or None"""
+        entry = self.entries.get(key)
+        return self._merged(entry) if entry is not None else None
+
+    def items(self):
+        """Yield (identity key, merged record) in first-seen order"""
+        for key, entry in self.entries.items():
+            yield key, self._merged(entry)
+
+    def records(self):
+        """Yield merged records in first-seen order"""
+        for entry in self.entries.values():
+            yield self._merged(entry)
+
+    @staticmethod
+    def _merged(entry):
+        first, engagement_types, reaction_types, comments, posts = entry
+        return MergedProfile(
+            *first[:7], tuple(engagement_types), tuple(reaction_types), tuple(comments), tuple(posts)
+        )
+
+
+def deduplicate_profiles(profiles):
+    """Merge profiles by canonical identity, keeping every reaction type and comment of each person"""
+    return list(EngagementIndex().add_all(profiles).records())
+
+
+# Single-flight: concurrent extractions of the same post share one upstream fetch
+COALESCE_DB_PATH = os.environ.get("COALESCE_DB_PATH", os.path.join(DATA_DIR, "inflight.db"))
+COALESCE_RESULT_TTL_SECONDS = float(os.environ.get("COALESCE_RESULT_TTL_SECONDS", 60))
+COALESCE_MAX_WAIT_SECONDS = float(os.environ.get("COALESCE_MAX_WAIT_SECONDS", 60))
+COALESCE_LOCK_STRIPES = int(os.environ.get("COALESCE_LOCK_STRIPES", 64))
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers for the same key share its result
+
+    Within a worker, followers wait on the leader's future. Across workers, the leader holds the file
+    lock of the key's stripe (one of lock_stripes fixed files, so the lock directory never grows); a
+    worker that finds the lock taken registers as a waiter and polls the lock, and the leader writes
+    its result to SQLite only when someone registered. A waiter whose stripe was held for another
+    key finds no result and leads itself. A waiter that cannot get the lock within max_wait gives up
+    and fetches on its own.
+    """
+
+    def __init__(self, db_path=COALESCE_DB_PATH, result_ttl=COALESCE_RESULT_TTL_SECONDS,
+                 max_wait=COALESCE_MAX_WAIT_SECONDS, lock_stripes=COALESCE_LOCK_STRIPES):
+        self.db_path = db_path
+        self.result_ttl = result_ttl
+        self.max_wait = max_wait
+        self.lock_stripes = max(1, lock_stripes)
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.lock_dir = None
+        if fcntl is not None and db_path:
+            self.lock_dir = os.path.join(os.path.dirname(db_path) or '.', 'locks')
+            os.makedirs(self.lock_dir, exist_ok=True)
+            with db_session(self.db_path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL, finished_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS waiters (key TEXT NOT NULL, waiter TEXT NOT NULL, since REAL NOT NULL, "
+                    "PRIMARY KEY (key, waiter))"
+                )
+
+    def do(self, key, fn, dumps=json.dumps, loads=json.loads):
+        """Return fn(), or the result of an identical call already in flight"""
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+        
+        if not leader:
+            metrics.inc('extractor_coalesced_requests_total', scope='worker')
+            return future.result()
+        
+        try:
+            result = self._run_across_workers(key, fn, dumps, loads)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+    def _run_across_workers(self, key, fn, dumps, loads):
+        if self.lock_dir is None:
+            return fn()
+        
+        stripe = zlib.crc32(key.encode('utf-8')) % self.lock_stripes
+        with open(os.path.join(self.lock_dir, f"inflight-{stripe}.lock"), 'a') as lock_file:
+            if self._try_lock(lock_file):
+                return self._lead(lock_file, key, fn, dumps)
+            
+            # Another worker is fetching: wait for it, but never past max_wait
+            waiter = uuid.uuid4().hex
+            waiting_since = time.time()
+            with db_session(self.db_path) as conn:
+                conn.execute("INSERT INTO waiters (key, waiter, since) VALUES (?, ?, ?)", (key, waiter, waiting_since))
+            try:
+                delay = 0.05
+                while not self._try_lock(lock_file):
+                    if time.time() - waiting_since > self.max_wait:
+                        app.logger.warning("Gave up waiting for the in-flight fetch of %s; fetching independently", key)
+                        return fn()
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.5)
+                
+                with db_session(self.db_path) as conn:
+                    conn.execute("DELETE FROM waiters WHERE key = ? AND waiter = ?", (key, waiter))
+                    row = conn.execute(
+                        "SELECT result FROM results WHERE key = ? AND finished_at >= ?", (key, waiting_since)
+                    ).fetchone()
+                if row:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    metrics.inc('extractor_coalesced_requests_total', scope='process')
+                    return loads(row[0])
+                # The leader failed or finished before we registered: fetch as the new leader
+                return self._lead(lock_file, key, fn, dumps)
+            finally:
+                with db_session(self.db_path) as conn:
+                    conn.execute("DELETE FROM waiters WHERE key = ? AND waiter = ?", (key, waiter))
+
+    @staticmethod
+    def _try_lock(lock_file):
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def _lead(self, lock_file, key, fn, dumps):
+        """Run fn() holding the key's lock, handing the result over only if workers are waiting"""
+        try:
+            result = fn()
+            # Nobody waiting is the common case: one indexed read, no serialization, no write
+            with db_session(self.db_path) as conn:
+                waiting = conn.execute(
+                    "SELECT 1 FROM waiters WHERE key = ? AND since >= ? LIMIT 1",
+                    (key, time.time() - self.max_wait)
+                ).fetchone()
+                if waiting:
+                    now = time.time()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO results (key, result, finished_at) VALUES (?, ?, ?)",
+                        (key, dumps(result), now)
+                    )
+                    conn.execute("DELETE FROM results WHERE finished_at < ?", (now - self.result_ttl,))
+                    # Rows left by waiters that crashed
+                    conn.execute("DELETE FROM waiters WHERE since < ?", (now - self.max_wait,))
+            return result
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+single_flight = SingleFlight()
+
+
+def dump_engagement_result(result):
+    """Serialize a fetch_post_engagement result for another worker"""
+    return json.dumps({**result, 'profiles': profiles_to_dicts(result['profiles'])})
+
+
+def load_engagement_result(data):
+    """Rebuild a fetch_post_engagement result handed over by another worker"""
+    result = json.loads(data)
+    result['profiles'] = [MergedProfile.from_dict(profile) for profile in result['profiles']]
+    return result
+
+
+def fetch_post_engagement(post_url, lane='interactive'):
+    """Fetch reactions and comments for a post, sharing the fetch with concurrent requests for it
+
+    The returned result may be shared between callers and must not be mutated.
+    """
+    activity_id = extract_post_id(post_url)
     if not activity_id:
-        print(f"Could not extract activity ID from URL: {post_url}")
-        return None
+        return fetch_post_engagement_upstream(post_url, lane)
+    return single_flight.do(
+        f"engagement:{activity_id}",
+        lambda: fetch_post_engagement_upstream(post_url, lane),
+        dumps=dump_engagement_result,
+        loads=load_engagement_result
+    )
+
+
+def fetch_post_engagement_upstream(post_url, lane='interactive'):
+    """Fetch reactions and comments concurrently and return deduplicated profiles with counts"""
+    errors = []
     
-    # The API requires just the numeric activity ID with the 'urn' parameter
-    endpoint = f"https://{RAPIDAPI_HOST}/get-post-comments?urn={activity_id}"
+    # Each stream walks its pages and extracts profiles on its own worker
+    started = time.perf_counter()
+    reactions_future = upstream_executor.submit(
+        collect_profiles, iter_profiles_from_reactions(get_post_reactions(post_url, lane=lane))
+    )
+    comments_future = upstream_executor.submit(
+        collect_profiles, iter_profiles_from_comments(get_post_comments(post_url, lane=lane))
+    )
+    reaction_profiles, reactions_error, reactions_ms = reactions_future.result()
+    comment_profiles, comments_error, comments_ms = comments_future.result()
+    timings = {
+        'reactions_ms': reactions_ms,
+        'comments_ms': comments_ms,
+        'total_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+    
+    if reactions_error:
+        errors.append(f"Error fetching reactions: {str(reactions_error)}")
+    if comments_error:
+        errors.append(f"Error fetching comments: {str(comments_error)}")
+    
+    with metrics.timer('extractor_stage_duration_seconds', stage='dedup'):
+        unique_profiles = deduplicate_profiles(itertools.chain(reaction_profiles, comment_profiles))
+    
+    result = {
+        'profiles': unique_profiles,
+        'reaction_count': len(reaction_profiles),
+        'comment_count': len(comment_profiles),
+        'errors': errors,
+        'timings': timings
+    }
+    index_audience(post_url, result)
+    return result
+
+
+def iter_batch_results(post_urls, max_concurrency, lane='batch'):
+    """Yield (post_url, future) as posts finish, keeping at most max_concurrency posts in flight"""
+    urls = iter(post_urls)
+    pending = {}
+    
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="batch") as executor:
+        for post_url in itertools.islice(urls, max_concurrency):
+            pending[executor.submit(fetch_post_engagement, post_url, lane)] = post_url
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                post_url = pending.pop(future)
+                next_url = next(urls, None)
+                if next_url is not None:
+                    pending[executor.submit(fetch_post_engagement, next_url, lane)] = next_url
+                yield post_url, future
+
+
+# Streaming extraction: profiles are pushed to the client as each upstream page is parsed
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get("STREAM_HEARTBEAT_SECONDS", 5))
+
+
+def iter_extract_events(post_url, lane='interactive'):
+    """Yield (event, payload) pairs for a post: profiles and progress as pages arrive, then a summary
+
+    Each profiles event carries the merged record of every person it adds or updates, with the
+    identity key to upsert it by; the summary has the counts /api/extract returns.
+    """
+    events = queue.Queue()
+    stop = threading.Event()
+    timings = {}
+    
+    def produce(engagement_type, profiles):
+        started = time.perf_counter()
+        try:
+            for profile in profiles:
+                if stop.is_set():
+                    break
+                events.put((engagement_type, profile))
+        except Exception as e:
+            events.put((engagement_type, e))
+        finally:
+            profiles.close()
+            timings[f'{engagement_type}s_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            events.put((engagement_type, None))
+    
+    started = time.perf_counter()
+    upstream_executor.submit(produce, 'reaction', iter_profiles_from_reactions(get_post_reactions(post_url, lane=lane)))
+    upstream_executor.submit(produce, 'comment', iter_profiles_from_comments(get_post_comments(post_url, lane=lane)))
+    
+    index = EngagementIndex()
+    counts = {'reaction': 0, 'comment': 0}
+    errors = []
+    running = 2
+    
+    def progress():
+        return {
+            'reaction_count': counts['reaction'],
+            'comment_count': counts['comment'],
+            'unique_count': len(index),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
     
     try:
-        print(f"Fetching comments for activity ID: {activity_id}")
-        response = requests.get(endpoint, headers=HEADERS, timeout=30)
-        print(f"Comments response status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"Comments response: {data.get('message', 'no message')}")
-            if data and data.get('message') == 'ok':
-                return data
-            elif data and data.get('data'):
-                return data
-        else:
-            print(f"Comments API error: {response.text}")
+        while running:
+            try:
+                batch = [events.get(timeout=STREAM_HEARTBEAT_SECONDS)]
+            except queue.Empty:
+                yield 'progress', progress()
+                continue
+            
+            # Take everything already parsed, so a page arriving at once goes out as one event
+            while True:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+            
+            changed = {}
+            for engagement_type, item in batch:
+                if item is None:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    errors.append(f"Error fetching {engagement_type}s: {str(item)}")
+                else:
+                    counts[engagement_type] += 1
+                    key = index.add(item)
+                    if key is not None:
+                        changed[key] = None
             
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
+            if changed:
+                if 'first_profile_ms' not in timings:
+                    timings['first_profile_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                yield 'profiles', {'profiles': [dict(index.get(key).to_dict(), key=key) for key in changed]}
+            yield 'progress', progress()
+    finally:
+        # Also reached when the client disconnects: stop paging upstream
+        stop.set()
     
-    return None
+    timings['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    result = {
+        'profiles': list(index.records()),
+        'reaction_count': counts['reaction'],
+        'comment_count': counts['comment'],
+        'errors': errors,
+        'timings': timings
+    }
+    index_audience(post_url, result)
+    
+    if not result['profiles']:
+        # Reuse /api/extract's empty and demo-mode responses, sending any demo profiles first
+        summary = extract_payload(post_url, result)
+        profiles = summary['data'].pop('profiles')
+        if profiles:
+            yield 'profiles', {'profiles': profiles}
+        yield 'summary', summary
+        return
+    
+    yield 'summary', {
+        'success': True,
+        'data': {
+            'total_count': len(result['profiles']),
+            'reaction_count': result['reaction_count'],
+            'comment_count': result['comment_count'],
+            'post_url': post_url
+        },
+        'errors': errors if errors else None,
+        'timings': timings
+    }
+
+
+# Background jobs: state in SQLite so any worker can report status
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", os.path.join(DATA_DIR, "jobs.db"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+
+
+class JobStore:
+    """SQLite-backed store for extraction job state, progress and results"""
+
+    def __init__(self, db_path=JOBS_DB_PATH):
+        self.db_path = db_path
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, post_urls TEXT NOT NULL, "
+                "total INTEGER NOT NULL, completed INTEGER NOT NULL DEFAULT 0, "
+                "created_at TEXT NOT NULL, updated_at TEXT NOT NULL, error TEXT, result TEXT)"
+            )
+
+    def create(self, post_urls):
+        """Register a queued job and return its ID"""
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, post_urls, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, 'queued', json.dumps(post_urls), len(post_urls), now, now)
+            )
+        return job_id
+
+    def update(self, job_id, **fields):
+        """Update status/progress columns; result is stored as JSON"""
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+        fields['updated_at'] = datetime.now().isoformat()
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with db_session(self.db_path) as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id, include_result=False):
+        """Return the job as a dict, or None if it does not exist"""
+        with db_session(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT id, status, post_urls, total, completed, created_at, updated_at, error, result "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        
+        if not row:
+            return None
+        
+        job = {
+            'job_id': row[0],
+            'status': row[1],
+            'post_urls': json.loads(row[2]),
+            'progress': {
+                'completed': row[4],
+                'total': row[3],
+                'percent': round(row[4] / row[3] * 100, 1) if row[3] else 100.0
+            },
+            'created_at': row[5],
+            'updated_at': row[6],
+            'error': row[7]
+        }
+        if include_result:
+            job['result'] = json.loads(row[8]) if row[8] else None
+        return job
+
+
+job_store = JobStore()
+job_scheduler = None
+job_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler():
+    """Start the background worker pool on first use, once per gunicorn worker"""
+    global job_scheduler
+    with job_scheduler_lock:
+        if job_scheduler is None:
+            job_scheduler = BackgroundScheduler(
+                executors={'default': SchedulerThreadPoolExecutor(JOB_WORKERS)},
+                job_defaults={'misfire_grace_time': None}
+            )
+            job_scheduler.start()
+    return job_scheduler
+
+
+def run_extraction_job(job_id, enrich=False):
+    """Extract every post in a job, recording progress after each post finishes"""
+    job = job_store.get(job_id)
+    if not job:
+        return
+    
+    job_store.update(job_id, status='running')
+    post_urls = job['post_urls']
+    index = EngagementIndex()
+    posts = []
+    reaction_count = 0
+    comment_count = 0
+    
+    try:
+        for completed, (post_url, future) in enumerate(iter_batch_results(post_urls, BATCH_MAX_CONCURRENCY), start=1):
+            try:
+                result = future.result()
+            except Exception as e:
+                posts.append({'post_url': post_url, 'success': False, 'errors': [str(e)]})
+            else:
+                reaction_count += result['reaction_count']
+                comment_count += result['comment_count']
+                # Merge across posts so someone who engaged with several posts is one record
+                index.add_all(result['profiles'], post_url)
+                posts.append({
+                    'post_url': post_url,
+                    'success': True,
+                    'total_count': len(result['profiles']),
+                    'errors': result['errors'] if result['errors'] else None
+                })
+            job_store.update(job_id, completed=completed)
+        
+        # Enriched after merging, so a person on several posts is looked up once
+        records = list(index.records())
+        enrichment = None
+        if enrich and records:
+            with metrics.timer('extractor_stage_duration_seconds', stage='enrich'):
+                records, enrichment = profile_enricher.enrich(records, lane='batch')
+        
+        profiles = profiles_to_dicts(records)
+        job_store.update(job_id, status='completed', result={
+            'profiles': profiles,
+            'total_count': len(profiles),
+            'reaction_count': reaction_count,
+            'comment_count': comment_count,
+            'posts': posts,
+            'enrichment': enrichment
+        })
+    except Exception as e:
+        job_store.update(job_id, status='failed', error=str(e))
+
+
+# Incremental re-extraction: every engagement seen per post, keyed by activity ID
+ENGAGEMENT_DB_PATH = os.environ.get("ENGAGEMENT_DB_PATH", os.path.join(DATA_DIR, "engagement.db"))
+INCREMENTAL_STOP_AFTER = int(os.environ.get("INCREMENTAL_STOP_AFTER", 20))
+
+
+def engagement_key(profile):
+    """Identity of one engagement: the person for reactions, the person and text for comments"""
+    key = normalize_profile_url(profile.profile_url)
+    if profile.engagement_type == 'comment':
+        return f"{key}#{zlib.crc32((profile.comment_text or '').encode('utf-8')):08x}"
+    return key
+
+
+class EngagementStore:
+    """SQLite store of every engagement seen on a post, used to fetch only the delta on re-polls"""
+
+    def __init__(self, db_path=ENGAGEMENT_DB_PATH):
+        self.db_path = db_path
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "activity_id TEXT PRIMARY KEY, post_url TEXT NOT NULL, "
+                "last_extracted_at TEXT NOT NULL, run_count INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS engagements ("
+                "activity_id TEXT NOT NULL, engagement_type TEXT NOT NULL, engagement_key TEXT NOT NULL, "
+                "profile TEXT NOT NULL, first_seen_at TEXT NOT NULL, "
+                "PRIMARY KEY (activity_id, engagement_type, engagement_key))"
+            )
+
+    def last_run(self, activity_id):
+        """Return when the post was last extracted, or None"""
+        with db_session(self.db_path) as conn:
+            row = conn.execute("SELECT last_extracted_at FROM posts WHERE activity_id = ?", (activity_id,)).fetchone()
+        return row[0] if row else None
+
+    def known_keys(self, activity_id, engagement_type):
+        """Return the engagement keys already stored for a post"""
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT engagement_key FROM engagements WHERE activity_id = ? AND engagement_type = ?",
+                (activity_id, engagement_type)
+            )
+            return {row[0] for row in rows}
+
+    def merge(self, activity_id, post_url, profiles):
+        """Insert new engagements and record the run; returns the run timestamp"""
+        now = datetime.now().isoformat()
+        with db_session(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO engagements "
+                "(activity_id, engagement_type, engagement_key, profile, first_seen_at) VALUES (?, ?, ?, ?, ?)",
+                ((activity_id, profile.engagement_type, engagement_key(profile), json.dumps(profile.to_dict()), now)
+                 for profile in profiles)
+            )
+            conn.execute(
+                "INSERT INTO posts (activity_id, post_url, last_extracted_at, run_count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(activity_id) DO UPDATE SET post_url = excluded.post_url, "
+                "last_extracted_at = excluded.last_extracted_at, run_count = run_count + 1",
+                (activity_id, post_url, now)
+            )
+        return now
+
+    def iter_engagements(self, activity_id):
+        """Yield (profile dict, first_seen_at) for every stored engagement, reactions first"""
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT profile, first_seen_at FROM engagements WHERE activity_id = ? "
+                "ORDER BY engagement_type = 'comment', first_seen_at, rowid",
+                (activity_id,)
+            )
+            for profile, first_seen_at in rows:
+                yield json.loads(profile), first_seen_at
+
+
+engagement_store = EngagementStore()
+
+
+def iter_until_known(profiles, known, stop_after=None):
+    """Yield unseen profiles, stopping once stop_after already-stored engagements appear in a row"""
+    stop_after = INCREMENTAL_STOP_AFTER if stop_after is None else stop_after
+    streak = 0
+    
+    for profile in profiles:
+        if engagement_key(profile) in known:
+            # The upstream lists newest first, so a run of known engagers means we have caught up
+            streak += 1
+            if streak >= stop_after:
+                return
+            continue
+        streak = 0
+        yield profile
+
+
+def fetch_post_engagement_incremental(post_url, lane='interactive', budget=None):
+    """Fetch only engagement newer than the last run, merge it into the store and return the full set
+
+    With a budget (a RequestAllowance), paging stops once it is spent and the run reports the rest as an error.
+    """
+    activity_id = extract_post_id(post_url)
+    if not activity_id:
+        return fetch_post_engagement(post_url, lane)
+    
+    previous_run = engagement_store.last_run(activity_id)
+    known_reactions = engagement_store.known_keys(activity_id, 'reaction')
+    known_comments = engagement_store.known_keys(activity_id, 'comment')
+    errors = []
+    
+    # Pages are walked sequentially so paging stops as soon as we reach stored engagers
+    started = time.perf_counter()
+    reactions_future = upstream_executor.submit(collect_profiles, iter_until_known(
+        iter_profiles_from_reactions(get_post_reactions(post_url, prefetch=False, lane=lane, budget=budget)), known_reactions
+    ))
+    comments_future = upstream_executor.submit(collect_profiles, iter_until_known(
+        iter_profiles_from_comments(get_post_comments(post_url, prefetch=False, lane=lane, budget=budget)), known_comments
+    ))
+    new_reactions, reactions_error, reactions_ms = reactions_future.result()
+    new_comments, comments_error, comments_ms = comments_future.result()
+    timings = {
+        'reactions_ms': reactions_ms,
+        'comments_ms': comments_ms,
+        'total_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+    
+    if reactions_error:
+        errors.append(f"Error fetching reactions: {str(reactions_error)}")
+    if comments_error:
+        errors.append(f"Error fetching comments: {str(comments_error)}")
+    
+    run_at = engagement_store.merge(activity_id, post_url, itertools.chain(new_reactions, new_comments))
+    
+    # Rebuild the deduplicated set from the store, flagging engagers first seen in this run
+    with metrics.timer('extractor_stage_duration_seconds', stage='dedup'):
+        index = EngagementIndex()
+        new_keys = {}
+        reaction_count = 0
+        comment_count = 0
+        for profile, first_seen_at in engagement_store.iter_engagements(activity_id):
+            if profile['engagement_type'] == 'reaction':
+                reaction_count += 1
+            else:
+                comment_count += 1
+            key = index.add(Profile.from_dict(profile))
+            if key is not None:
+                # A person is new only if none of their engagements were stored before this run
+                new_keys[key] = new_keys.get(key, True) and first_seen_at == run_at
+        profiles = [dict(profile.to_dict(), is_new=new_keys[key]) for key, profile in index.items()]
+    
+    result = {
+        'profiles': profiles,
+        'reaction_count': reaction_count,
+        'comment_count': comment_count,
+        'new_count': sum(1 for profile in profiles if profile['is_new']),
+        'new_engagement_count': len(new_reactions) + len(new_comments),
+        'previous_run_at': previous_run,
+        'errors': errors,
+        'timings': timings
+    }
+    index_audience(post_url, result)
+    return result
+
+
+# Audience index: who engaged with which posts, kept across extractions for overlap queries
+AUDIENCE_DB_PATH = os.environ.get("AUDIENCE_DB_PATH", os.path.join(DATA_DIR, "audience.db"))
+AUDIENCE_INDEX_ENABLED = os.environ.get("AUDIENCE_INDEX_ENABLED", "true").lower() == "true"
+AUDIENCE_QUERY_LIMIT = int(os.environ.get("AUDIENCE_QUERY_LIMIT", 1000))
+
+
+class AudienceIndex:
+    """SQLite index from person to the posts they engaged with, keyed by canonical profile identity"""
+
+    def __init__(self, db_path=AUDIENCE_DB_PATH):
+        self.db_path = db_path
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS audience_posts ("
+                "activity_id TEXT PRIMARY KEY, post_url TEXT NOT NULL, "
+                "indexed_at TEXT NOT NULL, engager_count INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS people ("
+                "identity TEXT PRIMARY KEY, profile_url TEXT NOT NULL, name TEXT, headline TEXT, "
+                "profile_picture TEXT, updated_at TEXT NOT NULL) WITHOUT ROWID"
+            )
+            # Post -> people for per-post scans and anti-joins; person -> posts for repeat engagers
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS post_engagers ("
+                "activity_id TEXT NOT NULL, identity TEXT NOT NULL, engagement_types TEXT NOT NULL, "
+                "PRIMARY KEY (activity_id, identity)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS post_engagers_identity ON post_engagers (identity, activity_id)")
+
+    def record(self, activity_id, post_url, profiles, replace=True):
+        """Index the engagers of a post; replace drops engagers missing from a complete result"""
+        now = datetime.now().isoformat()
+        people = {}
+        for profile in profiles:
+            if not isinstance(profile, dict):
+                profile = profile.to_dict()
+            if profile.get('profile_url'):
+                people[normalize_profile_url(profile['profile_url'])] = profile
+        
+        with db_session(self.db_path) as conn:
+            if replace:
+                conn.execute("DELETE FROM post_engagers WHERE activity_id = ?", (activity_id,))
+            conn.executemany(
+                "INSERT INTO people (identity, profile_url, name, headline, profile_picture, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(identity) DO UPDATE SET "
+                "profile_url = excluded.profile_url, name = excluded.name, headline = excluded.headline, "
+                "profile_picture = excluded.profile_picture, updated_at = excluded.updated_at",
+                ((identity, profile['profile_url'], profile.get('name'), profile.get('headline'),
+                  profile.get('profile_picture'), now) for identity, profile in people.items())
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO post_engagers (activity_id, identity, engagement_types) VALUES (?, ?, ?)",
+                ((activity_id, identity,
+                  ','.join(profile.get('engagement_types') or [profile.get('engagement_type') or '']))
+                 for identity, profile in people.items())
+            )
+            conn.execute(
+                "INSERT INTO audience_posts (activity_id, post_url, indexed_at, engager_count) "
+                "VALUES (?, ?, ?, (SELECT COUNT(*) FROM post_engagers WHERE activity_id = ?)) "
+                "ON CONFLICT(activity_id) DO UPDATE SET post_url = excluded.post_url, "
+                "indexed_at = excluded.indexed_at, engager_count = excluded.engager_count",
+                (activity_id, post_url, now, activity_id)
+            )
+
+    def posts(self, activity_ids=None):
+        """Return indexed posts, all of them or those among activity_ids, keyed by activity ID"""
+        query = "SELECT activity_id, post_url, indexed_at, engager_count FROM audience_posts"
+        params = ()
+        if activity_ids is not None:
+            query += " WHERE activity_id IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(list(activity_ids)),)
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(query + " ORDER BY indexed_at DESC", params).fetchall()
+        return {
+            row[0]: {'post_url': row[1], 'indexed_at': row[2], 'engager_count': row[3]}
+            for row in rows
+        }
+
+    def top_engagers(self, activity_ids=None, min_posts=2, limit=AUDIENCE_QUERY_LIMIT):
+        """Return people who engaged with the most posts, among activity_ids or across every post"""
+        query = (
+            "SELECT e.identity, COUNT(*) AS post_count, group_concat(e.activity_id) "
+            "FROM post_engagers e"
+        )
+        params = []
+        if activity_ids is not None:
+            query += " WHERE e.activity_id IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(activity_ids)))
+        query += " GROUP BY e.identity HAVING post_count >= ? ORDER BY post_count DESC, e.identity LIMIT ?"
+        params.extend([min_posts, limit])
+        
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(query, params).fetchall()
+            people = self._people(conn, [row[0] for row in rows])
+        return [
+            dict(people[identity], post_count=post_count, activity_ids=activity_ids_csv.split(','))
+            for identity, post_count, activity_ids_csv in rows
+        ]
+
+    def overlap(self, activity_id_a, activity_id_b, limit=AUDIENCE_QUERY_LIMIT):
+        """Return audience sizes of two posts, how many engaged with both, and who they are"""
+        with db_session(self.db_path) as conn:
+            count_a, count_b = (
+                conn.execute("SELECT COUNT(*) FROM post_engagers WHERE activity_id = ?", (activity_id,)).fetchone()[0]
+                for activity_id in (activity_id_a, activity_id_b)
+            )
+            both = conn.execute(
+                "SELECT COUNT(*) FROM post_engagers a JOIN post_engagers b "
+                "ON b.activity_id = ? AND b.identity = a.identity WHERE a.activity_id = ?",
+                (activity_id_b, activity_id_a)
+            ).fetchone()[0]
+            identities = [row[0] for row in conn.execute(
+                "SELECT a.identity FROM post_engagers a JOIN post_engagers b "
+                "ON b.activity_id = ? AND b.identity = a.identity WHERE a.activity_id = ? "
+                "ORDER BY a.identity LIMIT ?",
+                (activity_id_b, activity_id_a, limit)
+            )]
+            people = self._people(conn, identities)
+        
+        union = count_a + count_b - both
+        return {
+            'post_a_count': count_a,
+            'post_b_count': count_b,
+            'overlap_count': both,
+            'only_a_count': count_a - both,
+            'only_b_count': count_b - both,
+            'jaccard': round(both / union, 4) if union else 0.0,
+            'profiles': [people[identity] for identity in identities]
+        }
+
+    def difference(self, activity_id_a, activity_id_b, limit=AUDIENCE_QUERY_LIMIT):
+        """Return the engagers of post A who did not engage with post B, with their total count"""
+        query = (
+            "FROM post_engagers a WHERE a.activity_id = ? AND NOT EXISTS ("
+            "SELECT 1 FROM post_engagers b WHERE b.activity_id = ? AND b.identity = a.identity)"
+        )
+        with db_session(self.db_path) as conn:
+            total = conn.execute("SELECT COUNT(*) " + query, (activity_id_a, activity_id_b)).fetchone()[0]
+            rows = conn.execute(
+                "SELECT a.identity, a.engagement_types " + query + " ORDER BY a.identity LIMIT ?",
+                (activity_id_a, activity_id_b, limit)
+            ).fetchall()
+            people = self._people(conn, [row[0] for row in rows])
+        return total, [
+            dict(people[identity], engagement_types=engagement_types.split(','))
+            for identity, engagement_types in rows
+        ]
+
+    @staticmethod
+    def _people(conn, identities):
+        """Look up the stored profile of each identity"""
+        rows = conn.execute(
+            "SELECT identity, profile_url, name, headline, profile_picture FROM people "
+            "WHERE identity IN (SELECT value FROM json_each(?))",
+            (json.dumps(identities),)
+        )
+        return {
+            row[0]: {'profile_url': row[1], 'name': row[2], 'headline': row[3], 'profile_picture': row[4]}
+            for row in rows
+        }
+
+
+audience_index = AudienceIndex()
+# One writer keeps indexing off the request path and out of SQLite lock contention
+audience_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audience")
+
+
+def index_audience(post_url, result):
+    """Queue an extraction result for the audience index; partial results only add engagers"""
+    activity_id = extract_post_id(post_url)
+    if not AUDIENCE_INDEX_ENABLED or not activity_id:
+        return
+    
+    def record():
+        try:
+            audience_index.record(activity_id, post_url, result['profiles'], replace=not result['errors'])
+        except Exception as e:
+            app.logger.warning("Audience index update failed for %s: %s", post_url, e)
+    
+    audience_executor.submit(record)
+
+
+# Profile enrichment: details from the profile endpoint, looked up once per person and cached for days
+ENRICHMENT_DB_PATH = os.environ.get("ENRICHMENT_DB_PATH", os.path.join(DATA_DIR, "enrichment.db"))
+ENRICHMENT_TTL_DAYS = float(os.environ.get("ENRICHMENT_TTL_DAYS", 30))
+ENRICHMENT_MAX_WORKERS = int(os.environ.get("ENRICHMENT_MAX_WORKERS", 4))
+ENRICHMENT_BATCH_SIZE = int(os.environ.get("ENRICHMENT_BATCH_SIZE", 50))
+ENRICHMENT_MAX_PROFILES = int(os.environ.get("ENRICHMENT_MAX_PROFILES", 1000))
+ENRICHMENT_INLINE_MAX_LOOKUPS = int(os.environ.get("ENRICHMENT_INLINE_MAX_LOOKUPS", 50))
+ENRICHMENT_ENDPOINT = 'get-linkedin-profile'
+ENRICHMENT_FIELDS = (
+    'job_title', 'company', 'company_domain', 'company_industry', 'company_linkedin_url',
+    'location', 'city', 'country', 'follower_count', 'connection_count'
+)
+
+
+class EnrichmentCache:
+    """SQLite cache of profile details keyed by canonical profile identity
+
+    Profiles the upstream does not know are cached too (as NULL details), so they are not retried
+    until the entry expires.
+    """
+
+    def __init__(self, db_path=ENRICHMENT_DB_PATH, ttl_days=ENRICHMENT_TTL_DAYS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 86400
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS enriched_profiles ("
+                "identity TEXT PRIMARY KEY, profile_url TEXT NOT NULL, details TEXT, "
+                "fetched_at REAL NOT NULL) WITHOUT ROWID"
+            )
+
+    def get_many(self, identities):
+        """Return {identity: details or None} for every identity with an unexpired entry"""
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT identity, details FROM enriched_profiles "
+                "WHERE identity IN (SELECT value FROM json_each(?)) AND fetched_at >= ?",
+                (json.dumps(list(identities)), time.time() - self.ttl_seconds)
+            ).fetchall()
+        return {identity: json.loads(details) if details else None for identity, details in rows}
+
+    def set_many(self, entries):
+        """Store (identity, profile_url, details) entries in one transaction"""
+        now = time.time()
+        with db_session(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO enriched_profiles (identity, profile_url, details, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                ((identity, profile_url, json.dumps(details) if details is not None else None, now)
+                 for identity, profile_url, details in entries)
+            )
+
+    def stats(self):
+        """Entry counts for the health endpoint"""
+        with db_session(self.db_path) as conn:
+            total, fresh = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(fetched_at >= ?), 0) FROM enriched_profiles",
+                (time.time() - self.ttl_seconds,)
+            ).fetchone()
+        return {'entries': total, 'fresh_entries': fresh, 'ttl_days': self.ttl_seconds / 86400}
+
+
+class ProfileEnricher:
+    """Attaches profile details to deduplicated profiles, looking each person up at most once
+
+    Cached details are read in batches; the rest are fetched concurrently on a bounded pool and
+    written back a batch at a time. A person already being looked up for another request shares
+    that lookup instead of starting a second one.
+    """
+
+    def __init__(self, cache, max_workers=ENRICHMENT_MAX_WORKERS, batch_size=ENRICHMENT_BATCH_SIZE):
+        self.cache = cache
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enrich")
+        self.inflight = {}
+        self.lock = threading.Lock()
+
+    def enrich(self, profiles, lane='interactive', max_lookups=ENRICHMENT_MAX_PROFILES):
+        """Return (profiles with an enrichment field, counts by source); records and dicts are both accepted"""
+        profile_urls = self._profile_urls(profiles)
+        details = self._cached(profile_urls)
+        counts = {'profiles': len(profile_urls), 'cache': len(details), 'upstream': 0, 'shared': 0, 'failed': 0, 'skipped': 0}
+        
+        # Lookups are capped per call so one huge post cannot spend the quota on its own
+        misses = [identity for identity in profile_urls if identity not in details]
+        counts['skipped'] = max(0, len(misses) - max_lookups)
+        
+        owned = {}
+        shared = {}
+        with self.lock:
+            for identity in misses[:max_lookups]:
+                future = self.inflight.get(identity)
+                if future is None:
+                    future = self.inflight[identity] = self.executor.submit(self._lookup, profile_urls[identity], lane)
+                    owned[future] = identity
+                else:
+                    shared[future] = identity
+        
+        pending_writes = []
+        try:
+            for future in as_completed(owned):
+                identity = owned[future]
+                try:
+                    details[identity] = future.result()
+                except Exception as e:
+                    counts['failed'] += 1
+                    app.logger.warning("Enrichment lookup failed for %s: %s", profile_urls[identity], e)
+                    continue
+                counts['upstream'] += 1
+                pending_writes.append((identity, profile_urls[identity], details[identity]))
+                if len(pending_writes) >= self.batch_size:
+                    self._write(pending_writes)
+                    pending_writes = []
+            self._write(pending_writes)
+        finally:
+            # Followers keep their futures; new callers read the cache from here on
+            with self.lock:
+                for identity in owned.values():
+                    self.inflight.pop(identity, None)
+        
+        for future, identity in shared.items():
+            try:
+                details[identity] = future.result()
+                counts['shared'] += 1
+            except Exception:
+                counts['failed'] += 1
+        
+        for source, count in counts.items():
+            if source != 'profiles' and count:
+                metrics.inc('extractor_enrichment_profiles_total', count, source=source)
+        
+        enriched = []
+        for profile in profiles:
+            profile_url = profile['profile_url'] if isinstance(profile, dict) else profile.profile_url
+            enrichment = enrichment_fields(details.get(normalize_profile_url(profile_url or '')))
+            if isinstance(profile, dict):
+                enriched.append(dict(profile, enrichment=enrichment))
+            else:
+                enriched.append(profile._replace(enrichment=enrichment))
+        return enriched, counts
+
+    def uncached_count(self, profiles):
+        """How many distinct people in profiles have no unexpired cache entry"""
+        profile_urls = self._profile_urls(profiles)
+        return len(profile_urls) - len(self._cached(profile_urls))
+
+    @staticmethod
+    def _profile_urls(profiles):
+        """{identity: profile URL} of the distinct people in profiles"""
+        profile_urls = {}
+        for profile in profiles:
+            profile_url = profile['profile_url'] if isinstance(profile, dict) else profile.profile_url
+            if profile_url:
+                profile_urls.setdefault(normalize_profile_url(profile_url), profile_url)
+        return profile_urls
+
+    def _cached(self, profile_urls):
+        """Cached details of these identities, read a batch at a time"""
+        details = {}
+        for batch in iter_batches(profile_urls, self.batch_size):
+            details.update(self.cache.get_many(batch))
+        return details
+
+    def _lookup(self, profile_url, lane):
+        """Fetch one profile's details; None when the upstream does not know the profile"""
+        try:
+            data = rapidapi_client.get(ENRICHMENT_ENDPOINT, params={'linkedin_url': profile_url}, lane=lane) or {}
+        except RapidAPIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+        details = data.get('data') if isinstance(data, dict) else None
+        return details if isinstance(details, dict) and details else None
+
+    def _write(self, entries):
+        """Cache a batch of lookups; a failed write only costs a repeat lookup later"""
+        if not entries:
+            return
+        try:
+            self.cache.set_many(entries)
+        except Exception as e:
+            app.logger.warning("Enrichment cache write failed: %s", e)
+
+
+def enrichment_fields(details):
+    """Reduce upstream profile details to the fields returned with each profile; None when unknown"""
+    if details is None:
+        return None
+    return {field: details.get(field) for field in ENRICHMENT_FIELDS}
+
+
+enrichment_cache = EnrichmentCache()
+profile_enricher = ProfileEnricher(enrichment_cache)
+
+
+def enrich_result(result, lane='interactive', max_lookups=ENRICHMENT_MAX_PROFILES):
+    """Return a copy of an extraction result with enriched profiles; the shared result is left as is"""
+    with metrics.timer('extractor_stage_duration_seconds', stage='enrich'):
+        profiles, counts = profile_enricher.enrich(result['profiles'], lane, max_lookups)
+    return dict(result, profiles=profiles, enrichment=counts)
+
+
+def enrich_or_queue(post_url, result):
+    """Enrich a single-post result inline when few lookups are needed, otherwise queue an enrichment job
+
+    Inline lookups hold the request open, so they run on the batch lane and stop at
+    ENRICHMENT_INLINE_MAX_LOOKUPS; larger audiences are handed to a background job that enriches
+    the profiles already extracted, without fetching the post again.
+    """
+    uncached = profile_enricher.uncached_count(result['profiles'])
+    if uncached <= ENRICHMENT_INLINE_MAX_LOOKUPS:
+        return enrich_result(result, lane='batch', max_lookups=ENRICHMENT_INLINE_MAX_LOOKUPS)
+    
+    # The job's input is stored as its result, in the shape extraction jobs complete with
+    profiles = profiles_to_dicts(result['profiles'])
+    job_id = job_store.create([post_url])
+    job_store.update(job_id, result={
+        'profiles': profiles,
+        'total_count': len(profiles),
+        'reaction_count': result['reaction_count'],
+        'comment_count': result['comment_count'],
+        'posts': [{
+            'post_url': post_url,
+            'success': True,
+            'total_count': len(profiles),
+            'errors': result['errors'] if result['errors'] else None
+        }],
+        'enrichment': None
+    })
+    get_job_scheduler().add_job(run_enrichment_job, args=[job_id], id=job_id)
+    return dict(result, enrichment={
+        'status': 'queued',
+        'uncached': uncached,
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}',
+        'results_url': f'/api/jobs/{job_id}/results'
+    })
+
+
+def run_enrichment_job(job_id):
+    """Enrich the profiles stored with a job by enrich_or_queue and complete it with the enriched result"""
+    job = job_store.get(job_id, include_result=True)
+    if not job:
+        return
+    
+    job_store.update(job_id, status='running')
+    try:
+        job_store.update(job_id, status='completed', completed=job['progress']['total'],
+                         result=enrich_result(job['result'], lane='batch'))
+    except Exception as e:
+        job_store.update(job_id, status='failed', error=str(e))
+
+
+# Watchlist: posts re-polled on an interval, with snapshots served to dashboards
+WATCHLIST_DB_PATH = os.environ.get("WATCHLIST_DB_PATH", os.path.join(DATA_DIR, "watchlist.db"))
+WATCHLIST_SCHEDULER = os.environ.get("WATCHLIST_SCHEDULER", "true").lower() == "true"
+WATCHLIST_RPM_BUDGET = float(os.environ.get("WATCHLIST_RPM_BUDGET", 30))
+WATCHLIST_REQUESTS_PER_RUN = int(os.environ.get("WATCHLIST_REQUESTS_PER_RUN", 10))
+WATCHLIST_MIN_INTERVAL_MINUTES = int(os.environ.get("WATCHLIST_MIN_INTERVAL_MINUTES", 5))
+WATCHLIST_SNAPSHOT_HISTORY = int(os.environ.get("WATCHLIST_SNAPSHOT_HISTORY", 10))
+WATCHLIST_ELECTION_SECONDS = float(os.environ.get("WATCHLIST_ELECTION_SECONDS", 30))
+
+
+class WatchlistStore:
+    """SQLite store of watched posts and the snapshots taken of them"""
+
+    def __init__(self, db_path=WATCHLIST_DB_PATH):
+        self.db_path = db_path
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watches ("
+                "id TEXT PRIMARY KEY, post_url TEXT NOT NULL UNIQUE, interval_minutes INTEGER NOT NULL, "
+                "created_at TEXT NOT NULL, last_run_at TEXT, last_status TEXT, last_error TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "watch_id TEXT NOT NULL, taken_at TEXT NOT NULL, total_count INTEGER NOT NULL, "
+                "new_count INTEGER NOT NULL, result TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS snapshots_watch ON snapshots (watch_id, taken_at)")
+
+    def add(self, post_url, interval_minutes):
+        """Watch a post, or update the interval if it is already watched; returns the watch"""
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO watches (id, post_url, interval_minutes, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(post_url) DO UPDATE SET interval_minutes = excluded.interval_minutes",
+                (uuid.uuid4().hex, post_url, interval_minutes, datetime.now().isoformat())
+            )
+            watch_id = conn.execute("SELECT id FROM watches WHERE post_url = ?", (post_url,)).fetchone()[0]
+        return self.get(watch_id)
+
+    def remove(self, watch_id):
+        """Stop watching a post and drop its snapshots; returns False if it was not watched"""
+        with db_session(self.db_path) as conn:
+            conn.execute("DELETE FROM snapshots WHERE watch_id = ?", (watch_id,))
+            return conn.execute("DELETE FROM watches WHERE id = ?", (watch_id,)).rowcount > 0
+
+    def get(self, watch_id):
+        """Return one watch as a dict, or None"""
+        watches = self.list(watch_id)
+        return watches[0] if watches else None
+
+    def list(self, watch_id=None):
+        """Return watches with the counts from their latest snapshot"""
+        query = (
+            "SELECT w.id, w.post_url, w.interval_minutes, w.created_at, w.last_run_at, w.last_status, w.last_error, "
+            "(SELECT total_count FROM snapshots WHERE watch_id = w.id ORDER BY taken_at DESC LIMIT 1), "
+            "(SELECT new_count FROM snapshots WHERE watch_id = w.id ORDER BY taken_at DESC LIMIT 1) "
+            "FROM watches w"
+        )
+        params = ()
+        if watch_id is not None:
+            query += " WHERE w.id = ?"
+            params = (watch_id,)
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(query + " ORDER BY w.created_at", params).fetchall()
+        return [
+            {
+                'watch_id': row[0],
+                'post_url': row[1],
+                'interval_minutes': row[2],
+                'created_at': row[3],
+                'last_run_at': row[4],
+                'last_status': row[5],
+                'last_error': row[6],
+                'total_count': row[7],
+                'new_count': row[8]
+            }
+            for row in rows
+        ]
+
+    def record_run(self, watch_id, status, error=None, result=None):
+        """Record the outcome of a poll, storing a snapshot and pruning old ones on success"""
+        now = datetime.now().isoformat()
+        with db_session(self.db_path) as conn:
+            conn.execute(
+                "UPDATE watches SET last_run_at = ?, last_status = ?, last_error = ? WHERE id = ?",
+                (now, status, error, watch_id)
+            )
+            if result is None:
+                return
+            conn.execute(
+                "INSERT INTO snapshots (watch_id, taken_at, total_count, new_count, result) VALUES (?, ?, ?, ?, ?)",
+                (watch_id, now, result['total_count'], result['new_count'], json.dumps(result))
+            )
+            conn.execute(
+                "DELETE FROM snapshots WHERE watch_id = ? AND rowid NOT IN ("
+                "SELECT rowid FROM snapshots WHERE watch_id = ? ORDER BY taken_at DESC LIMIT ?)",
+                (watch_id, watch_id, WATCHLIST_SNAPSHOT_HISTORY)
+            )
+
+    def snapshots(self, watch_id, limit=1):
+        """Return the most recent snapshots of a watch, newest first"""
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT taken_at, result FROM snapshots WHERE watch_id = ? ORDER BY taken_at DESC LIMIT ?",
+                (watch_id, limit)
+            ).fetchall()
+        return [{'taken_at': row[0], **json.loads(row[1])} for row in rows]
+
+
+class RequestBudget:
+    """Paces callers so that upstream requests stay under a requests-per-minute budget
+
+    The next free slot lives in the rate limiter's SQLite file, so the budget holds across every
+    worker sharing it; the calls themselves still take tokens from the shared bucket's batch lane.
+    """
+
+    def __init__(self, name, requests_per_minute, db_path=RATE_LIMIT_DB_PATH):
+        self.name = name
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.db_path = db_path
+        if not self.interval:
+            return
+        with db_session(self.db_path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS budgets (name TEXT PRIMARY KEY, next_free REAL NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO budgets (name, next_free) VALUES (?, 0)", (self.name,))
+
+    def acquire(self, requests_count=1):
+        """Reserve slots for requests_count upstream requests, sleeping until they are due"""
+        if not self.interval:
+            return
+        now = time.time()
+        with db_session(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            next_free = conn.execute("SELECT next_free FROM budgets WHERE name = ?", (self.name,)).fetchone()[0]
+            start = max(now, next_free)
+            conn.execute(
+                "UPDATE budgets SET next_free = ? WHERE name = ?",
+                (start + self.interval * requests_count, self.name)
+            )
+        if start > now:
+            time.sleep(start - now)
+
+    def allowance(self, max_requests):
+        """A RequestAllowance letting one run make at most max_requests requests paced by this budget"""
+        return RequestAllowance(self, max_requests)
+
+
+class RequestAllowance:
+    """Upstream requests one run may still make, each paced through a shared RequestBudget as it is sent
+
+    Clients call spend() before every attempt, retries included, so a run can never make more
+    requests than it was allowed however many pages it walks.
+    """
+
+    def __init__(self, budget, max_requests):
+        self.budget = budget
+        self.max_requests = max_requests
+        self.remaining = max_requests
+        self.lock = threading.Lock()
+
+    def spend(self):
+        """Take one request from the allowance, waiting for its slot; raises RapidAPIError once none are left"""
+        with self.lock:
+            if self.remaining <= 0:
+                raise RapidAPIError(
+                    f"{self.budget.name} budget of {self.max_requests} upstream requests per run used up",
+                    status_code=429
+                )
+            self.remaining -= 1
+        self.budget.acquire()
+
+
+class SchedulerLease:
+    """Non-blocking file lock held for the life of the process, electing one poller across workers
+
+    The OS drops the lock when the holder exits, so another worker wins the next election. Without
+    fcntl (Windows) every process is treated as the holder.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_file = None
+
+    @property
+    def held(self):
+        return fcntl is None or self.lock_file is not None
+
+    def try_acquire(self):
+        """Take the lock if no other process holds it; returns whether this process holds it"""
+        if self.held:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock_file = open(self.path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        app.logger.info("Watchlist scheduler elected in process %s", os.getpid())
+        return True
 
 
-def extract_profiles_from_reactions(reactions_data):
-    """Extract unique profile URLs from reactions data"""
-    profiles = []
-    
-    if not reactions_data:
-        return profiles
-    
-    # Handle the actual API response structure: { "data": [...], "message": "ok", "total": N }
-    data_list = reactions_data.get('data', []) if isinstance(reactions_data, dict) else reactions_data
-    
-    if not isinstance(data_list, list):
-        data_list = [data_list] if data_list else []
-    
-    for item in data_list:
-        profile = {}
-        
-        # The API returns: { "reactor": { "name", "headline", "linkedin_url", "urn" }, "type": "LIKE/PRAISE/etc" }
-        reactor = item.get('reactor', {}) if isinstance(item.get('reactor'), dict) else {}
-        
-        # Get profile URL from reactor object or directly from item
-        profile_url = (
-            reactor.get('linkedin_url') or
-            reactor.get('profile_url') or
-            item.get('linkedin_url') or 
-            item.get('profile_url') or 
-            item.get('profileUrl')
-        )
-        
-        if profile_url:
-            # Ensure it's a full URL
-            if not profile_url.startswith('http'):
-                profile_url = f"https://www.linkedin.com/in/{profile_url}"
-            
-            profile['profile_url'] = profile_url
-            profile['name'] = reactor.get('name') or item.get('name') or item.get('full_name') or ''
-            profile['headline'] = reactor.get('headline') or item.get('headline') or item.get('title') or ''
-            
-            # Reaction type from item.type (e.g., LIKE, PRAISE, EMPATHY, etc.)
-            reaction_type = item.get('type') or item.get('reaction_type') or item.get('reactionType') or 'LIKE'
-            profile['reaction_type'] = reaction_type
-            profile['engagement_type'] = 'reaction'
-            profile['profile_picture'] = reactor.get('profile_picture') or item.get('profile_picture') or ''
-            
-            profiles.append(profile)
-    
-    return profiles
+watchlist_store = WatchlistStore()
+watchlist_budget = RequestBudget('watchlist', WATCHLIST_RPM_BUDGET)
+watchlist_lease = SchedulerLease(os.path.join(DATA_DIR, 'locks', 'watchlist-scheduler.lock'))
+watchlist_scheduled = False
+watchlist_lock = threading.Lock()
 
 
-def extract_profiles_from_comments(comments_data):
-    """Extract unique profile URLs from comments data"""
-    profiles = []
-    
-    if not comments_data:
-        return profiles
-    
-    data_list = comments_data if isinstance(comments_data, list) else comments_data.get('data', [])
-    
-    if not isinstance(data_list, list):
-        data_list = [data_list] if data_list else []
-    
-    for item in data_list:
-        profile = {}
-        
-        profile_url = (
-            item.get('profile_url') or 
-            item.get('linkedin_url') or 
-            item.get('profileUrl') or
-            item.get('commenter_profile_url') or
-            item.get('author', {}).get('profile_url') if isinstance(item.get('author'), dict) else None
+def schedule_watch(watch):
+    """Add or replace the interval job polling a watched post"""
+    interval = watch['interval_minutes'] * 60
+    # Spread first runs across the interval so watches added together do not poll together
+    offset = int(watch['watch_id'][:8], 16) % interval
+    get_job_scheduler().add_job(
+        run_watch, 'interval', args=[watch['watch_id']], id=f"watch:{watch['watch_id']}",
+        seconds=interval, next_run_time=datetime.now() + timedelta(seconds=offset),
+        coalesce=True, max_instances=1, replace_existing=True
+    )
+
+
+def sync_watchlist():
+    """Poll the watchlist only in the elected process, keeping its jobs in step with the store
+
+    Watches added or removed through other workers are picked up here within one election period.
+    """
+    if not watchlist_lease.try_acquire():
+        return
+    scheduler = get_job_scheduler()
+    scheduled = {job.id: job for job in scheduler.get_jobs() if job.id.startswith('watch:')}
+    for watch in watchlist_store.list():
+        job = scheduled.pop(f"watch:{watch['watch_id']}", None)
+        if job is None or job.trigger.interval != timedelta(minutes=watch['interval_minutes']):
+            schedule_watch(watch)
+    for job in scheduled.values():
+        job.remove()
+
+
+def ensure_watchlist_scheduled():
+    """Start the watchlist election once per process, unless WATCHLIST_SCHEDULER is off"""
+    global watchlist_scheduled
+    if watchlist_scheduled or not WATCHLIST_SCHEDULER:
+        return
+    with watchlist_lock:
+        if watchlist_scheduled:
+            return
+        watchlist_scheduled = True
+        get_job_scheduler().add_job(
+            sync_watchlist, 'interval', id='watchlist:election', seconds=WATCHLIST_ELECTION_SECONDS,
+            next_run_time=datetime.now(), coalesce=True, max_instances=1, replace_existing=True
         )
-        
-        if profile_url:
-            if not profile_url.startswith('http'):
-                profile_url = f"https://www.linkedin.com/in/{profile_url}"
-            
-            profile['profile_url'] = profile_url
-            profile['name'] = item.get('name') or item.get('commenter_name') or item.get('author_name') or ''
-            profile['headline'] = item.get('headline') or item.get('commenter_headline') or ''
-            profile['comment_text'] = item.get('comment') or item.get('text') or item.get('comment_text') or ''
-            profile['engagement_type'] = 'comment'
-            profile['profile_picture'] = item.get('profile_picture') or ''
-            
-            profiles.append(profile)
-    
-    return profiles
 
 
-def deduplicate_profiles(profiles):
-    """Remove duplicate profiles based on profile_url"""
-    seen = set()
-    unique_profiles = []
-    
-    for profile in profiles:
-        url = profile.get('profile_url', '').lower().rstrip('/')
-        if url and url not in seen:
-            seen.add(url)
-            unique_profiles.append(profile)
+def run_watch(watch_id):
+    """Poll one watched post incrementally and store the result as a snapshot"""
+    watch = watchlist_store.get(watch_id)
+    if not watch:
+        return
     
-    return unique_profiles
+    try:
+        result = fetch_post_engagement_incremental(
+            watch['post_url'], lane='batch', budget=watchlist_budget.allowance(WATCHLIST_REQUESTS_PER_RUN)
+        )
+        profiles = result['profiles']
+        if profiles and not isinstance(profiles[0], dict):
+            profiles = profiles_to_dicts(profiles)
+        watchlist_store.record_run(
+            watch_id,
+            'partial' if result['errors'] else 'ok',
+            error='; '.join(result['errors']) or None,
+            result={
+                'profiles': profiles,
+                'total_count': len(profiles),
+                'reaction_count': result['reaction_count'],
+                'comment_count': result['comment_count'],
+                'new_count': result.get('new_count', 0),
+                'errors': result['errors'] if result['errors'] else None
+            }
+        )
+    except Exception as e:
+        watchlist_store.record_run(watch_id, 'failed', error=str(e))
 
 
 def generate_demo_data(post_url):
@@ -314,116 +2848,703 @@ def generate_demo_data(post_url):
         }
     ]
     
-    return demo_profiles
+    return demo_profiles
+
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started for latency metrics"""
+    g.request_started = time.perf_counter()
+    ensure_watchlist_scheduled()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Count every API request and observe its latency by route"""
+    started = g.pop('request_started', None)
+    if started is not None and request.path.startswith('/api/'):
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.inc('extractor_http_requests_total', route=route, method=request.method, status=response.status_code)
+        metrics.observe('extractor_http_request_duration_seconds', time.perf_counter() - started, route=route)
+    return response
+
+
+# Response compression for JSON, NDJSON and event streams, negotiated from Accept-Encoding
+RESPONSE_COMPRESSION = os.environ.get("RESPONSE_COMPRESSION", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", 1024))
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/event-stream')
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick br (when brotli is installed) or gzip from an Accept-Encoding header, or None"""
+    accepted = parse_accept_header(accept_encoding or '')
+    for encoding in ('br', 'gzip'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if accepted.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def compress_body(body, encoding):
+    """Compress a complete response body"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def iter_compressed_chunks(chunks, encoding):
+    """Compress a streamed body, flushing after every chunk so each event reaches the client at once"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush = compressor.process, compressor.flush
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        compress, flush = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    try:
+        for chunk in chunks:
+            yield compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk) + flush()
+        yield compressor.finish() if encoding == 'br' else compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON and NDJSON responses when the client accepts br or gzip"""
+    if (not RESPONSE_COMPRESSION or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code == 204 or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = iter_compressed_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+        response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose metrics in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'service': 'LinkedIn Engagement Extractor',
+        'cache': response_cache.stats(),
+        'roas_cache': roas_response_body.cache_info()._asdict(),
+        'rate_limit': upstream_limiter.stats(),
+        'enrichment_cache': enrichment_cache.stats(),
+        'rapidapi_mode': RAPIDAPI_MODE
+    })
+
+
+@app.route('/api/quota', methods=['GET'])
+def quota_status():
+    """Report the shared upstream rate limit bucket and the remaining RapidAPI quota"""
+    return jsonify({'success': True, 'quota': upstream_limiter.stats()})
+
+
+def extract_payload(post_url, result):
+    """Build the /api/extract response body from a fetch_post_engagement result"""
+    unique_profiles = result['profiles']
+    reaction_count = result['reaction_count']
+    comment_count = result['comment_count']
+    errors = result['errors']
+    timings = result['timings']
+    
+    # If no data was fetched, optionally use demo data for demonstration
+    if not unique_profiles:
+        # Check if demo mode is enabled (default: False since user has subscription)
+        demo_mode = os.environ.get('DEMO_MODE', 'False').lower() == 'true'
+        
+        if demo_mode:
+            # Return demo data for demonstration purposes
+            demo_profiles = generate_demo_data(post_url)
+            demo_reactions = len([p for p in demo_profiles if p['engagement_type'] == 'reaction'])
+            demo_comments = len([p for p in demo_profiles if p['engagement_type'] == 'comment'])
+            
+            return {
+                'success': True,
+                'data': {
+                    'profiles': demo_profiles,
+                    'total_count': len(demo_profiles),
+                    'reaction_count': demo_reactions,
+                    'comment_count': demo_comments,
+                    'post_url': post_url
+                },
+                'message': 'Demo mode: Showing sample data. The actual API may not have data for this post.',
+                'demo_mode': True,
+                'timings': timings
+            }
+        
+        # The API might not have data or the post might be private
+        return {
+            'success': True,
+            'data': {
+                'profiles': [],
+                'total_count': 0,
+                'reaction_count': 0,
+                'comment_count': 0,
+                'post_url': post_url
+            },
+            'message': 'No engagement data found. The post may be private, have no engagement, or the API may not have access to this content.',
+            'errors': errors if errors else None,
+            'timings': timings
+        }
+    
+    return {
+        'success': True,
+        'data': {
+            'profiles': profiles_to_dicts(unique_profiles),
+            'total_count': len(unique_profiles),
+            'reaction_count': reaction_count,
+            'comment_count': comment_count,
+            'post_url': post_url
+        },
+        'errors': errors if errors else None,
+        'timings': timings
+    }
+
+
+def incremental_extract_payload(post_url, result):
+    """Build the /api/extract response body from a fetch_post_engagement_incremental result"""
+    return {
+        'success': True,
+        'incremental': True,
+        'data': {
+            'profiles': result['profiles'],
+            'total_count': len(result['profiles']),
+            'reaction_count': result['reaction_count'],
+            'comment_count': result['comment_count'],
+            'new_count': result['new_count'],
+            'previous_run_at': result['previous_run_at'],
+            'post_url': post_url
+        },
+        'errors': result['errors'] if result['errors'] else None,
+        'timings': result['timings']
+    }
+
+
+@app.route('/api/extract', methods=['POST'])
+def extract_engagement():
+    """Main endpoint to extract engagement data from a LinkedIn post"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Request body is required'
+            }), 400
+        
+        post_url = data.get('post_url', '').strip()
+        
+        # Validate URL
+        with metrics.timer('extractor_stage_duration_seconds', stage='validate'):
+            is_valid, message = validate_linkedin_post_url(post_url)
+        if not is_valid:
+            return jsonify({
+                'success': False,
+                'error': message
+            }), 400
+        
+        if data.get('incremental'):
+            result = fetch_post_engagement_incremental(post_url)
+            build_payload = incremental_extract_payload
+        else:
+            result = fetch_post_engagement(post_url)
+            build_payload = extract_payload
+        
+        if data.get('enrich') and result['profiles']:
+            result = enrich_or_queue(post_url, result)
+        
+        with metrics.timer('extractor_stage_duration_seconds', stage='serialize'):
+            payload = build_payload(post_url, result)
+            if 'enrichment' in result:
+                payload['enrichment'] = result['enrichment']
+            return jsonify(payload)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'An unexpected error occurred: {str(e)}'
+        }), 500
+
+
+@app.route('/api/extract/batch', methods=['POST'])
+def extract_engagement_batch():
+    """Extract engagement from many posts, streaming one NDJSON line per post as it finishes"""
+    data = request.get_json(silent=True)
+    
+    if not data or not isinstance(data.get('post_urls'), list):
+        return jsonify({
+            'success': False,
+            'error': 'Request body must include a post_urls list'
+        }), 400
+    
+    post_urls = [url.strip() for url in data['post_urls'] if isinstance(url, str) and url.strip()]
+    if not post_urls:
+        return jsonify({
+            'success': False,
+            'error': 'At least one post URL is required'
+        }), 400
+    
+    if len(post_urls) > BATCH_MAX_POSTS:
+        return jsonify({
+            'success': False,
+            'error': f'A batch may contain at most {BATCH_MAX_POSTS} post URLs'
+        }), 400
+    
+    try:
+        max_concurrency = int(data.get('max_concurrency') or BATCH_MAX_CONCURRENCY)
+    except (TypeError, ValueError):
+        max_concurrency = BATCH_MAX_CONCURRENCY
+    max_concurrency = max(1, min(max_concurrency, BATCH_MAX_CONCURRENCY))
+    enrich = bool(data.get('enrich'))
+    
+    def generate():
+        # Only identities and post references are kept; profile payloads are streamed out
+        profile_posts = {}
+        failed_count = 0
+        valid_urls = []
+        
+        for post_url in post_urls:
+            is_valid, message = validate_linkedin_post_url(post_url)
+            if is_valid:
+                valid_urls.append(post_url)
+            else:
+                failed_count += 1
+                yield app.json.dumps({'type': 'post', 'post_url': post_url, 'success': False, 'error': message}) + '\n'
+        
+        for post_url, future in iter_batch_results(valid_urls, max_concurrency):
+            try:
+                result = future.result()
+            except Exception as e:
+                failed_count += 1
+                yield app.json.dumps({'type': 'post', 'post_url': post_url, 'success': False, 'error': str(e)}) + '\n'
+                continue
+            
+            # People already enriched for an earlier post in the batch are served from the cache
+            if enrich and result['profiles']:
+                result = enrich_result(result, lane='batch')
+            
+            profiles = []
+            new_profile_count = 0
+            for profile in result['profiles']:
+                key = normalize_profile_url(profile.profile_url)
+                posts = profile_posts.setdefault(key, [])
+                profile_data = profile.to_dict()
+                profile_data['is_new'] = not posts
+                new_profile_count += profile_data['is_new']
+                posts.append(post_url)
+                profiles.append(profile_data)
+            
+            yield app.json.dumps({
+                'type': 'post',
+                'post_url': post_url,
+                'success': True,
+                'data': {
+                    'profiles': profiles,
+                    'total_count': len(result['profiles']),
+                    'new_profile_count': new_profile_count,
+                    'reaction_count': result['reaction_count'],
+                    'comment_count': result['comment_count']
+                },
+                'errors': result['errors'] if result['errors'] else None,
+                'timings': result['timings'],
+                **({'enrichment': result['enrichment']} if 'enrichment' in result else {})
+            }) + '\n'
+        
+        yield app.json.dumps({
+            'type': 'summary',
+            'post_count': len(post_urls),
+            'failed_count': failed_count,
+            'unique_profile_count': len(profile_posts),
+            'profile_posts': profile_posts
+        }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/extract/stream', methods=['POST'])
+def extract_engagement_stream():
+    """Stream a post's profiles as upstream pages are parsed, as SSE or NDJSON, ending with a summary"""
+    data = request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({
+            'success': False,
+            'error': 'Request body is required'
+        }), 400
+    
+    post_url = (data.get('post_url') or '').strip()
+    
+    is_valid, message = validate_linkedin_post_url(post_url)
+    if not is_valid:
+        return jsonify({
+            'success': False,
+            'error': message
+        }), 400
+    
+    # Server-Sent Events when asked for; NDJSON lines with a "type" field otherwise
+    sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    
+    def generate():
+        try:
+            for event, payload in iter_extract_events(post_url):
+                if sse:
+                    yield f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+                else:
+                    yield app.json.dumps({'type': event, **payload}) + '\n'
+        except Exception as e:
+            payload = {'success': False, 'error': f'An unexpected error occurred: {str(e)}'}
+            if sse:
+                yield f"event: error\ndata: {app.json.dumps(payload)}\n\n"
+            else:
+                yield app.json.dumps({'type': 'error', **payload}) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue an extraction job for one post (post_url) or many (post_urls) and return its ID"""
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Request body is required'
+            }), 400
+        
+        post_urls = data.get('post_urls')
+        if post_urls is None:
+            post_urls = [data.get('post_url', '')]
+        if not isinstance(post_urls, list):
+            return jsonify({
+                'success': False,
+                'error': 'post_urls must be a list'
+            }), 400
+        
+        post_urls = [url.strip() for url in post_urls if isinstance(url, str) and url.strip()]
+        if not post_urls:
+            return jsonify({
+                'success': False,
+                'error': 'At least one post URL is required'
+            }), 400
+        
+        if len(post_urls) > BATCH_MAX_POSTS:
+            return jsonify({
+                'success': False,
+                'error': f'A job may contain at most {BATCH_MAX_POSTS} post URLs'
+            }), 400
+        
+        for post_url in post_urls:
+            is_valid, message = validate_linkedin_post_url(post_url)
+            if not is_valid:
+                return jsonify({
+                    'success': False,
+                    'error': f'{message} ({post_url})'
+                }), 400
+        
+        job_id = job_store.create(post_urls)
+        get_job_scheduler().add_job(run_extraction_job, args=[job_id, bool(data.get('enrich'))], id=job_id)
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}',
+            'results_url': f'/api/jobs/{job_id}/results'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'An unexpected error occurred: {str(e)}'
+        }), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Return the status and progress of an extraction job"""
+    job = job_store.get(job_id)
+    
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    return jsonify({'success': True, 'job': job})
+
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """Return the results of a completed extraction job"""
+    job = job_store.get(job_id, include_result=True)
+    
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    if job['status'] != 'completed':
+        return jsonify({
+            'success': False,
+            'error': f"Job is {job['status']}",
+            'job': {key: value for key, value in job.items() if key != 'result'}
+        }), 409
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'data': job['result']
+    })
+
+
+@app.route('/api/watchlist', methods=['GET'])
+def list_watches():
+    """List watched posts with the counts from their latest snapshot"""
+    return jsonify({'success': True, 'watches': watchlist_store.list()})
+
+
+@app.route('/api/watchlist', methods=['POST'])
+def add_watch():
+    """Watch a post (post_url) and poll it every interval_minutes in the background"""
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Request body is required'
+            }), 400
+        
+        post_url = (data.get('post_url') or '').strip()
+        is_valid, message = validate_linkedin_post_url(post_url)
+        if not is_valid:
+            return jsonify({
+                'success': False,
+                'error': message
+            }), 400
+        
+        try:
+            interval_minutes = int(data.get('interval_minutes', 60))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'interval_minutes must be a whole number'
+            }), 400
+        
+        if interval_minutes < WATCHLIST_MIN_INTERVAL_MINUTES:
+            return jsonify({
+                'success': False,
+                'error': f'interval_minutes must be at least {WATCHLIST_MIN_INTERVAL_MINUTES}'
+            }), 400
+        
+        # Watch the canonical URL so variants of one post share a watch
+        watch = watchlist_store.add(parse_linkedin_post_url(post_url).canonical_url, interval_minutes)
+        if WATCHLIST_SCHEDULER and watchlist_lease.held:
+            schedule_watch(watch)
+        
+        return jsonify({
+            'success': True,
+            'watch': watch,
+            'snapshot_url': f"/api/watchlist/{watch['watch_id']}/snapshot"
+        }), 201
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'An unexpected error occurred: {str(e)}'
+        }), 500
+
+
+@app.route('/api/watchlist/<watch_id>', methods=['DELETE'])
+def remove_watch(watch_id):
+    """Stop watching a post"""
+    if not watchlist_store.remove(watch_id):
+        return jsonify({
+            'success': False,
+            'error': 'Watch not found'
+        }), 404
+    
+    if job_scheduler is not None and job_scheduler.get_job(f"watch:{watch_id}"):
+        job_scheduler.remove_job(f"watch:{watch_id}")
+    
+    return jsonify({'success': True, 'watch_id': watch_id})
 
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
+@app.route('/api/watchlist/<watch_id>/snapshot', methods=['GET'])
+def get_watch_snapshot(watch_id):
+    """Return the latest stored snapshot of a watched post without calling upstream"""
+    watch = watchlist_store.get(watch_id)
+    
+    if not watch:
+        return jsonify({
+            'success': False,
+            'error': 'Watch not found'
+        }), 404
+    
+    history = request.args.get('history', '').lower() == 'true'
+    snapshots = watchlist_store.snapshots(watch_id, WATCHLIST_SNAPSHOT_HISTORY if history else 1)
+    if not snapshots:
+        return jsonify({
+            'success': False,
+            'error': 'No snapshot has been taken yet',
+            'watch': watch
+        }), 409
+    
+    if history:
+        # History is for trend lines; only the latest snapshot carries profiles
+        for snapshot in snapshots[1:]:
+            snapshot.pop('profiles', None)
+        return jsonify({'success': True, 'watch': watch, 'snapshots': snapshots})
+    
+    return jsonify({'success': True, 'watch': watch, 'data': snapshots[0]})
+
+
+def resolve_indexed_posts(post_urls):
+    """Map post URLs to activity IDs; returns (activity IDs, indexed posts, error message)"""
+    activity_ids = []
+    for post_url in post_urls:
+        activity_id = extract_post_id((post_url or '').strip()) if isinstance(post_url, str) else None
+        if not activity_id:
+            return None, None, f'Could not find a post ID in {post_url!r}'
+        activity_ids.append(activity_id)
+    
+    posts = audience_index.posts(activity_ids)
+    missing = [post_url for post_url, activity_id in zip(post_urls, activity_ids) if activity_id not in posts]
+    if missing:
+        return activity_ids, posts, f"Not indexed yet, extract these posts first: {', '.join(missing)}"
+    return activity_ids, posts, None
+
+
+def audience_query_limit(data):
+    """Read the limit of an audience query, capped at AUDIENCE_QUERY_LIMIT"""
+    limit = int(data.get('limit', AUDIENCE_QUERY_LIMIT))
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, AUDIENCE_QUERY_LIMIT)
+
+
+@app.route('/api/audience/posts', methods=['GET'])
+def list_audience_posts():
+    """List the posts in the audience index"""
+    posts = audience_index.posts()
     return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'service': 'LinkedIn Engagement Extractor'
+        'success': True,
+        'posts': [dict(post, activity_id=activity_id) for activity_id, post in posts.items()]
     })
 
 
-@app.route('/api/extract', methods=['POST'])
-def extract_engagement():
-    """Main endpoint to extract engagement data from a LinkedIn post"""
+@app.route('/api/audience/top-engagers', methods=['POST'])
+def audience_top_engagers():
+    """People who engaged with the most posts, among post_urls or across every indexed post"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         
-        if not data:
+        try:
+            min_posts = int(data.get('min_posts', 2))
+            limit = audience_query_limit(data)
+        except (TypeError, ValueError):
             return jsonify({
                 'success': False,
-                'error': 'Request body is required'
+                'error': 'min_posts and limit must be whole numbers'
             }), 400
         
-        post_url = data.get('post_url', '').strip()
+        activity_ids = None
+        if data.get('post_urls') is not None:
+            if not isinstance(data['post_urls'], list) or not data['post_urls']:
+                return jsonify({
+                    'success': False,
+                    'error': 'post_urls must be a non-empty list'
+                }), 400
+            activity_ids, _, error = resolve_indexed_posts(data['post_urls'])
+            if error:
+                return jsonify({
+                    'success': False,
+                    'error': error
+                }), 404 if activity_ids else 400
         
-        # Validate URL
-        is_valid, message = validate_linkedin_post_url(post_url)
-        if not is_valid:
+        profiles = audience_index.top_engagers(activity_ids, min_posts=min_posts, limit=limit)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'profiles': profiles,
+                'total_count': len(profiles),
+                'min_posts': min_posts
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'An unexpected error occurred: {str(e)}'
+        }), 500
+
+
+def audience_pair_query(query):
+    """Run a two-post audience query (post_a, post_b) from the request body"""
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data or not data.get('post_a') or not data.get('post_b'):
             return jsonify({
                 'success': False,
-                'error': message
+                'error': 'post_a and post_b are required'
             }), 400
         
-        all_profiles = []
-        reaction_count = 0
-        comment_count = 0
-        errors = []
-        
-        # Fetch reactions
-        try:
-            reactions_data = get_post_reactions(post_url)
-            if reactions_data:
-                reaction_profiles = extract_profiles_from_reactions(reactions_data)
-                all_profiles.extend(reaction_profiles)
-                reaction_count = len(reaction_profiles)
-        except Exception as e:
-            errors.append(f"Error fetching reactions: {str(e)}")
-        
-        # Fetch comments
         try:
-            comments_data = get_post_comments(post_url)
-            if comments_data:
-                comment_profiles = extract_profiles_from_comments(comments_data)
-                all_profiles.extend(comment_profiles)
-                comment_count = len(comment_profiles)
-        except Exception as e:
-            errors.append(f"Error fetching comments: {str(e)}")
-        
-        # Deduplicate profiles
-        unique_profiles = deduplicate_profiles(all_profiles)
+            limit = audience_query_limit(data)
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'limit must be a whole number'
+            }), 400
         
-        # If no data was fetched, optionally use demo data for demonstration
-        if not unique_profiles:
-            # Check if demo mode is enabled (default: False since user has subscription)
-            demo_mode = os.environ.get('DEMO_MODE', 'False').lower() == 'true'
-            
-            if demo_mode:
-                # Return demo data for demonstration purposes
-                demo_profiles = generate_demo_data(post_url)
-                demo_reactions = len([p for p in demo_profiles if p['engagement_type'] == 'reaction'])
-                demo_comments = len([p for p in demo_profiles if p['engagement_type'] == 'comment'])
-                
-                return jsonify({
-                    'success': True,
-                    'data': {
-                        'profiles': demo_profiles,
-                        'total_count': len(demo_profiles),
-                        'reaction_count': demo_reactions,
-                        'comment_count': demo_comments,
-                        'post_url': post_url
-                    },
-                    'message': 'Demo mode: Showing sample data. The actual API may not have data for this post.',
-                    'demo_mode': True
-                })
-            else:
-                # The API might not have data or the post might be private
-                return jsonify({
-                    'success': True,
-                    'data': {
-                        'profiles': [],
-                        'total_count': 0,
-                        'reaction_count': 0,
-                        'comment_count': 0,
-                        'post_url': post_url
-                    },
-                    'message': 'No engagement data found. The post may be private, have no engagement, or the API may not have access to this content.'
-                })
+        activity_ids, posts, error = resolve_indexed_posts([data['post_a'], data['post_b']])
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 404 if activity_ids else 400
         
         return jsonify({
             'success': True,
-            'data': {
-                'profiles': unique_profiles,
-                'total_count': len(unique_profiles),
-                'reaction_count': reaction_count,
-                'comment_count': comment_count,
-                'post_url': post_url
-            },
-            'errors': errors if errors else None
+            'data': dict(
+                query(*activity_ids, limit=limit),
+                post_a=posts[activity_ids[0]],
+                post_b=posts[activity_ids[1]]
+            )
         })
         
     except Exception as e:
@@ -433,59 +3554,254 @@ def extract_engagement():
         }), 500
 
 
-@app.route('/api/download/csv', methods=['POST'])
-def download_csv():
-    """Generate and download CSV file with profile data"""
+@app.route('/api/audience/overlap', methods=['POST'])
+def audience_overlap():
+    """How many people engaged with both post_a and post_b, and who they are"""
+    return audience_pair_query(audience_index.overlap)
+
+
+@app.route('/api/audience/difference', methods=['POST'])
+def audience_difference():
+    """Engagers of post_a who did not engage with post_b"""
+    def query(activity_id_a, activity_id_b, limit):
+        total, profiles = audience_index.difference(activity_id_a, activity_id_b, limit)
+        return {'profiles': profiles, 'total_count': total}
+    
+    return audience_pair_query(query)
+
+
+# Export schema: CSV header -> profile field
+EXPORT_COLUMNS = [
+    ('Profile URL', 'profile_url'),
+    ('Name', 'name'),
+    ('Headline', 'headline'),
+    ('Engagement Types', 'engagement_types'),
+    ('Reaction Types', 'reaction_types'),
+    ('Comments', 'comments')
+]
+# Merged list fields: the single-engagement field older payloads carry instead, and the separator CSV joins them with
+EXPORT_LIST_FIELDS = {
+    'engagement_types': ('engagement_type', ', '),
+    'reaction_types': ('reaction_type', ', '),
+    'comments': ('comment_text', '\n')
+}
+EXPORT_FIELDS = [field for _, field in EXPORT_COLUMNS]
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", 500))
+
+
+def export_record(profile):
+    """A profile reduced to the export fields, every engagement of a merged profile kept as a list of strings"""
+    record = {}
+    for field in EXPORT_FIELDS:
+        value = profile.get(field)
+        if field in EXPORT_LIST_FIELDS:
+            if not value or not isinstance(value, (list, tuple)):
+                value = [value or profile.get(EXPORT_LIST_FIELDS[field][0])]
+            record[field] = [str(item) for item in value if item]
+        else:
+            record[field] = value or ''
+    return record
+
+
+def export_values(profile):
+    """A profile's CSV column values as strings, joining each list field with its separator"""
+    values = []
+    for field, value in export_record(profile).items():
+        if field in EXPORT_LIST_FIELDS:
+            value = EXPORT_LIST_FIELDS[field][1].join(value)
+        values.append(value)
+    return values
+
+
+def iter_csv_chunks(profiles, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield the CSV export as UTF-8 byte chunks, starting with a BOM for Excel compatibility"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    elapsed = 0.0
+    
+    yield codecs.BOM_UTF8
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    
     try:
-        data = request.get_json()
-        profiles = data.get('profiles', [])
+        # Time spent encoding, excluding time the client takes to read each chunk
+        started = time.perf_counter()
+        for count, profile in enumerate(profiles, start=1):
+            writer.writerow(export_values(profile))
+            if count % chunk_rows == 0:
+                chunk = buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+                elapsed += time.perf_counter() - started
+                yield chunk
+                started = time.perf_counter()
         
-        if not profiles:
+        chunk = buffer.getvalue().encode('utf-8')
+        elapsed += time.perf_counter() - started
+        if chunk:
+            yield chunk
+    finally:
+        metrics.observe('extractor_stage_duration_seconds', elapsed, stage='csv')
+
+
+def iter_batches(iterable, size):
+    """Yield lists of up to size items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_export_records(profiles):
+    """Yield each profile reduced to the export schema fields"""
+    for profile in profiles:
+        yield export_record(profile)
+
+
+def iter_ndjson_chunks(profiles, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield the export as newline-delimited JSON byte chunks"""
+    for batch in iter_batches(iter_export_records(profiles), chunk_rows):
+        yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch).encode('utf-8')
+
+
+def iter_gzip_chunks(chunks):
+    """Gzip-compress a byte stream incrementally"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class StreamSink(io.RawIOBase):
+    """Write-only file object that buffers bytes until drained, tracking the absolute position"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_columnar_chunks(profiles, fmt, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield the export as Parquet or Arrow IPC stream bytes, one record batch per chunk"""
+    schema = pyarrow.schema([
+        (field, pyarrow.list_(pyarrow.string()) if field in EXPORT_LIST_FIELDS else pyarrow.string())
+        for field in EXPORT_FIELDS
+    ])
+    sink = StreamSink()
+    
+    if fmt == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+    
+    for batch in iter_batches(iter_export_records(profiles), chunk_rows):
+        writer.write_batch(pyarrow.RecordBatch.from_pylist(batch, schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+    
+    writer.close()
+    yield sink.drain()
+
+
+# format -> (mimetype, file extension, chunk generator)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv', iter_csv_chunks),
+    'csv_gz': ('application/gzip', 'csv.gz', lambda profiles: iter_gzip_chunks(iter_csv_chunks(profiles))),
+    'ndjson': ('application/x-ndjson', 'ndjson', iter_ndjson_chunks),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', lambda profiles: iter_columnar_chunks(profiles, 'parquet')),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows', lambda profiles: iter_columnar_chunks(profiles, 'arrow'))
+}
+COLUMNAR_FORMATS = {'parquet', 'arrow'}
+
+
+def resolve_export_profiles():
+    """Return (profiles, error_response) from a posted profile list or a completed job's result"""
+    data = request.get_json(silent=True) or {}
+    job_id = request.args.get('job_id') or data.get('job_id')
+    
+    if job_id:
+        job = job_store.get(job_id, include_result=True)
+        if not job:
+            return None, (jsonify({'success': False, 'error': 'Job not found'}), 404)
+        if job['status'] != 'completed':
+            return None, (jsonify({'success': False, 'error': f"Job is {job['status']}"}), 409)
+        profiles = (job['result'] or {}).get('profiles', [])
+    else:
+        profiles = data.get('profiles', [])
+    
+    if not profiles:
+        return None, (jsonify({'success': False, 'error': 'No profiles to export'}), 400)
+    
+    return profiles, None
+
+
+@app.route('/api/download', methods=['GET', 'POST'])
+def download_export():
+    """Stream an export in the requested format (csv, csv_gz, ndjson, parquet, arrow)"""
+    data = request.get_json(silent=True) or {}
+    fmt = (request.args.get('format') or data.get('format') or 'csv').lower()
+    return stream_export(fmt)
+
+
+@app.route('/api/download/csv', methods=['GET', 'POST'])
+def download_csv():
+    """Stream a CSV file of posted profiles, or of a completed job's results via job_id"""
+    return stream_export('csv')
+
+
+def stream_export(fmt):
+    """Build a streaming download response for the given export format"""
+    try:
+        if fmt not in EXPORT_FORMATS:
             return jsonify({
                 'success': False,
-                'error': 'No profiles to export'
+                'error': f"Unsupported format '{fmt}'. Choose one of: {', '.join(EXPORT_FORMATS)}"
             }), 400
         
-        # Create CSV in memory
-        output = io.StringIO()
-        
-        # Define CSV columns
-        fieldnames = ['Profile URL', 'Name', 'Headline', 'Engagement Type', 'Reaction Type', 'Comment']
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
+        if fmt in COLUMNAR_FORMATS and pyarrow is None:
+            return jsonify({
+                'success': False,
+                'error': f'{fmt} export requires pyarrow to be installed on the server'
+            }), 501
         
-        for profile in profiles:
-            writer.writerow({
-                'Profile URL': profile.get('profile_url', ''),
-                'Name': profile.get('name', ''),
-                'Headline': profile.get('headline', ''),
-                'Engagement Type': profile.get('engagement_type', ''),
-                'Reaction Type': profile.get('reaction_type', ''),
-                'Comment': profile.get('comment_text', '')
-            })
-        
-        # Prepare file for download
-        output.seek(0)
-        
-        # Convert to bytes
-        bytes_output = io.BytesIO()
-        bytes_output.write(output.getvalue().encode('utf-8-sig'))  # BOM for Excel compatibility
-        bytes_output.seek(0)
+        profiles, error_response = resolve_export_profiles()
+        if error_response:
+            return error_response
         
+        mimetype, extension, generate = EXPORT_FORMATS[fmt]
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'linkedin_engagement_{timestamp}.csv'
+        filename = f'linkedin_engagement_{timestamp}.{extension}'
         
-        return send_file(
-            bytes_output,
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+        return Response(
+            stream_with_context(generate(profiles)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
         
     except Exception as e:
         return jsonify({
             'success': False,
-            'error': f'Error generating CSV: {str(e)}'
+            'error': f'Error generating {fmt} export: {str(e)}'
         }), 500
 
 
@@ -497,10 +3813,14 @@ def validate_url():
         post_url = data.get('post_url', '').strip()
         
         is_valid, message = validate_linkedin_post_url(post_url)
+        parsed = parse_linkedin_post_url(post_url)
         
         return jsonify({
             'valid': is_valid,
-            'message': message
+            'message': message,
+            'post_type': parsed.post_type if parsed else None,
+            'post_id': parsed.post_id if parsed else None,
+            'canonical_url': parsed.canonical_url if parsed else None
         })
         
     except Exception as e:
@@ -510,6 +3830,150 @@ def validate_url():
         }), 500
 
 
+# ROAS: benchmarks and the bands ratings, insights and recommendations are picked by, from a config file
+ROAS_CONFIG_PATH = os.environ.get("ROAS_CONFIG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "roas_config.json"))
+ROAS_CACHE_SIZE = int(os.environ.get("ROAS_CACHE_SIZE", 4096))
+ROAS_BATCH_MAX_ROWS = int(os.environ.get("ROAS_BATCH_MAX_ROWS", 100000))
+ROAS_BATCH_CHUNK_ROWS = int(os.environ.get("ROAS_BATCH_CHUNK_ROWS", 5000))
+
+
+class RoasConfig(NamedTuple):
+    """Benchmark and band tables for ROAS scoring; each band tuple is searched with bisect"""
+    industry_benchmarks: dict
+    default_benchmark: float
+    rating_bands: tuple
+    ratings: tuple
+    performance_bands: tuple
+    scaling_bands: tuple
+    recommendation_bands: tuple
+
+    @classmethod
+    def load(cls, path):
+        """Load and check a ROAS config file"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        
+        config = cls(
+            industry_benchmarks={industry: float(value) for industry, value in data['industry_benchmarks'].items()},
+            default_benchmark=float(data['default_benchmark']),
+            rating_bands=tuple(float(band) for band in data['rating_bands']),
+            ratings=tuple(data['ratings']),
+            performance_bands=tuple(float(band) for band in data['performance_bands']),
+            scaling_bands=tuple(float(band) for band in data['scaling_bands']),
+            recommendation_bands=tuple(float(band) for band in data['recommendation_bands'])
+        )
+        
+        # The insight and recommendation templates below have one entry per band
+        expected = {'ratings': len(config.rating_bands) + 1, 'performance_bands': 3,
+                    'scaling_bands': 2, 'recommendation_bands': 2}
+        for name, length in expected.items():
+            if len(getattr(config, name)) != length:
+                raise ValueError(f"{path}: {name} must have {length} entries")
+        for name in ('rating_bands', 'performance_bands', 'scaling_bands', 'recommendation_bands'):
+            bands = getattr(config, name)
+            if list(bands) != sorted(bands):
+                raise ValueError(f"{path}: {name} must be in ascending order")
+        return config
+
+
+roas_config = RoasConfig.load(ROAS_CONFIG_PATH)
+
+# Insight and recommendation text indexed by band, with message templates bound once
+PERFORMANCE_INSIGHTS = (
+    ('danger', 'Losing Money', 'Your ROAS of {:.2f} indicates losses. Immediate action required.'.format),
+    ('warning', 'Break-Even Performance',
+     'Your ROAS of {:.2f} means you\'re close to break-even. Optimization needed.'.format),
+    ('success', 'Good Performance', 'Your ROAS of {:.2f} is solid with room for optimization.'.format),
+    ('success', 'Excellent Performance',
+     'Your ROAS of {:.2f} is outstanding! Your campaigns are highly profitable.'.format)
+)
+PROFITABILITY_INSIGHTS = (
+    ('danger', 'Not Yet Profitable', 'Your ROAS is below break-even ({:.2f}). Not covering costs.'.format),
+    ('success', 'Profitable After Costs', 'Your ROAS exceeds break-even ({:.2f}). You\'re making profit.'.format)
+)
+INDUSTRY_INSIGHTS = {
+    -1: ('warning', 'Below Industry Average',
+         'You\'re {:.1f}% below industry average. Room for improvement.'.format),
+    1: ('success', 'Above Industry Average', 'You\'re performing {:.1f}% above the industry benchmark.'.format)
+}
+SCALING_INSIGHTS = (
+    None,
+    {'type': 'info', 'title': 'Scale Opportunity',
+     'message': 'Strong ROAS suggests you can increase budget to capture more revenue.'},
+    {'type': 'info', 'title': 'Untapped Potential',
+     'message': 'Very high ROAS indicates possible under-spending. Consider scaling.'}
+)
+RECOMMENDATION_TIERS = (
+    ('Review and refine your audience targeting',
+     'A/B test new ad creatives and messaging',
+     'Optimize your landing pages for better conversion',
+     'Consider adjusting your bidding strategy'),
+    ('Optimize your conversion funnel',
+     'Test new audience segments',
+     'Increase budget on top-performing campaigns'),
+    ('Scale winning campaigns gradually (20-30% increases)',
+     'Test lookalike audiences to expand reach',
+     'Experiment with new ad formats or channels')
+)
+# Every recommendation list there is, keyed by (tier, tracks profit margin, tracks conversions)
+RECOMMENDATIONS = {
+    (tier, tracks_margin, tracks_conversions): (
+        RECOMMENDATION_TIERS[tier]
+        + ('Set up automated ROAS monitoring and alerts',)
+        + (() if tracks_margin else ('Track profit margins to understand true profitability',))
+        + (() if tracks_conversions else ('Implement conversion tracking to calculate CPA',))
+    )
+    for tier in range(len(RECOMMENDATION_TIERS))
+    for tracks_margin in (False, True)
+    for tracks_conversions in (False, True)
+}
+
+
+def roas_insight(template, value):
+    """Render one templated insight"""
+    insight_type, title, message = template
+    return {'type': insight_type, 'title': title, 'message': message(value)}
+
+
+class Campaign(NamedTuple):
+    """One validated ROAS input: the /api/calculate-roas body or a bulk row"""
+    row: int
+    campaign: object
+    ad_spend: float
+    revenue: float
+    profit_margin: float
+    conversions: int
+    industry: str
+    currency: str
+
+
+def parse_campaign(row_number, row):
+    """Validate one ROAS input, raising ValueError with the message to return"""
+    def value(field, default):
+        raw = row.get(field)
+        return default if raw is None or raw == '' else raw
+    
+    try:
+        campaign = Campaign(
+            row=row_number,
+            campaign=row.get('campaign'),
+            ad_spend=float(value('ad_spend', 0)),
+            revenue=float(value('revenue', 0)),
+            profit_margin=float(value('profit_margin', 0)),
+            conversions=int(value('conversions', 0)),
+            industry=str(value('industry', 'general')),
+            currency=str(value('currency', 'USD'))
+        )
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Invalid input values: {str(e)}')
+    
+    if not all(math.isfinite(number) for number in (campaign.ad_spend, campaign.revenue, campaign.profit_margin)):
+        raise ValueError('Invalid input values: numbers must be finite')
+    if not campaign.ad_spend > 0:
+        raise ValueError('Ad spend must be greater than 0')
+    return campaign
+
+
 @app.route('/api/calculate-roas', methods=['POST'])
 def calculate_roas():
     """Calculate ROAS and provide advanced insights"""
@@ -522,97 +3986,19 @@ def calculate_roas():
                 'error': 'Request body is required'
             }), 400
         
-        # Extract parameters
-        ad_spend = float(data.get('ad_spend', 0))
-        revenue = float(data.get('revenue', 0))
-        profit_margin = float(data.get('profit_margin', 0))
-        conversions = int(data.get('conversions', 0))
-        industry = data.get('industry', 'general')
-        currency = data.get('currency', 'USD')
-        
-        # Validate inputs
-        if ad_spend <= 0:
-            return jsonify({
-                'success': False,
-                'error': 'Ad spend must be greater than 0'
-            }), 400
-        
-        # Calculate ROAS
-        roas = revenue / ad_spend
-        
-        # Calculate additional metrics
-        profit = None
-        net_profit = None
-        roi = None
-        break_even_roas = 1.0
-        
-        if profit_margin > 0:
-            profit = revenue * (profit_margin / 100)
-            net_profit = profit - ad_spend
-            roi = (net_profit / ad_spend) * 100
-            break_even_roas = 100 / profit_margin
-        
-        cpa = None
-        if conversions > 0:
-            cpa = ad_spend / conversions
-        
-        # Calculate rating
-        rating = get_roas_rating(roas)
-        
-        # Get industry benchmark
-        industry_benchmarks = {
-            'general': 4.0,
-            'ecommerce': 4.5,
-            'saas': 5.0,
-            'finance': 3.5,
-            'realestate': 5.5,
-            'automotive': 3.0,
-            'education': 4.0,
-            'healthcare': 3.5,
-            'travel': 4.0,
-            'retail': 4.5,
-            'b2b': 5.0
-        }
-        
-        industry_benchmark = industry_benchmarks.get(industry, 4.0)
+        campaign = parse_campaign(None, data)
         
-        # Generate insights
-        insights = generate_roas_insights(roas, revenue, ad_spend, profit_margin, 
-                                         break_even_roas, industry_benchmark)
-        
-        # Generate recommendations
-        recommendations = generate_recommendations(roas, profit_margin, conversions)
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'roas': round(roas, 2),
-                'rating': rating,
-                'metrics': {
-                    'revenue': revenue,
-                    'ad_spend': ad_spend,
-                    'profit': round(profit, 2) if profit else None,
-                    'net_profit': round(net_profit, 2) if net_profit else None,
-                    'roi': round(roi, 2) if roi else None,
-                    'cpa': round(cpa, 2) if cpa else None,
-                    'break_even_roas': round(break_even_roas, 2),
-                    'conversions': conversions
-                },
-                'benchmark': {
-                    'industry': industry,
-                    'industry_average': industry_benchmark,
-                    'performance_vs_industry': round(((roas - industry_benchmark) / industry_benchmark) * 100, 1)
-                },
-                'insights': insights,
-                'recommendations': recommendations,
-                'currency': currency
-            }
-        })
+        # The calculator page recalculates on every keystroke; repeated inputs reuse the serialized body
+        return app.response_class(
+            roas_response_body(campaign.ad_spend, campaign.revenue, campaign.profit_margin,
+                               campaign.conversions, campaign.industry, campaign.currency),
+            mimetype=app.json.mimetype
+        )
         
     except ValueError as e:
         return jsonify({
             'success': False,
-            'error': f'Invalid input values: {str(e)}'
+            'error': str(e)
         }), 400
     except Exception as e:
         return jsonify({
@@ -621,133 +4007,351 @@ def calculate_roas():
         }), 500
 
 
+@functools.lru_cache(maxsize=ROAS_CACHE_SIZE)
+def roas_response_body(ad_spend, revenue, profit_margin, conversions, industry, currency):
+    """Serialized /api/calculate-roas response for one set of inputs, memoized"""
+    return app.json.response({
+        'success': True,
+        'data': roas_result(ad_spend, revenue, profit_margin, conversions, industry, currency)
+    }).get_data()
+
+
+def roas_result(ad_spend, revenue, profit_margin, conversions, industry, currency):
+    """Calculate ROAS, derived metrics, benchmark comparison, insights and recommendations"""
+    # Calculate ROAS
+    roas = revenue / ad_spend
+    
+    # Calculate additional metrics
+    profit = None
+    net_profit = None
+    roi = None
+    break_even_roas = 1.0
+    
+    if profit_margin > 0:
+        profit = revenue * (profit_margin / 100)
+        net_profit = profit - ad_spend
+        roi = (net_profit / ad_spend) * 100
+        break_even_roas = 100 / profit_margin
+    
+    cpa = None
+    if conversions > 0:
+        cpa = ad_spend / conversions
+    
+    # Get industry benchmark
+    industry_benchmark = roas_config.industry_benchmarks.get(industry, roas_config.default_benchmark)
+    
+    return {
+        'roas': round(roas, 2),
+        'rating': get_roas_rating(roas),
+        'metrics': {
+            'revenue': revenue,
+            'ad_spend': ad_spend,
+            'profit': round(profit, 2) if profit else None,
+            'net_profit': round(net_profit, 2) if net_profit else None,
+            'roi': round(roi, 2) if roi else None,
+            'cpa': round(cpa, 2) if cpa else None,
+            'break_even_roas': round(break_even_roas, 2),
+            'conversions': conversions
+        },
+        'benchmark': {
+            'industry': industry,
+            'industry_average': industry_benchmark,
+            'performance_vs_industry': round(((roas - industry_benchmark) / industry_benchmark) * 100, 1)
+        },
+        'insights': generate_roas_insights(roas, revenue, ad_spend, profit_margin,
+                                           break_even_roas, industry_benchmark),
+        'recommendations': generate_recommendations(roas, profit_margin, conversions),
+        'currency': currency
+    }
+
+
 def get_roas_rating(roas):
-    """Determine the rating based on ROAS value"""
-    if roas < 1:
-        return {'level': 'Poor', 'color': 'danger', 'score': 1}
-    elif roas < 2:
-        return {'level': 'Fair', 'color': 'warning', 'score': 2}
-    elif roas < 3:
-        return {'level': 'Good', 'color': 'success', 'score': 3}
-    elif roas < 4:
-        return {'level': 'Great', 'color': 'success', 'score': 4}
-    else:
-        return {'level': 'Excellent', 'color': 'success', 'score': 5}
+    """Determine the rating based on ROAS value (a shared dict; do not mutate)"""
+    return roas_config.ratings[bisect.bisect_right(roas_config.rating_bands, roas)]
 
 
 def generate_roas_insights(roas, revenue, ad_spend, profit_margin, break_even_roas, industry_benchmark):
     """Generate insights based on ROAS data"""
-    insights = []
-    
     # Performance insight
-    if roas >= 4:
-        insights.append({
-            'type': 'success',
-            'title': 'Excellent Performance',
-            'message': f'Your ROAS of {roas:.2f} is outstanding! Your campaigns are highly profitable.'
-        })
-    elif roas >= 2:
-        insights.append({
-            'type': 'success',
-            'title': 'Good Performance',
-            'message': f'Your ROAS of {roas:.2f} is solid with room for optimization.'
-        })
-    elif roas >= 1:
-        insights.append({
-            'type': 'warning',
-            'title': 'Break-Even Performance',
-            'message': f'Your ROAS of {roas:.2f} means you\'re close to break-even. Optimization needed.'
-        })
-    else:
-        insights.append({
-            'type': 'danger',
-            'title': 'Losing Money',
-            'message': f'Your ROAS of {roas:.2f} indicates losses. Immediate action required.'
-        })
+    insights = [roas_insight(PERFORMANCE_INSIGHTS[bisect.bisect_right(roas_config.performance_bands, roas)], roas)]
     
     # Profitability insight
     if profit_margin > 0:
-        if roas > break_even_roas:
-            insights.append({
-                'type': 'success',
-                'title': 'Profitable After Costs',
-                'message': f'Your ROAS exceeds break-even ({break_even_roas:.2f}). You\'re making profit.'
-            })
-        else:
-            insights.append({
-                'type': 'danger',
-                'title': 'Not Yet Profitable',
-                'message': f'Your ROAS is below break-even ({break_even_roas:.2f}). Not covering costs.'
-            })
+        insights.append(roas_insight(PROFITABILITY_INSIGHTS[roas > break_even_roas], break_even_roas))
     
     # Industry comparison
-    if roas > industry_benchmark:
-        diff = ((roas - industry_benchmark) / industry_benchmark) * 100
-        insights.append({
-            'type': 'success',
-            'title': 'Above Industry Average',
-            'message': f'You\'re performing {diff:.1f}% above the industry benchmark.'
-        })
-    elif roas < industry_benchmark:
-        diff = ((industry_benchmark - roas) / industry_benchmark) * 100
-        insights.append({
-            'type': 'warning',
-            'title': 'Below Industry Average',
-            'message': f'You\'re {diff:.1f}% below industry average. Room for improvement.'
-        })
+    if roas != industry_benchmark:
+        diff = (abs(roas - industry_benchmark) / industry_benchmark) * 100
+        insights.append(roas_insight(INDUSTRY_INSIGHTS[1 if roas > industry_benchmark else -1], diff))
     
     # Scaling opportunity
-    if roas >= 3 and roas < 10:
-        insights.append({
-            'type': 'info',
-            'title': 'Scale Opportunity',
-            'message': 'Strong ROAS suggests you can increase budget to capture more revenue.'
-        })
-    elif roas >= 10:
-        insights.append({
-            'type': 'info',
-            'title': 'Untapped Potential',
-            'message': 'Very high ROAS indicates possible under-spending. Consider scaling.'
-        })
+    scaling = SCALING_INSIGHTS[bisect.bisect_right(roas_config.scaling_bands, roas)]
+    if scaling:
+        insights.append(scaling)
     
     return insights
 
 
 def generate_recommendations(roas, profit_margin, conversions):
-    """Generate actionable recommendations"""
-    recommendations = []
-    
-    if roas < 2:
-        recommendations.extend([
-            'Review and refine your audience targeting',
-            'A/B test new ad creatives and messaging',
-            'Optimize your landing pages for better conversion',
-            'Consider adjusting your bidding strategy'
-        ])
-    elif roas < 4:
-        recommendations.extend([
-            'Optimize your conversion funnel',
-            'Test new audience segments',
-            'Increase budget on top-performing campaigns'
-        ])
+    """Generate actionable recommendations (a shared tuple)"""
+    tier = bisect.bisect_right(roas_config.recommendation_bands, roas)
+    return RECOMMENDATIONS[(tier, bool(profit_margin), bool(conversions))]
+
+
+# Bulk ROAS: campaigns scored column-wise in chunks
+ROAS_CSV_COLUMNS = [
+    'row', 'campaign', 'roas', 'rating', 'revenue', 'ad_spend', 'profit', 'net_profit', 'roi', 'cpa',
+    'break_even_roas', 'conversions', 'industry', 'industry_average', 'performance_vs_industry',
+    'currency', 'insights', 'error'
+]
+
+
+def score_campaigns_vectorized(ad_spend, revenue, margin, conversions, benchmark):
+    """Compute every ROAS metric and band over whole columns at once with NumPy"""
+    ad_spend = numpy.asarray(ad_spend, dtype=float)
+    revenue = numpy.asarray(revenue, dtype=float)
+    margin = numpy.asarray(margin, dtype=float)
+    conversions = numpy.asarray(conversions, dtype=float)
+    benchmark = numpy.asarray(benchmark, dtype=float)
+    
+    roas = revenue / ad_spend
+    has_margin = margin > 0
+    profit = numpy.where(has_margin, revenue * (margin / 100), numpy.nan)
+    net_profit = profit - ad_spend
+    break_even_roas = numpy.where(has_margin, 100 / numpy.where(has_margin, margin, 1), 1.0)
+    
+    return {
+        'roas': roas,
+        'profit': profit,
+        'net_profit': net_profit,
+        'roi': net_profit / ad_spend * 100,
+        'cpa': numpy.where(conversions > 0, ad_spend / numpy.maximum(conversions, 1), numpy.nan),
+        'break_even_roas': break_even_roas,
+        'performance_vs_industry': (roas - benchmark) / benchmark * 100,
+        'rating': numpy.searchsorted(roas_config.rating_bands, roas, side='right'),
+        'performance': numpy.searchsorted(roas_config.performance_bands, roas, side='right'),
+        'profitability': numpy.where(has_margin, roas > break_even_roas, -1),
+        'industry_position': numpy.sign(roas - benchmark).astype(int),
+        'scaling': numpy.searchsorted(roas_config.scaling_bands, roas, side='right'),
+        'recommendation_tier': numpy.searchsorted(roas_config.recommendation_bands, roas, side='right')
+    }
+
+
+def score_campaigns_python(ad_spend, revenue, margin, conversions, benchmark):
+    """Pure-Python fallback for score_campaigns_vectorized, returning the same columns as lists"""
+    nan = float('nan')
+    roas = [r / s for r, s in zip(revenue, ad_spend)]
+    profit = [r * (m / 100) if m > 0 else nan for r, m in zip(revenue, margin)]
+    net_profit = [p - s for p, s in zip(profit, ad_spend)]
+    break_even_roas = [100 / m if m > 0 else 1.0 for m in margin]
+    
+    return {
+        'roas': roas,
+        'profit': profit,
+        'net_profit': net_profit,
+        'roi': [n / s * 100 for n, s in zip(net_profit, ad_spend)],
+        'cpa': [s / c if c > 0 else nan for s, c in zip(ad_spend, conversions)],
+        'break_even_roas': break_even_roas,
+        'performance_vs_industry': [(r - b) / b * 100 for r, b in zip(roas, benchmark)],
+        'rating': [bisect.bisect_right(roas_config.rating_bands, r) for r in roas],
+        'performance': [bisect.bisect_right(roas_config.performance_bands, r) for r in roas],
+        'profitability': [int(r > e) if m > 0 else -1 for r, e, m in zip(roas, break_even_roas, margin)],
+        'industry_position': [(r > b) - (r < b) for r, b in zip(roas, benchmark)],
+        'scaling': [bisect.bisect_right(roas_config.scaling_bands, r) for r in roas],
+        'recommendation_tier': [bisect.bisect_right(roas_config.recommendation_bands, r) for r in roas]
+    }
+
+
+def optional_round(value, digits=2):
+    """Round a metric, reporting missing or zero values as None like /api/calculate-roas does"""
+    return round(value, digits) if value and value == value else None
+
+
+def score_campaigns(campaigns):
+    """Yield the /api/calculate-roas result for each campaign, computed column-wise"""
+    benchmarks = [roas_config.industry_benchmarks.get(c.industry, roas_config.default_benchmark) for c in campaigns]
+    score = score_campaigns_vectorized if numpy is not None else score_campaigns_python
+    columns = score(
+        [c.ad_spend for c in campaigns],
+        [c.revenue for c in campaigns],
+        [c.profit_margin for c in campaigns],
+        [c.conversions for c in campaigns],
+        benchmarks
+    )
+    if numpy is not None:
+        columns = {name: column.tolist() for name, column in columns.items()}
+    rows = zip(
+        campaigns, benchmarks, columns['roas'], columns['profit'], columns['net_profit'], columns['roi'],
+        columns['cpa'], columns['break_even_roas'], columns['performance_vs_industry'], columns['rating'],
+        columns['performance'], columns['profitability'], columns['industry_position'], columns['scaling'],
+        columns['recommendation_tier']
+    )
+    
+    # Only text assembly is left per row: every band was picked above
+    for (campaign, benchmark, roas, profit, net_profit, roi, cpa, break_even_roas, vs_industry, rating,
+         performance, profitability, position, scaling, tier) in rows:
+        insights = [roas_insight(PERFORMANCE_INSIGHTS[performance], roas)]
+        if profitability >= 0:
+            insights.append(roas_insight(PROFITABILITY_INSIGHTS[profitability], break_even_roas))
+        if position:
+            insights.append(roas_insight(INDUSTRY_INSIGHTS[position], abs(vs_industry)))
+        if scaling:
+            insights.append(SCALING_INSIGHTS[scaling])
+        
+        yield {
+            'roas': round(roas, 2),
+            'rating': roas_config.ratings[rating],
+            'metrics': {
+                'revenue': campaign.revenue,
+                'ad_spend': campaign.ad_spend,
+                'profit': optional_round(profit),
+                'net_profit': optional_round(net_profit),
+                'roi': optional_round(roi),
+                'cpa': optional_round(cpa),
+                'break_even_roas': round(break_even_roas, 2),
+                'conversions': campaign.conversions
+            },
+            'benchmark': {
+                'industry': campaign.industry,
+                'industry_average': benchmark,
+                'performance_vs_industry': round(vs_industry, 1)
+            },
+            'insights': insights,
+            'recommendations': RECOMMENDATIONS[(tier, bool(campaign.profit_margin), bool(campaign.conversions))],
+            'currency': campaign.currency
+        }
+
+
+def iter_campaign_rows(source):
+    """Yield raw input rows from a JSON array or a CSV text stream, numbered from 1"""
+    if isinstance(source, list):
+        rows = source
     else:
-        recommendations.extend([
-            'Scale winning campaigns gradually (20-30% increases)',
-            'Test lookalike audiences to expand reach',
-            'Experiment with new ad formats or channels'
-        ])
+        # Headers are matched loosely: "Ad Spend", "ad_spend" and "AD SPEND" are the same column
+        reader = csv.reader(source)
+        header = [column.strip().lower().replace(' ', '_') for column in next(reader, [])]
+        rows = (dict(zip(header, values)) for values in reader if any(values))
+    
+    for row_number, row in enumerate(rows, start=1):
+        yield row_number, row if isinstance(row, dict) else {}
+
+
+def iter_roas_results(source):
+    """Yield (row, campaign, result or None, error or None) for every input row in order, scoring in chunks"""
+    for chunk in iter_batches(itertools.islice(iter_campaign_rows(source), ROAS_BATCH_MAX_ROWS + 1),
+                              ROAS_BATCH_CHUNK_ROWS):
+        parsed = []
+        for row_number, row in chunk:
+            if row_number > ROAS_BATCH_MAX_ROWS:
+                error = f'Row limit of {ROAS_BATCH_MAX_ROWS} reached; later rows were not scored'
+                parsed.append((row_number, None, None, error))
+                break
+            try:
+                parsed.append(parse_campaign(row_number, row))
+            except ValueError as e:
+                parsed.append((row_number, row.get('campaign'), None, str(e)))
+        
+        with metrics.timer('extractor_stage_duration_seconds', stage='roas_batch'):
+            results = iter(list(score_campaigns([item for item in parsed if isinstance(item, Campaign)])))
+        for item in parsed:
+            if isinstance(item, Campaign):
+                yield item.row, item.campaign, next(results), None
+            else:
+                yield item
+
+
+def iter_roas_ndjson(results):
+    """Yield bulk ROAS results as NDJSON lines, ending with a summary line"""
+    totals = {'row_count': 0, 'failed_count': 0, 'ad_spend': 0.0, 'revenue': 0.0}
+    
+    for row_number, campaign, result, error in results:
+        totals['row_count'] += 1
+        if error:
+            totals['failed_count'] += 1
+            yield app.json.dumps({'type': 'campaign', 'row': row_number, 'campaign': campaign,
+                                  'success': False, 'error': error}) + '\n'
+            continue
+        totals['ad_spend'] += result['metrics']['ad_spend']
+        totals['revenue'] += result['metrics']['revenue']
+        yield app.json.dumps({'type': 'campaign', 'row': row_number, 'campaign': campaign,
+                              'success': True, 'data': result}) + '\n'
+    
+    yield app.json.dumps({
+        'type': 'summary',
+        'row_count': totals['row_count'],
+        'failed_count': totals['failed_count'],
+        'total_ad_spend': round(totals['ad_spend'], 2),
+        'total_revenue': round(totals['revenue'], 2),
+        'blended_roas': round(totals['revenue'] / totals['ad_spend'], 2) if totals['ad_spend'] else None
+    }) + '\n'
+
+
+def iter_roas_csv(results):
+    """Yield bulk ROAS results as CSV, one flattened row per input row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ROAS_CSV_COLUMNS)
     
-    # Always include monitoring
-    recommendations.append('Set up automated ROAS monitoring and alerts')
+    for row_number, campaign, result, error in results:
+        if error:
+            writer.writerow([row_number, campaign] + [''] * (len(ROAS_CSV_COLUMNS) - 3) + [error])
+        else:
+            metrics_data = result['metrics']
+            writer.writerow([
+                row_number, campaign, result['roas'], result['rating']['level'], metrics_data['revenue'],
+                metrics_data['ad_spend'], metrics_data['profit'], metrics_data['net_profit'], metrics_data['roi'],
+                metrics_data['cpa'], metrics_data['break_even_roas'], metrics_data['conversions'],
+                result['benchmark']['industry'], result['benchmark']['industry_average'],
+                result['benchmark']['performance_vs_industry'], result['currency'],
+                '; '.join(insight['title'] for insight in result['insights']), ''
+            ])
+        if buffer.tell() >= 65536:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
     
-    # Conditional recommendations
-    if not profit_margin or profit_margin == 0:
-        recommendations.append('Track profit margins to understand true profitability')
+    yield buffer.getvalue()
+
+
+@app.route('/api/calculate-roas/batch', methods=['POST'])
+def calculate_roas_batch():
+    """Score many campaigns from a JSON array or CSV upload, streaming one result per row"""
+    fmt = (request.args.get('format') or 'ndjson').lower()
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({
+            'success': False,
+            'error': 'format must be ndjson or csv'
+        }), 400
     
-    if not conversions or conversions == 0:
-        recommendations.append('Implement conversion tracking to calculate CPA')
+    if request.files:
+        # Multipart upload: the first file is the CSV
+        upload = next(iter(request.files.values()))
+        source = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    elif request.mimetype in ('text/csv', 'application/csv'):
+        source = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('campaigns')
+        if not isinstance(data, list) or not data:
+            return jsonify({
+                'success': False,
+                'error': 'Request body must be a CSV file or a non-empty JSON array of campaigns'
+            }), 400
+        if len(data) > ROAS_BATCH_MAX_ROWS:
+            return jsonify({
+                'success': False,
+                'error': f'A batch may contain at most {ROAS_BATCH_MAX_ROWS} campaigns'
+            }), 400
+        source = data
     
-    return recommendations
+    if fmt == 'csv':
+        return Response(
+            stream_with_context(iter_roas_csv(iter_roas_results(source))),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=roas_results.csv'}
+        )
+    return Response(stream_with_context(iter_roas_ndjson(iter_roas_results(source))), mimetype='application/x-ndjson')
 
 
 if __name__ == '__main__':
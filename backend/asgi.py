@@ -0,0 +1,525 @@
+"""
+LinkedIn Engagement Extractor - ASGI entry point
+Serves the same API under uvicorn, with /api/extract running natively on asyncio
+
+/api/extract waits on RapidAPI through an httpx.AsyncClient, so one process can hold hundreds
+of extractions in flight. Every other route is the Flask app, run on a thread pool.
+
+Run from the backend directory:
+    uvicorn asgi:application --host 0.0.0.0 --port 5001
+"""
+
+import asyncio
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import httpx
+except ImportError as e:
+    raise ImportError("The ASGI serving mode needs httpx and uvicorn: pip install -r requirements-optional.txt") from e
+
+import app
+from app import RapidAPIClient, RapidAPIError, metrics
+
+# Routes served by Flask run on this many threads; the async route does not use them
+ASGI_WSGI_THREADS = int(os.environ.get("ASGI_WSGI_THREADS", 32))
+RAPIDAPI_ASYNC_POOL_SIZE = int(os.environ.get("RAPIDAPI_ASYNC_POOL_SIZE", 100))
+ASYNC_POOL_SHARD_SIZE = 25
+
+wsgi_executor = ThreadPoolExecutor(max_workers=ASGI_WSGI_THREADS, thread_name_prefix="wsgi")
+
+
+class AsyncRapidAPIClient(RapidAPIClient):
+    """RapidAPIClient over httpx.AsyncClient, with the same retry, backoff, limiter and metrics"""
+
+    def __init__(self, base_url=app.RAPIDAPI_BASE_URL, headers=None, pool_size=RAPIDAPI_ASYNC_POOL_SIZE,
+                 limiter=None, **kwargs):
+        super().__init__(base_url=base_url, headers=headers, pool_size=pool_size, limiter=limiter, **kwargs)
+        # httpcore's pool bookkeeping grows with the square of its connection count, so the pool is
+        # split into small shards; each shard's semaphore keeps its queue inside httpcore short
+        shard_sizes = [ASYNC_POOL_SHARD_SIZE] * (pool_size // ASYNC_POOL_SHARD_SIZE)
+        if pool_size % ASYNC_POOL_SHARD_SIZE:
+            shard_sizes.append(pool_size % ASYNC_POOL_SHARD_SIZE)
+        self.shards = [
+            (
+                httpx.AsyncClient(
+                    headers=app.HEADERS if headers is None else headers,
+                    timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                    limits=httpx.Limits(max_connections=size, max_keepalive_connections=size)
+                ),
+                asyncio.Semaphore(size)
+            )
+            for size in shard_sizes
+        ]
+        self.next_shard = itertools.cycle(self.shards)
+        # Quota headers are written to the limiter's SQLite file off the loop, latest value wins
+        self.pending_quota = None
+        self.quota_writer = None
+
+    def _open_session(self, headers, pool_size):
+        """Requests go through the httpx shards, so no requests session is opened"""
+        return None
+
+    async def acquire(self, lane):
+        """Wait for a rate limit token without blocking the event loop"""
+        started = time.perf_counter()
+        while True:
+            wait_seconds = await asyncio.to_thread(self.limiter.try_acquire, lane)
+            waited = time.perf_counter() - started
+            if not wait_seconds:
+                metrics.observe('extractor_rate_limit_wait_seconds', waited, lane=lane)
+                return
+            if waited + wait_seconds > self.limiter.max_wait:
+                metrics.observe('extractor_rate_limit_wait_seconds', waited, lane=lane)
+                raise RapidAPIError('Upstream rate limit budget exhausted, try again shortly', status_code=429)
+            await asyncio.sleep(min(wait_seconds, 1.0))
+
+    def _record_quota(self, remaining, limit):
+        """Queue the reported quota for the background writer instead of writing SQLite on the loop"""
+        self.pending_quota = (remaining, limit)
+        if self.quota_writer is None or self.quota_writer.done():
+            self.quota_writer = asyncio.get_running_loop().create_task(self._flush_quota())
+
+    async def _flush_quota(self):
+        """Write queued quota updates on a thread until none are left"""
+        while self.pending_quota is not None:
+            remaining, limit = self.pending_quota
+            self.pending_quota = None
+            try:
+                await asyncio.to_thread(self.limiter.record_quota, remaining, limit)
+            except Exception as e:
+                app.app.logger.warning("Quota update failed: %s", e)
+
+    async def get(self, path, params=None, lane='interactive'):
+        """GET an endpoint and return its JSON body, retrying 429/5xx and connection errors"""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        endpoint = path.strip('/')
+        
+        for attempt in range(self.max_retries + 1):
+            response = None
+            if self.limiter is not None and self.limiter.enabled:
+                await self.acquire(lane)
+            started = time.perf_counter()
+            try:
+                http, slots = next(self.next_shard)
+                async with slots:
+                    response = await http.get(url, params=params)
+            except httpx.TransportError as e:
+                error = RapidAPIError(f"Request to {path} failed: {e}")
+                self._record(endpoint, 'error', started)
+            else:
+                self._record(endpoint, response.status_code, started, response)
+                if response.status_code == 200:
+                    data = response.json()
+                    if self.recorder is not None:
+                        await asyncio.to_thread(self.recorder.save, endpoint, params, data, time.perf_counter() - started)
+                    return data
+                error = RapidAPIError(
+                    f"{path} returned HTTP {response.status_code}: {response.text[:200]}",
+                    status_code=response.status_code
+                )
+                if response.status_code not in self.RETRY_STATUSES:
+                    raise error
+                if response.status_code == 429 and self.limiter is not None:
+                    await asyncio.to_thread(self.limiter.drain)
+            
+            if attempt < self.max_retries:
+                metrics.inc('extractor_upstream_retries_total', endpoint=endpoint)
+                delay = self._backoff_delay(attempt, response)
+                app.app.logger.info("Retrying %s in %.2fs (%s)", path, delay, error)
+                await asyncio.sleep(delay)
+        
+        raise error
+
+    async def aclose(self):
+        """Release pooled connections once queued quota updates are written"""
+        if self.quota_writer is not None:
+            await self.quota_writer
+        for http, _ in self.shards:
+            await http.aclose()
+
+
+class AsyncReplayClient:
+    """Async front for app.ReplayRapidAPIClient: the same fixtures and synthetic posts, waited out on the loop"""
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    async def get(self, path, params=None, lane='interactive'):
+        """Return a replayed response after its latency; raises RapidAPIError when there is none"""
+        endpoint = path.strip('/')
+        started = time.perf_counter()
+        try:
+            body, latency = await asyncio.to_thread(self.replay.respond, path, params)
+        except RapidAPIError as e:
+            self.replay._record(endpoint, e.status_code, started)
+            raise
+        await asyncio.sleep(latency)
+        self.replay._record(endpoint, 200, started)
+        return body
+
+    async def aclose(self):
+        self.replay.close()
+
+
+async_client = None
+inflight = {}
+
+
+def get_async_client():
+    """Create the async client on first use, pointed wherever app.rapidapi_client points"""
+    global async_client
+    if async_client is None:
+        if isinstance(app.rapidapi_client, app.ReplayRapidAPIClient):
+            async_client = AsyncReplayClient(app.rapidapi_client)
+        else:
+            async_client = AsyncRapidAPIClient(base_url=app.rapidapi_client.base_url, limiter=app.rapidapi_client.limiter,
+                                               recorder=app.rapidapi_client.recorder)
+    return async_client
+
+
+async def cache_call(method, *args):
+    """Call a response cache method, on a thread when the cache is backed by SQLite"""
+    if app.response_cache.db_path:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+async def fetch_post_page(kind, activity_id, page, pagination_token=None, lane='interactive'):
+    """Fetch one page of reactions or comments, served from the response cache when possible"""
+    cache_key = f"{kind}:{activity_id}:{page}"
+    cached = await cache_call(app.response_cache.get, cache_key)
+    if cached is not None:
+        return cached
+    
+    params = {'urn': activity_id, 'page': page}
+    if pagination_token:
+        params['pagination_token'] = pagination_token
+    
+    data = await get_async_client().get(f'get-post-{kind}', params=params, lane=lane) or {}
+    
+    if data.get('message') == 'ok' or data.get('data'):
+        await cache_call(app.response_cache.set, cache_key, data)
+    
+    return data
+
+
+async def iter_prefetched_pages(kind, activity_id, pages, lane='interactive'):
+    """Yield each page's items in order while a bounded window of later pages loads concurrently"""
+    pages = iter(pages)
+    window = deque(
+        asyncio.ensure_future(fetch_post_page(kind, activity_id, page, lane=lane))
+        for page in itertools.islice(pages, app.PAGE_PREFETCH_WORKERS)
+    )
+    
+    try:
+        while window:
+            items = app.page_items(await window.popleft())
+            next_page = next(pages, None)
+            if next_page is not None:
+                window.append(asyncio.ensure_future(fetch_post_page(kind, activity_id, next_page, lane=lane)))
+            if not items:
+                return
+            yield items
+    finally:
+        for task in window:
+            task.cancel()
+
+
+async def iter_post_pages(kind, activity_id, lane='interactive'):
+    """Yield a post's reaction or comment items a page at a time, planned like app.iter_post_pages"""
+    first_page = await fetch_post_page(kind, activity_id, 1, lane=lane)
+    items = app.page_items(first_page)
+    if items:
+        yield items
+    
+    mode, pages = app.plan_remaining_pages(first_page, items, app.RAPIDAPI_MAX_PAGES)
+    if mode == 'cursor':
+        token = first_page.get('pagination_token')
+        for page in pages:
+            if not token:
+                return
+            page_data = await fetch_post_page(kind, activity_id, page, token, lane=lane)
+            items = app.page_items(page_data)
+            if not items:
+                return
+            yield items
+            token = page_data.get('pagination_token')
+    elif mode == 'probe':
+        for page in pages:
+            items = app.page_items(await fetch_post_page(kind, activity_id, page, lane=lane))
+            if not items:
+                return
+            yield items
+    elif mode == 'total':
+        # PAGE_PREFETCH_WORKERS pages are fetched concurrently
+        pages = iter_prefetched_pages(kind, activity_id, pages, lane)
+        try:
+            async for items in pages:
+                yield items
+        finally:
+            await pages.aclose()
+
+
+async def collect_post_profiles(kind, activity_id, engagement_type, lane='interactive'):
+    """Extract profiles page by page as they arrive, keeping those gathered before any upstream failure"""
+    started = time.perf_counter()
+    profiles = []
+    totals = [0.0, 0]
+    error = None
+    
+    pages = iter_post_pages(kind, activity_id, lane)
+    try:
+        async for items in pages:
+            profiles.extend(app.iter_profiles(items, engagement_type, totals))
+    except Exception as e:
+        error = e
+    finally:
+        await pages.aclose()
+    
+    app.record_extraction(engagement_type, *totals)
+    return profiles, error, round((time.perf_counter() - started) * 1000, 1)
+
+
+async def fetch_post_engagement_upstream(post_url, activity_id, lane='interactive'):
+    """Async counterpart of app.fetch_post_engagement_upstream, returning the same result shape"""
+    errors = []
+    
+    started = time.perf_counter()
+    (reaction_profiles, reactions_error, reactions_ms), (comment_profiles, comments_error, comments_ms) = (
+        await asyncio.gather(
+            collect_post_profiles('reactions', activity_id, 'reaction', lane),
+            collect_post_profiles('comments', activity_id, 'comment', lane)
+        )
+    )
+    timings = {
+        'reactions_ms': reactions_ms,
+        'comments_ms': comments_ms,
+        'total_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+    
+    if reactions_error:
+        errors.append(f"Error fetching reactions: {str(reactions_error)}")
+    if comments_error:
+        errors.append(f"Error fetching comments: {str(comments_error)}")
+    
+    with metrics.timer('extractor_stage_duration_seconds', stage='dedup'):
+        unique_profiles = app.deduplicate_profiles(reaction_profiles + comment_profiles)
+    
+    result = {
+        'profiles': unique_profiles,
+        'reaction_count': len(reaction_profiles),
+        'comment_count': len(comment_profiles),
+        'errors': errors,
+        'timings': timings
+    }
+    app.index_audience(post_url, result)
+    return result
+
+
+async def fetch_post_engagement(post_url, lane='interactive'):
+    """Fetch a post's engagement, sharing one in-flight fetch between concurrent requests for it"""
+    activity_id = app.extract_post_id(post_url)
+    if not activity_id:
+        return {'profiles': [], 'reaction_count': 0, 'comment_count': 0, 'errors': [],
+                'timings': {'reactions_ms': 0.0, 'comments_ms': 0.0, 'total_ms': 0.0}}
+    
+    task = inflight.get(activity_id)
+    if task is None:
+        task = inflight[activity_id] = asyncio.ensure_future(
+            fetch_post_engagement_upstream(post_url, activity_id, lane)
+        )
+        task.add_done_callback(lambda _: inflight.pop(activity_id, None))
+    else:
+        metrics.inc('extractor_coalesced_requests_total', scope='worker')
+    
+    # Shielded so one client disconnecting does not cancel the fetch others are waiting on
+    return await asyncio.shield(task)
+
+
+async def read_body(receive):
+    """Read the full request body"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def send_json(send, scope, payload, status=200):
+    """Send a JSON response serialized and compressed like the Flask app's responses"""
+    body = app.app.json.dumps_bytes(payload) + b'\n'
+    request_headers = dict(scope.get('headers', []))
+    headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding')]
+    
+    encoding = app.negotiate_encoding(request_headers.get(b'accept-encoding', b'').decode('latin-1'))
+    if app.RESPONSE_COMPRESSION and encoding and len(body) >= app.RESPONSE_COMPRESSION_MIN_BYTES:
+        body = app.compress_body(body, encoding)
+        headers.append((b'content-encoding', encoding.encode()))
+    
+    headers.append((b'content-length', str(len(body)).encode()))
+    if b'origin' in request_headers:
+        headers.append((b'access-control-allow-origin', b'*'))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+    return status
+
+
+async def extract_engagement(scope, receive, send):
+    """Async /api/extract with the same request and response contract as the Flask view"""
+    try:
+        try:
+            data = json.loads(await read_body(receive) or b'null')
+        except ValueError:
+            data = None
+        
+        if not data or not isinstance(data, dict):
+            return await send_json(send, scope, {
+                'success': False,
+                'error': 'Request body is required'
+            }, 400)
+        
+        post_url = data.get('post_url', '').strip()
+        
+        with metrics.timer('extractor_stage_duration_seconds', stage='validate'):
+            is_valid, message = app.validate_linkedin_post_url(post_url)
+        if not is_valid:
+            return await send_json(send, scope, {
+                'success': False,
+                'error': message
+            }, 400)
+        
+        # The incremental path is SQLite-bound and pages sequentially; it stays on a thread
+        if data.get('incremental'):
+            result = await asyncio.to_thread(app.fetch_post_engagement_incremental, post_url)
+            build_payload = app.incremental_extract_payload
+        else:
+            result = await fetch_post_engagement(post_url)
+            build_payload = app.extract_payload
+        
+        # Enrichment shares the Flask app's lookup pool, cache and in-flight lookups
+        if data.get('enrich') and result['profiles']:
+            result = await asyncio.to_thread(app.enrich_or_queue, post_url, result)
+        
+        payload = build_payload(post_url, result)
+        if 'enrichment' in result:
+            payload['enrichment'] = result['enrichment']
+        
+        with metrics.timer('extractor_stage_duration_seconds', stage='serialize'):
+            return await send_json(send, scope, payload)
+    
+    except Exception as e:
+        return await send_json(send, scope, {
+            'success': False,
+            'error': f'An unexpected error occurred: {str(e)}'
+        }, 500)
+
+
+def build_environ(scope, body):
+    """Build a WSGI environ from an ASGI HTTP scope and the request body"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        key = {'content-type': 'CONTENT_TYPE', 'content-length': 'CONTENT_LENGTH'}.get(
+            name, f"HTTP_{name.upper().replace('-', '_')}"
+        )
+        value = value.decode('latin-1')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def wsgi_bridge(scope, receive, send):
+    """Run the Flask app for one request on the WSGI thread pool, streaming its response"""
+    environ = build_environ(scope, await read_body(receive))
+    loop = asyncio.get_running_loop()
+
+    def send_from_thread(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def run():
+        response_start = {}
+        
+        def start_response(status, headers, exc_info=None):
+            response_start['status'] = int(status.split(' ', 1)[0])
+            response_start['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+            return lambda data: send_from_thread({'type': 'http.response.body', 'body': data, 'more_body': True})
+        
+        def flush_start():
+            if 'status' in response_start:
+                send_from_thread({'type': 'http.response.start', **response_start})
+                response_start.clear()
+        
+        result = app.app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    flush_start()
+                    send_from_thread({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            flush_start()
+            send_from_thread({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    
+    await loop.run_in_executor(wsgi_executor, run)
+
+
+async def lifespan(receive, send):
+    """Close the async upstream client when the server shuts down"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if async_client is not None:
+                await async_client.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI entry point: async /api/extract, everything else through the Flask app"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    
+    if scope['type'] != 'http':
+        return
+    
+    if scope['method'] == 'POST' and scope['path'] == '/api/extract':
+        started = time.perf_counter()
+        app.ensure_watchlist_scheduled()
+        status = await extract_engagement(scope, receive, send)
+        metrics.inc('extractor_http_requests_total', route='/api/extract', method='POST', status=status)
+        metrics.observe('extractor_http_request_duration_seconds', time.perf_counter() - started, route='/api/extract')
+        return
+    
+    await wsgi_bridge(scope, receive, send)
@@ -0,0 +1,118 @@
+"""
+Micro-benchmark: /api/extract response encoding, Flask's default JSON provider vs FastJSONProvider
+
+Builds an extract response body with merged profiles in the shape the API returns, then times
+jsonify through the stock provider, FastJSONProvider with orjson and FastJSONProvider on the
+stdlib encoder, and reports body sizes and compression times for gzip and br.
+
+Run from the backend directory:
+    python -m benchmarks.bench_json --profiles 10000
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import app
+
+
+def extract_body(count, seed=7):
+    """An /api/extract success body with count merged profiles"""
+    rng = random.Random(seed)
+    words = ['Growth', 'Marketing', 'Lead', 'Founder', 'Engineer', 'Sales', 'Café', 'Product', 'B2B', 'Ops']
+    profiles = []
+    for i in range(count):
+        comments = tuple(f"Great post {j}, {' '.join(rng.sample(words, 4))}" for j in range(rng.choice([0, 0, 0, 1, 2])))
+        engagement_types = ('reaction',) + (('comment',) if comments else ())
+        profiles.append(app.MergedProfile(
+            profile_url=f'https://www.linkedin.com/in/person-{i}-{rng.randrange(16 ** 6):06x}',
+            name=f'Person {i}',
+            headline=' | '.join(rng.sample(words, 3)),
+            engagement_type='reaction',
+            reaction_type=rng.choice(['LIKE', 'PRAISE', 'EMPATHY', 'INTEREST']),
+            profile_picture=f'https://media.licdn.com/dms/image/{rng.randrange(16 ** 12):012x}/profile.jpg',
+            engagement_types=engagement_types,
+            reaction_types=('LIKE',),
+            comments=comments
+        ))
+
+    return app.extract_payload('https://www.linkedin.com/feed/update/urn:li:activity:7100000000000000000/', {
+        'profiles': profiles,
+        'reaction_count': count,
+        'comment_count': sum(1 for profile in profiles if profile.comments),
+        'errors': [],
+        'timings': {'total_ms': 1234.5, 'reactions_ms': 1100.2, 'comments_ms': 980.1}
+    })
+
+
+def best_time(func, repeat):
+    """Best wall time of func() and its last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    body = extract_body(args.profiles)
+
+    stock_app = Flask('bench_json')
+    stock_app.json = DefaultJSONProvider(stock_app)
+    fast = app.FastJSONProvider(app.app)
+    stdlib = app.FastJSONProvider(app.app)
+    stdlib.use_orjson = False
+
+    encoders = [('flask default', stock_app, stock_app.json)]
+    if fast.use_orjson:
+        encoders.append(('fast, orjson', app.app, fast))
+    else:
+        print('orjson is not installed; skipping the orjson encoder')
+    encoders.append(('fast, stdlib', app.app, stdlib))
+
+    # jsonify is timed end to end: body preparation, encoding and the Response object
+    results = []
+    for name, flask_app, provider in encoders:
+        with flask_app.app_context():
+            seconds, data = best_time(lambda: provider.response(body).get_data(), args.repeat)
+        results.append((name, seconds, data))
+
+    reference = json.loads(results[0][2])
+    for name, _, data in results[1:]:
+        if json.loads(data) != reference:
+            print(f"{name}: payload differs from the default provider")
+
+    print(f"Body: {args.profiles:,} profiles")
+    print(f"{'encoder':<16}{'ms':>10}{'MB/s':>9}{'bytes':>12}{'speedup':>9}")
+    baseline = results[0][1]
+    for name, seconds, data in results:
+        print(f"{name:<16}{seconds * 1000:>10.1f}{len(data) / seconds / 1e6:>9.0f}{len(data):>12,}{baseline / seconds:>8.1f}x")
+
+    # Compression of the body the app now sends
+    data = results[1][2] if fast.use_orjson else results[-1][2]
+    codecs = [('gzip', lambda: gzip.compress(data, compresslevel=app.GZIP_LEVEL, mtime=0))]
+    if app.brotli is not None:
+        codecs.append(('br', lambda: app.brotli.compress(data, quality=app.BROTLI_QUALITY)))
+    else:
+        print('brotli is not installed; skipping br')
+
+    print(f"{'encoding':<16}{'ms':>10}{'bytes':>12}{'ratio':>9}")
+    print(f"{'identity':<16}{0:>10.1f}{len(data):>12,}{1:>8.1f}x")
+    for name, compress in codecs:
+        seconds, compressed = best_time(compress, args.repeat)
+        print(f"{name:<16}{seconds * 1000:>10.1f}{len(compressed):>12,}{len(data) / len(compressed):>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
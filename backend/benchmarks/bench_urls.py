@@ -0,0 +1,176 @@
+"""
+Micro-benchmark: single-pass post URL parser vs the original validate + extract regex loops
+
+Builds a corpus of post URL variants (share links, feed/update URNs, embeds, pulse articles,
+tracking parameters, country subdomains, encoded URNs and non-post URLs), reports where the two
+implementations disagree by post type, and times both.
+
+Differences by design: percent-encoded activity URNs now yield their ID, and ugcPost IDs, which the
+original sent upstream as an activity urn, are rejected along with share URNs.
+
+Run from the backend directory:
+    python -m benchmarks.bench_urls --urls 100000
+"""
+
+import argparse
+import random
+import re
+import time
+
+import app
+
+# fetch_post_engagement, get_post_reactions and get_post_comments each look the ID up
+ID_LOOKUPS_PER_REQUEST = 3
+
+
+def legacy_validate_linkedin_post_url(url):
+    """The original validator, kept verbatim for comparison"""
+    if not url:
+        return False, "URL is required"
+
+    patterns = [
+        r'linkedin\.com/posts/',
+        r'linkedin\.com/feed/update/',
+        r'linkedin\.com/pulse/',
+        r'linkedin\.com/embed/feed/update/'
+    ]
+
+    for pattern in patterns:
+        if re.search(pattern, url):
+            return True, "Valid LinkedIn post URL"
+
+    return False, "Invalid LinkedIn post URL. Please provide a valid LinkedIn post or activity URL."
+
+
+def legacy_extract_post_id(url):
+    """The original ID extractor, kept verbatim for comparison"""
+    patterns = [
+        r'activity[:-](\d+)',
+        r'ugcPost[:-](\d+)',
+        r'update/urn:li:activity:(\d+)',
+        r'update/urn:li:ugcPost:(\d+)',
+        r'-(\d{19,20})-',
+        r'-(\d{19,20})(?:\?|$)',
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+
+    return None
+
+
+def legacy_request(url):
+    """URL work of one /api/extract request with the original functions: validate, then the ID lookups"""
+    is_valid, _ = legacy_validate_linkedin_post_url(url)
+    if is_valid:
+        for _ in range(ID_LOOKUPS_PER_REQUEST):
+            post_id = legacy_extract_post_id(url)
+        return True, post_id
+    return False, None
+
+
+def new_request(url):
+    """The same request with the single-pass parser; repeat lookups hit its cache"""
+    is_valid, _ = app.validate_linkedin_post_url(url)
+    if is_valid:
+        for _ in range(ID_LOOKUPS_PER_REQUEST):
+            post_id = app.extract_post_id(url)
+        return True, post_id
+    return False, None
+
+
+def url_corpus(count, seed=7):
+    """Random but reproducible post URL variants"""
+    rng = random.Random(seed)
+    hosts = ['https://www.linkedin.com', 'https://linkedin.com', 'http://www.linkedin.com',
+             'https://uk.linkedin.com', 'https://de.linkedin.com', 'www.linkedin.com']
+    queries = ['', '', '?utm_source=share&utm_medium=member_desktop', '?trk=public_post',
+               '?originalSubdomain=uk', '#comments']
+    words = ['growth', 'marketing', 'hiring', 'ai', 'launch', 'lessons', 'team', 'product', 'b2b', 'q3']
+
+    def slug():
+        return '-'.join(rng.choice(words) for _ in range(rng.randint(2, 8)))
+
+    def post_id():
+        return str(rng.randint(7000000000000000000, 7399999999999999999))
+
+    forms = [
+        lambda: f"/posts/{rng.choice(['jane-doe', 'acme-inc', 'john-smith-1a2b3c'])}_{slug()}-activity-{post_id()}-{rng.choice(['abcd', 'XyZ1', 'Q9rT'])}",
+        lambda: f"/posts/{rng.choice(['jane-doe', 'acme-inc'])}_{slug()}-ugcPost-{post_id()}-{rng.choice(['abcd', 'XyZ1'])}",
+        lambda: f"/feed/update/urn:li:activity:{post_id()}/",
+        lambda: f"/feed/update/urn:li:ugcPost:{post_id()}",
+        lambda: f"/feed/update/urn:li:share:{post_id()}/",
+        lambda: f"/feed/update/urn%3Ali%3Aactivity%3A{post_id()}/",
+        lambda: f"/embed/feed/update/urn:li:share:{post_id()}",
+        lambda: f"/pulse/{slug()}-{rng.choice(['jane-doe', 'acme'])}",
+        lambda: f"/pulse/{slug()}-{post_id()}",
+        lambda: f"/posts/{slug()}",
+        lambda: f"/in/{rng.choice(['jane-doe', 'john-smith'])}/",
+        lambda: f"/company/{rng.choice(['acme', 'globex'])}/posts/",
+    ]
+
+    return [rng.choice(hosts) + rng.choice(forms)() + rng.choice(queries) for _ in range(count)]
+
+
+def best_time(func, urls, repeat):
+    """Best wall time of calling func over every URL"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for url in urls:
+            func(url)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    urls = url_corpus(args.urls)
+    unique_urls = len(set(urls))
+
+    # Compare what each implementation makes of every URL: recognised as a post URL, and the ID found
+    disagreements = {}
+    for url in urls:
+        legacy_valid = legacy_validate_linkedin_post_url(url)[0]
+        legacy = (legacy_valid, legacy_extract_post_id(url) if legacy_valid else None)
+        parsed = app.parse_linkedin_post_url(url)
+        new = (parsed is not None, app.extract_post_id(url))
+        if legacy != new:
+            key = (parsed.post_type if parsed else '-', legacy[1] is not None, new[1] is not None)
+            count, example = disagreements.get(key, (0, url))
+            disagreements[key] = (count + 1, example)
+
+    print(f"Corpus: {len(urls):,} URLs ({unique_urls:,} unique)")
+    print(f"URLs where the parser differs from the original: {sum(count for count, _ in disagreements.values()):,}")
+    for (post_type, legacy_has_id, new_has_id), (count, url) in sorted(disagreements.items()):
+        print(f"  {post_type:<9} legacy ID={legacy_has_id!s:<5} new ID={new_has_id!s:<5} {count:>7,}  e.g. {url}")
+
+    def cold(func):
+        # The parse cache is cleared before every run, so each request's first lookup parses
+        best = float('inf')
+        for _ in range(args.repeat):
+            app.parse_linkedin_post_url.cache_clear()
+            best = min(best, best_time(func, urls, 1))
+        return best
+
+    results = [
+        ('parse only, legacy', cold(lambda url: legacy_validate_linkedin_post_url(url)[0] and legacy_extract_post_id(url))),
+        ('parse only, single pass', cold(lambda url: app.parse_linkedin_post_url.__wrapped__(url))),
+        ('per request, legacy', best_time(legacy_request, urls, args.repeat)),
+        ('per request, single pass', cold(new_request))
+    ]
+
+    print(f"{'implementation':<28}{'total ms':>10}{'ns/url':>10}{'speedup':>9}")
+    for index, (name, seconds) in enumerate(results):
+        baseline = results[index - index % 2][1]
+        print(f"{name:<28}{seconds * 1000:>10.1f}{seconds / len(urls) * 1e9:>10.0f}{baseline / seconds:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
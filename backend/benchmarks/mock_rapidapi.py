@@ -0,0 +1,147 @@
+"""
+Local stand-in for the RapidAPI LinkedIn endpoints
+
+Replays the recorded payloads in sample_responses/, cycling their items with unique
+profile URLs so a post can be any size. Latency, page size and error rate are configurable.
+
+Run standalone and point the backend at it:
+    python -m benchmarks.mock_rapidapi --port 8099 --items-per-post 2000
+    RAPIDAPI_BASE_URL=http://127.0.0.1:8099 python app.py
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from sample_data import SAMPLE_ENDPOINTS as ENDPOINTS, load_sample_items, unique_item
+
+
+class MockRapidAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the replay configuration"""
+    daemon_threads = True
+
+    def __init__(self, address, items_per_post=100, comments_ratio=0.1, page_size=100,
+                 latency_ms=150.0, jitter_ms=50.0, error_rate=0.0):
+        super().__init__(address, MockRapidAPIHandler)
+        self.items_per_post = items_per_post
+        self.comments_ratio = comments_ratio
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.post_sizes = {}
+        self.recorded = {endpoint: load_sample_items(endpoint) for endpoint in ENDPOINTS}
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def total_for(self, endpoint, urn):
+        """Number of items the given post has for an endpoint"""
+        size = self.post_sizes.get(urn, self.items_per_post)
+        if endpoint == 'get-post-comments':
+            return int(size * self.comments_ratio)
+        return size - int(size * self.comments_ratio)
+
+    def page(self, endpoint, urn, page):
+        """Build one page of a post's reactions or comments"""
+        total = self.total_for(endpoint, urn)
+        start = (page - 1) * self.page_size
+        recorded = self.recorded[endpoint]
+        items = [
+            unique_item(recorded[index % len(recorded)], index)
+            for index in range(start, min(start + self.page_size, total))
+        ]
+        return {'data': items, 'message': 'ok', 'total': total}
+
+
+class MockRapidAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        endpoint = parsed.path.strip('/')
+        query = parse_qs(parsed.query)
+
+        with server.lock:
+            server.request_count += 1
+
+        latency = max(0.0, random.gauss(server.latency_ms, server.jitter_ms)) / 1000
+        time.sleep(latency)
+
+        if endpoint not in ENDPOINTS or 'urn' not in query:
+            return self.respond(404, {'message': 'not found'})
+
+        if random.random() < server.error_rate:
+            return self.respond(random.choice((429, 503)), {'message': 'injected error'}, {'Retry-After': '0'})
+
+        try:
+            page = max(1, int(query.get('page', ['1'])[0]))
+        except ValueError:
+            page = 1
+
+        self.respond(200, server.page(endpoint, query['urn'][0], page))
+
+    def respond(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host='127.0.0.1', port=0, **config):
+    """Start the mock server on a background thread and return it"""
+    server = MockRapidAPIServer((host, port), **config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def pages_for(size, page_size):
+    """Number of upstream pages a post of the given size spans"""
+    return max(1, math.ceil(size / page_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--items-per-post', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=150.0)
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockRapidAPIServer(
+        (args.host, args.port),
+        items_per_post=args.items_per_post,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate
+    )
+    print(f"Mock RapidAPI listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
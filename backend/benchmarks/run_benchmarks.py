@@ -0,0 +1,223 @@
+"""
+Benchmark suite for the extraction API, run against the local RapidAPI stand-in
+
+Scenarios cover /api/extract, CSV export and /api/calculate-roas at several post sizes and
+concurrency levels. Results are printed as a table and written as JSON (p50/p95/p99 latency
+and throughput per scenario) so runs on different commits can be compared.
+
+Run from the backend directory:
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --quick --compare bench.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import app
+from benchmarks.mock_rapidapi import pages_for, start_mock_server
+
+activity_ids = itertools.count(7100000000000000000)
+thread_state = threading.local()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def client():
+    """Flask test client, one per benchmark thread"""
+    if not hasattr(thread_state, 'client'):
+        thread_state.client = app.app.test_client()
+    return thread_state.client
+
+
+def run_scenario(name, make_request, requests_count, concurrency, **params):
+    """Issue requests_count requests with the given concurrency and summarize latencies"""
+    def timed(index):
+        started = time.perf_counter()
+        try:
+            response = make_request(client(), index)
+            response.get_data()
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests_count)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'name': name,
+        **params,
+        'concurrency': concurrency,
+        'requests': requests_count,
+        'errors': sum(1 for _, ok in results if not ok),
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'throughput_rps': round(requests_count / elapsed, 2)
+    }
+
+
+def extract_request(server, size):
+    """Request factory for /api/extract on a fresh post of the given size"""
+    def make_request(test_client, index):
+        activity_id = str(next(activity_ids))
+        server.post_sizes[activity_id] = size
+        return test_client.post('/api/extract', json={
+            'post_url': f'https://www.linkedin.com/feed/update/urn:li:activity:{activity_id}/'
+        })
+    return make_request
+
+
+def csv_request(size):
+    """Request factory for /api/download/csv with size profiles"""
+    profiles = [
+        {
+            'profile_url': f'https://www.linkedin.com/in/person-{i}',
+            'name': f'Person {i}',
+            'headline': f'Role {i % 97}, "Company" {i % 13}',
+            'engagement_type': 'reaction' if i % 10 else 'comment',
+            'reaction_type': 'LIKE' if i % 10 else '',
+            'comment_text': '' if i % 10 else f'Comment {i}\nwith a second line'
+        }
+        for i in range(size)
+    ]
+    return lambda test_client, index: test_client.post('/api/download/csv', json={'profiles': profiles})
+
+
+def roas_request(test_client, index):
+    """Request factory for /api/calculate-roas with varied inputs"""
+    rng = random.Random(index)
+    return test_client.post('/api/calculate-roas', json={
+        'ad_spend': rng.uniform(100, 10000),
+        'revenue': rng.uniform(0, 60000),
+        'profit_margin': rng.choice([0, 20, 35, 60]),
+        'conversions': rng.randint(0, 500),
+        'industry': rng.choice(['general', 'ecommerce', 'saas', 'b2b'])
+    })
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    """Print results, with p50/p95 deltas against a baseline run when given"""
+    previous = {}
+    for result in (baseline or {}).get('scenarios', []):
+        previous[(result['name'], result.get('size'), result['concurrency'])] = result
+
+    header = f"{'scenario':<10}{'size':>8}{'conc':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}{'err':>5}"
+    print(header + ('   Δp50     Δp95' if baseline else ''))
+    for result in results:
+        line = (f"{result['name']:<10}{result.get('size', ''):>8}{result['concurrency']:>6}"
+                f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                f"{result['throughput_rps']:>9.1f}{result['errors']:>5}")
+        before = previous.get((result['name'], result.get('size'), result['concurrency']))
+        if before:
+            line += (f"{(result['p50_ms'] / before['p50_ms'] - 1) * 100:>+7.1f}%"
+                     f"{(result['p95_ms'] / before['p95_ms'] - 1) * 100:>+8.1f}%")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,1000,5000', help='engagements per post for extract scenarios')
+    parser.add_argument('--csv-sizes', default='1000,10000,50000', help='profiles per CSV export')
+    parser.add_argument('--concurrency', default='1,8', help='concurrency levels')
+    parser.add_argument('--requests', type=int, default=20, help='requests per scenario')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=150.0)
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--quick', action='store_true', help='small sizes and few requests for a smoke run')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--compare', help='baseline JSON results to diff against')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.sizes, args.csv_sizes, args.concurrency, args.requests = '100,500', '1000', '1,4', 8
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    csv_sizes = [int(size) for size in args.csv_sizes.split(',')]
+    concurrency_levels = [int(level) for level in args.concurrency.split(',')]
+
+    server = start_mock_server(
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate
+    )
+
+    # Route upstream traffic to the mock and measure cold paths only
+    app.rapidapi_client = app.RapidAPIClient(base_url=server.base_url, backoff_base=0.05)
+    app.response_cache = app.ResponseCache(ttl_seconds=0)
+    app.RAPIDAPI_MAX_PAGES = max(app.RAPIDAPI_MAX_PAGES, pages_for(max(sizes), args.page_size))
+
+    results = []
+    for concurrency in concurrency_levels:
+        for size in sizes:
+            results.append(run_scenario('extract', extract_request(server, size), args.requests, concurrency,
+                                        size=size, pages=pages_for(size, args.page_size)))
+        for size in csv_sizes:
+            results.append(run_scenario('csv', csv_request(size), args.requests, concurrency, size=size))
+        results.append(run_scenario('roas', roas_request, args.requests * 10, concurrency))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'mock': {
+                'page_size': args.page_size,
+                'latency_ms': args.latency_ms,
+                'jitter_ms': args.jitter_ms,
+                'error_rate': args.error_rate,
+                'upstream_requests': server.request_count
+            }
+        },
+        'scenarios': results
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Sample RapidAPI engagement payloads, shared by replay mode and the benchmark mock server
+
+sample_responses/ holds one recorded response per post endpoint. Synthetic posts of any size
+cycle its items, giving each copy a profile URL unique to its position in the post.
+"""
+
+import json
+import os
+
+SAMPLE_RESPONSES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_responses')
+SAMPLE_ENDPOINTS = ('get-post-reactions', 'get-post-comments')
+
+
+def load_sample_items(endpoint):
+    """Return the recorded items for an endpoint"""
+    with open(os.path.join(SAMPLE_RESPONSES_DIR, f'{endpoint}.json'), encoding='utf-8') as f:
+        return json.load(f)['data']
+
+
+def unique_item(template, index):
+    """Copy a recorded item, giving it a profile URL unique to index"""
+    item = dict(template)
+    for key in ('reactor', 'commenter', 'author'):
+        if isinstance(item.get(key), dict):
+            item[key] = unique_item(item[key], index)
+    for key in ('linkedin_url', 'profile_url'):
+        if item.get(key):
+            item[key] = f"{item[key]}-{index}"
+    return item
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Keep the app's SQLite state out of backend/data and make `import app` work from any directory
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="extractor-tests-"))
+os.environ.setdefault("WATCHLIST_SCHEDULER", "false")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
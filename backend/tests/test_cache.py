@@ -0,0 +1,36 @@
+import json
+
+import app
+
+
+def page(size):
+    return {'data': [{'reactor': {'linkedin_url': f'https://www.linkedin.com/in/cache-{i}'}} for i in range(size)]}
+
+
+def test_the_lru_is_bounded_by_bytes_not_pages():
+    small = page(1)
+    large = page(100)
+    cache = app.ResponseCache(ttl_seconds=60, max_bytes=2 * len(json.dumps(large)) + 10 * len(json.dumps(small)), db_path='')
+
+    for number in range(1, 21):
+        cache.set(f'reactions:1:{number}', small)
+    assert cache.stats()['size'] == 20
+
+    # One large page fits beside the small ones; a second pushes out only the oldest ten to make room
+    cache.set('reactions:2:1', large)
+    assert cache.stats()['size'] == 21
+    cache.set('reactions:2:2', large)
+
+    assert cache.get('reactions:1:10') is None
+    assert cache.get('reactions:1:11') == small
+    assert cache.get('reactions:2:1') == large
+    assert cache.stats()['size_bytes'] <= cache.max_bytes
+
+
+def test_replacing_a_key_does_not_count_it_twice():
+    cache = app.ResponseCache(ttl_seconds=60, max_bytes=10_000, db_path='')
+
+    cache.set('comments:1:1', page(3))
+    cache.set('comments:1:1', page(3))
+
+    assert cache.stats()['size_bytes'] == len(json.dumps(page(3)))
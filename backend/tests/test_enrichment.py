@@ -0,0 +1,73 @@
+import app
+
+POST_URL = 'https://www.linkedin.com/feed/update/urn:li:activity:7100000000000000002/'
+
+
+class FakeUpstream:
+    """Answers profile lookups, remembering the lane each one was made on"""
+
+    def __init__(self):
+        self.lanes = []
+
+    def get(self, path, params=None, lane='interactive'):
+        self.lanes.append(lane)
+        return {'data': {'job_title': 'Founder', 'company': params['linkedin_url'].rsplit('/', 1)[-1]}}
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.jobs = []
+
+    def add_job(self, func, args=None, id=None):
+        self.jobs.append((func, args, id))
+
+
+def extract(monkeypatch, people):
+    """POST /api/extract with enrich for a post that people reacted to"""
+    profiles = app.extract_profiles_from_reactions([
+        {'reactor': {'linkedin_url': f'https://www.linkedin.com/in/enrich-{people}-{i}', 'name': f'Person {i}'}}
+        for i in range(people)
+    ])
+    result = {'profiles': app.deduplicate_profiles(profiles), 'reaction_count': people, 'comment_count': 0,
+              'errors': [], 'timings': {'reactions_ms': 0.0, 'comments_ms': 0.0, 'total_ms': 0.0}}
+    monkeypatch.setattr(app, 'fetch_post_engagement', lambda post_url: result)
+    return app.app.test_client().post('/api/extract', json={'post_url': POST_URL, 'enrich': True}).get_json()
+
+
+def test_small_audiences_are_enriched_inline_on_the_batch_lane(monkeypatch):
+    upstream = FakeUpstream()
+    monkeypatch.setattr(app, 'rapidapi_client', upstream)
+
+    body = extract(monkeypatch, 3)
+
+    assert body['enrichment'] == {'profiles': 3, 'cache': 0, 'upstream': 3, 'shared': 0, 'failed': 0, 'skipped': 0}
+    assert [p['enrichment']['company'] for p in body['data']['profiles']] == ['enrich-3-0', 'enrich-3-1', 'enrich-3-2']
+    assert upstream.lanes == ['batch'] * 3
+
+
+def test_large_audiences_are_enriched_by_a_queued_job(monkeypatch):
+    upstream = FakeUpstream()
+    scheduler = FakeScheduler()
+    monkeypatch.setattr(app, 'rapidapi_client', upstream)
+    monkeypatch.setattr(app, 'get_job_scheduler', lambda: scheduler)
+    people = app.ENRICHMENT_INLINE_MAX_LOOKUPS + 1
+
+    body = extract(monkeypatch, people)
+
+    job_id = body['enrichment']['job_id']
+    assert body['enrichment'] == {'status': 'queued', 'uncached': people, 'job_id': job_id,
+                                  'status_url': f'/api/jobs/{job_id}', 'results_url': f'/api/jobs/{job_id}/results'}
+    assert len(body['data']['profiles']) == people
+    assert upstream.lanes == []
+    assert scheduler.jobs == [(app.run_enrichment_job, [job_id], job_id)]
+    assert app.job_store.get(job_id)['post_urls'] == [POST_URL]
+    
+    # The job enriches the profiles already extracted; fetching the post again would fail
+    monkeypatch.setattr(app, 'fetch_post_engagement', None)
+    app.run_enrichment_job(job_id)
+    
+    results = app.app.test_client().get(f'/api/jobs/{job_id}/results').get_json()['data']
+    assert results['enrichment']['upstream'] == people
+    assert results['total_count'] == people
+    assert results['profiles'][0]['enrichment']['company'] == f'enrich-{people}-0'
+    assert upstream.lanes == ['batch'] * people
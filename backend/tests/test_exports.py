@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+
+import pytest
+
+import app
+
+
+def merged_profiles():
+    """Profiles as /api/extract returns them: someone who reacted twice and commented, and a reactor"""
+    reactions = app.extract_profiles_from_reactions([
+        {'reactor': {'linkedin_url': 'https://www.linkedin.com/in/both', 'name': 'Both'}, 'type': 'LIKE'},
+        {'reactor': {'linkedin_url': 'https://www.linkedin.com/in/both', 'name': 'Both'}, 'type': 'PRAISE'},
+        {'reactor': {'linkedin_url': 'https://www.linkedin.com/in/reactor', 'name': 'Reactor'}, 'type': 'EMPATHY'}
+    ])
+    comments = app.extract_profiles_from_comments([
+        {'profile_url': 'https://www.linkedin.com/in/both', 'name': 'Both', 'text': 'First, "quoted"'},
+        {'profile_url': 'https://www.linkedin.com/in/both', 'name': 'Both', 'text': 'Second'}
+    ])
+    return json.loads(app.app.json.dumps(app.profiles_to_dicts(app.deduplicate_profiles(reactions + comments))))
+
+
+def test_csv_export_keeps_every_engagement_of_a_merged_profile():
+    body = b''.join(app.iter_csv_chunks(merged_profiles())).decode('utf-8-sig')
+
+    rows = list(csv.reader(io.StringIO(body)))
+
+    assert rows == [
+        ['Profile URL', 'Name', 'Headline', 'Engagement Types', 'Reaction Types', 'Comments'],
+        ['https://www.linkedin.com/in/both', 'Both', '', 'reaction, comment', 'LIKE, PRAISE', 'First, "quoted"\nSecond'],
+        ['https://www.linkedin.com/in/reactor', 'Reactor', '', 'reaction', 'EMPATHY', '']
+    ]
+
+
+def test_ndjson_export_uses_the_merged_fields():
+    records = [json.loads(line) for line in b''.join(app.iter_ndjson_chunks(merged_profiles())).splitlines()]
+
+    assert records[0] == {
+        'profile_url': 'https://www.linkedin.com/in/both',
+        'name': 'Both',
+        'headline': '',
+        'engagement_types': ['reaction', 'comment'],
+        'reaction_types': ['LIKE', 'PRAISE'],
+        'comments': ['First, "quoted"', 'Second']
+    }
+    assert records[1]['comments'] == []
+
+
+def test_columnar_export_keeps_list_columns():
+    pyarrow = pytest.importorskip('pyarrow')
+
+    table = pyarrow.ipc.open_stream(b''.join(app.iter_columnar_chunks(merged_profiles(), 'arrow'))).read_all()
+
+    assert table.schema.field('reaction_types').type == pyarrow.list_(pyarrow.string())
+    assert table.column('comments').to_pylist() == [['First, "quoted"', 'Second'], []]
+
+
+def test_single_engagement_profiles_still_export():
+    profile = {'profile_url': 'https://www.linkedin.com/in/old', 'name': 'Old', 'engagement_type': 'comment',
+               'comment_text': 'Posted by an older client'}
+
+    assert app.export_values(profile) == ['https://www.linkedin.com/in/old', 'Old', '', 'comment', '', 'Posted by an older client']
@@ -0,0 +1,28 @@
+import app
+
+
+def test_render_handles_numeric_and_error_statuses_for_one_endpoint():
+    registry = app.MetricsRegistry()
+    registry.inc('extractor_upstream_requests_total', endpoint='get-post-reactions', status=200)
+    registry.inc('extractor_upstream_requests_total', endpoint='get-post-reactions', status='error')
+    registry.observe('extractor_upstream_request_duration_seconds', 0.2, endpoint='get-post-reactions', status=200)
+    registry.observe('extractor_upstream_request_duration_seconds', 30.0, endpoint='get-post-reactions', status='error')
+
+    text = registry.render()
+
+    assert 'extractor_upstream_requests_total{endpoint="get-post-reactions",status="200"} 1' in text
+    assert 'extractor_upstream_requests_total{endpoint="get-post-reactions",status="error"} 1' in text
+    assert 'extractor_upstream_request_duration_seconds_count{endpoint="get-post-reactions",status="error"} 1' in text
+
+
+def test_metrics_endpoint_survives_a_failed_upstream_call(monkeypatch):
+    monkeypatch.setattr(app, 'metrics', app.MetricsRegistry())
+    started = app.time.perf_counter()
+    client = app.RapidAPIClient(limiter=None)
+    client._record('get-post-comments', 200, started)
+    client._record('get-post-comments', 'error', started)
+
+    response = app.app.test_client().get('/api/metrics')
+
+    assert response.status_code == 200
+    assert b'status="error"' in response.data
@@ -0,0 +1,39 @@
+import app
+
+
+def test_reaction_items_with_different_fields_keep_their_data():
+    reactions = {'data': [
+        {'reactor': {'linkedin_url': 'https://www.linkedin.com/in/first', 'name': 'First'}, 'type': 'LIKE'},
+        {'reactor': {'linkedin_url': 'https://www.linkedin.com/in/second', 'name': 'Second', 'headline': 'CTO',
+                     'profile_picture': 'https://media.licdn.com/second.jpg'}, 'type': 'PRAISE'},
+        {'profile_url': 'third', 'full_name': 'Third', 'title': 'Founder', 'reaction_type': 'EMPATHY'},
+        {'reactor': 'not an object', 'linkedin_url': 'https://www.linkedin.com/in/fourth'},
+        {'reactor': {'name': 'No URL'}}
+    ]}
+
+    profiles = app.extract_profiles_from_reactions(reactions)
+
+    assert [(p.profile_url, p.name, p.headline, p.profile_picture, str(p.reaction_type.value)) for p in profiles] == [
+        ('https://www.linkedin.com/in/first', 'First', '', '', 'LIKE'),
+        ('https://www.linkedin.com/in/second', 'Second', 'CTO', 'https://media.licdn.com/second.jpg', 'PRAISE'),
+        ('https://www.linkedin.com/in/third', 'Third', 'Founder', '', 'EMPATHY'),
+        ('https://www.linkedin.com/in/fourth', '', '', '', 'LIKE')
+    ]
+
+
+def test_comment_items_with_different_fields_keep_their_data():
+    comments = [
+        {'profile_url': 'https://www.linkedin.com/in/first', 'name': 'First', 'text': 'Nice'},
+        {'commenter': {'profile_url': 'https://www.linkedin.com/in/second', 'name': 'Second', 'headline': 'VP'},
+         'comment': 'Agreed'},
+        {'author': {'linkedin_url': 'https://www.linkedin.com/in/third'}, 'commenter_name': 'Third',
+         'commenter_headline': 'Engineer', 'comment_text': 'Thanks'}
+    ]
+
+    profiles = app.extract_profiles_from_comments(comments)
+
+    assert [(p.profile_url, p.name, p.headline, p.comment_text, p.engagement_type) for p in profiles] == [
+        ('https://www.linkedin.com/in/first', 'First', '', 'Nice', 'comment'),
+        ('https://www.linkedin.com/in/second', 'Second', 'VP', 'Agreed', 'comment'),
+        ('https://www.linkedin.com/in/third', 'Third', 'Engineer', 'Thanks', 'comment')
+    ]
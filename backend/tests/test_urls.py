@@ -0,0 +1,45 @@
+import pytest
+
+import app
+
+ACTIVITY_ID = '7100000000000000001'
+NO_POST_ID = "Could not find a post ID in this LinkedIn URL. Please use the post's share link or activity URL."
+
+# (URL, post type, ID sent upstream or None)
+POST_URLS = [
+    (f'https://www.linkedin.com/feed/update/urn:li:activity:{ACTIVITY_ID}/', 'activity', ACTIVITY_ID),
+    (f'https://uk.linkedin.com/feed/update/urn%3Ali%3Aactivity%3A{ACTIVITY_ID}/?trk=public_post', 'activity', ACTIVITY_ID),
+    (f'https://www.linkedin.com/posts/jane-doe_growth-hiring-activity-{ACTIVITY_ID}-XyZ1?utm_source=share', 'activity', ACTIVITY_ID),
+    (f'https://www.linkedin.com/embed/feed/update/urn:li:activity:{ACTIVITY_ID}', 'activity', ACTIVITY_ID),
+    (f'https://www.linkedin.com/pulse/lessons-from-a-launch-{ACTIVITY_ID}', 'pulse', ACTIVITY_ID),
+    (f'https://www.linkedin.com/feed/update/urn:li:share:{ACTIVITY_ID}/', 'share', None),
+    (f'https://www.linkedin.com/embed/feed/update/urn:li:share:{ACTIVITY_ID}', 'share', None),
+    (f'https://www.linkedin.com/feed/update/urn%3Ali%3Ashare%3A{ACTIVITY_ID}/', 'share', None),
+    (f'https://www.linkedin.com/feed/update/urn:li:ugcPost:{ACTIVITY_ID}', 'ugcPost', None),
+    (f'https://www.linkedin.com/posts/acme-inc_launch-ugcPost-{ACTIVITY_ID}-abcd', 'ugcPost', None),
+]
+
+
+@pytest.mark.parametrize('url, post_type, activity_id', POST_URLS)
+def test_only_activity_ids_are_extracted(url, post_type, activity_id):
+    assert app.parse_linkedin_post_url(url).post_type == post_type
+    assert app.extract_post_id(url) == activity_id
+    assert app.validate_linkedin_post_url(url) == (
+        (True, 'Valid LinkedIn post URL') if activity_id else (False, NO_POST_ID)
+    )
+
+
+def test_share_and_ugcpost_urls_are_rejected_before_any_upstream_call():
+    client = app.app.test_client()
+
+    for url, _, activity_id in POST_URLS:
+        if activity_id is None:
+            response = client.post('/api/extract', json={'post_url': url})
+            assert response.status_code == 400
+            assert response.get_json() == {'success': False, 'error': NO_POST_ID}
+
+
+def test_non_post_urls_are_not_parsed():
+    assert app.parse_linkedin_post_url('https://www.linkedin.com/in/jane-doe/') is None
+    assert app.validate_linkedin_post_url('https://www.linkedin.com/company/acme/posts/')[0] is False
+    assert app.validate_linkedin_post_url('https://www.linkedin.com/posts/no-id-here')[1] == NO_POST_ID
@@ -0,0 +1,49 @@
+import pytest
+
+import app
+
+POST_URL = 'https://www.linkedin.com/feed/update/urn:li:activity:7100000000000000003/'
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {}
+        self.text = ''
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """Serves a 503 first, then pages of 10 reactions out of 100"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        if self.calls == 1:
+            return FakeResponse(503)
+        items = [{'reactor': {'linkedin_url': f"https://www.linkedin.com/in/watch-{params['page']}-{i}"}}
+                 for i in range(10)]
+        return FakeResponse(200, {'data': items, 'message': 'ok', 'total': 100})
+
+
+def test_every_page_and_retry_is_charged_and_paging_stops_when_the_allowance_is_spent(monkeypatch):
+    client = app.RapidAPIClient(limiter=None, backoff_base=0)
+    client.session = FakeSession()
+    monkeypatch.setattr(app, 'rapidapi_client', client)
+    monkeypatch.setattr(app, 'response_cache', app.ResponseCache(ttl_seconds=0))
+    allowance = app.RequestBudget('test-watchlist', 0).allowance(4)
+
+    pages = []
+    with pytest.raises(app.RapidAPIError, match='budget of 4 upstream requests per run used up'):
+        for page in app.get_post_reactions(POST_URL, prefetch=False, lane='batch', budget=allowance):
+            pages.append(page)
+
+    # The retried first page took two requests, leaving two for pages 2 and 3
+    assert [len(page) for page in pages] == [10, 10, 10]
+    assert client.session.calls == 4
+    assert allowance.remaining == 0
@@ -12,6 +12,8 @@ const CONFIG = {
 // State
 let currentProfiles = [];
 let currentFilter = 'all';
+const profilePositions = new Map();
+const profileRows = new Map();
 
 // DOM Elements
 const elements = {
@@ -82,7 +84,8 @@ async function handleFormSubmit(e) {
     hideResults();
     
     try {
-        const response = await fetch(`${CONFIG.API_BASE_URL}/extract`, {
+        // Profiles stream in as each upstream page is parsed, ending with a summary
+        const response = await fetch(`${CONFIG.API_BASE_URL}/extract/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -90,15 +93,22 @@ async function handleFormSubmit(e) {
             body: JSON.stringify({ post_url: postUrl })
         });
         
-        const data = await response.json();
-        
         if (!response.ok) {
+            const data = await response.json();
             throw new Error(data.error || 'Failed to extract engagement data');
         }
         
+        startStreamedResults();
+        const data = await readExtractStream(response, handleStreamEvent);
+        
+        if (!data) {
+            throw new Error('The connection closed before the extraction finished');
+        }
+        
         if (data.success) {
-            currentProfiles = data.data.profiles || [];
-            displayResults(data.data);
+            updateStat(elements.totalCount, data.data.total_count || 0);
+            updateStat(elements.reactionCount, data.data.reaction_count || 0);
+            updateStat(elements.commentCount, data.data.comment_count || 0);
             
             if (currentProfiles.length === 0) {
                 showMessage(data.message || 'No engagement data found for this post.', 'warning');
@@ -121,29 +131,112 @@ async function handleFormSubmit(e) {
 }
 
 /**
- * Display extraction results
+ * Read an NDJSON extraction stream, passing each event on; resolves with the summary or error event
  */
-function displayResults(data) {
-    const { profiles, total_count, reaction_count, comment_count } = data;
-    
-    // Update stats
-    updateStat(elements.totalCount, total_count || 0);
-    updateStat(elements.reactionCount, reaction_count || 0);
-    updateStat(elements.commentCount, comment_count || 0);
-    
-    // Show results section
+async function readExtractStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        for (const line of lines) {
+            if (!line.trim()) continue;
+            const event = JSON.parse(line);
+            if (event.type === 'summary' || event.type === 'error') {
+                return event;
+            }
+            onEvent(event);
+        }
+        
+        if (done) return null;
+    }
+}
+
+/**
+ * Show an empty results table that streamed profiles are added to
+ */
+function startStreamedResults() {
+    currentProfiles = [];
+    profilePositions.clear();
+    renderProfiles(currentProfiles);
     elements.resultsSection.style.display = 'block';
+}
+
+/**
+ * Apply one streamed event: new or updated profiles, or running counts
+ */
+function handleStreamEvent(event) {
+    if (event.type === 'profiles') {
+        upsertProfiles(event.profiles);
+    } else if (event.type === 'progress') {
+        setStat(elements.totalCount, event.unique_count);
+        setStat(elements.reactionCount, event.reaction_count);
+        setStat(elements.commentCount, event.comment_count);
+    }
+}
+
+/**
+ * Add new profiles to the table and replace the rows of profiles seen before
+ */
+function upsertProfiles(profiles) {
+    const visible = new Set(filterProfiles(profiles));
+    let added = 0;
+    
+    profiles.forEach(profile => {
+        const key = profileKey(profile);
+        const position = profilePositions.get(key);
+        
+        if (position === undefined) {
+            profilePositions.set(key, currentProfiles.length);
+            currentProfiles.push(profile);
+            if (visible.has(profile)) {
+                const row = createProfileRow(profile, added++);
+                profileRows.set(key, row);
+                elements.resultsBody.appendChild(row);
+            }
+            return;
+        }
+        
+        currentProfiles[position] = profile;
+        const row = profileRows.get(key);
+        if (row) {
+            const updated = createProfileRow(profile, 0);
+            updated.classList.remove('fade-in-row');
+            row.replaceWith(updated);
+            profileRows.set(key, updated);
+        }
+    });
     
-    // Render profiles
-    renderProfiles(profiles);
+    if (added) {
+        elements.emptyState.style.display = 'none';
+    }
+}
+
+/**
+ * Identity a streamed profile is upserted by
+ */
+function profileKey(profile) {
+    return profile.key || profile.profile_url;
+}
+
+/**
+ * Set a stat without animation (used while results stream in)
+ */
+function setStat(element, value) {
+    element.querySelector('.stat-value').textContent = value;
 }
 
 /**
- * Animate stat number update
+ * Animate stat number update from its current value
  */
 function updateStat(element, value) {
     const valueEl = element.querySelector('.stat-value');
-    animateNumber(valueEl, 0, value, 500);
+    animateNumber(valueEl, parseInt(valueEl.textContent, 10) || 0, value, 500);
 }
 
 /**
@@ -176,6 +269,7 @@ function animateNumber(element, start, end, duration) {
  */
 function renderProfiles(profiles) {
     elements.resultsBody.innerHTML = '';
+    profileRows.clear();
     
     const filteredProfiles = filterProfiles(profiles);
     
@@ -188,6 +282,7 @@ function renderProfiles(profiles) {
     
     filteredProfiles.forEach((profile, index) => {
         const row = createProfileRow(profile, index);
+        profileRows.set(profileKey(profile), row);
         elements.resultsBody.appendChild(row);
     });
 }
@@ -205,9 +300,17 @@ function createProfileRow(profile, index) {
         ? `<img src="${escapeHtml(profile.profile_picture)}" alt="${escapeHtml(profile.name)}" onerror="this.parentElement.innerHTML='${initials}'">`
         : initials;
     
-    const engagementIcon = profile.engagement_type === 'comment' 
-        ? '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M21 15a2 2 0 01-2 2H7l-4 4V5a2 2 0 012-2h14a2 2 0 012 2z"/></svg>'
-        : '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M14 9V5a3 3 0 00-3-3l-4 9v11h11.28a2 2 0 002-1.7l1.38-9a2 2 0 00-2-2.3zM7 22H4a2 2 0 01-2-2v-7a2 2 0 012-2h3"/></svg>';
+    const engagementIcons = {
+        comment: '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M21 15a2 2 0 01-2 2H7l-4 4V5a2 2 0 012-2h14a2 2 0 012 2z"/></svg>',
+        reaction: '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M14 9V5a3 3 0 00-3-3l-4 9v11h11.28a2 2 0 002-1.7l1.38-9a2 2 0 00-2-2.3zM7 22H4a2 2 0 01-2-2v-7a2 2 0 012-2h3"/></svg>'
+    };
+    
+    // One badge per way the person engaged, so someone who reacted and commented shows both
+    const badges = engagementTypes(profile).map(type => `
+            <span class="type-badge ${type}">
+                ${engagementIcons[type] || engagementIcons.reaction}
+                ${type === 'comment' ? 'Comment' : escapeHtml(reactionTypes(profile).join(', ')) || 'Like'}
+            </span>`).join('');
     
     row.innerHTML = `
         <td class="col-avatar">
@@ -225,11 +328,7 @@ function createProfileRow(profile, index) {
                 ${escapeHtml(profile.headline) || '-'}
             </div>
         </td>
-        <td class="col-type">
-            <span class="type-badge ${profile.engagement_type}">
-                ${engagementIcon}
-                ${profile.engagement_type === 'comment' ? 'Comment' : profile.reaction_type || 'Like'}
-            </span>
+        <td class="col-type">${badges}
         </td>
         <td class="col-actions">
             <div class="table-actions">
@@ -253,6 +352,27 @@ function createProfileRow(profile, index) {
     return row;
 }
 
+/**
+ * Every way a profile engaged; merged profiles list them all, older payloads only the first
+ */
+function engagementTypes(profile) {
+    return profile.engagement_types?.length ? profile.engagement_types : [profile.engagement_type || 'reaction'];
+}
+
+/**
+ * Every reaction type of a profile
+ */
+function reactionTypes(profile) {
+    return profile.reaction_types?.length ? profile.reaction_types : [profile.reaction_type].filter(Boolean);
+}
+
+/**
+ * Every comment text of a profile
+ */
+function profileComments(profile) {
+    return profile.comments?.length ? profile.comments : [profile.comment_text].filter(Boolean);
+}
+
 /**
  * Filter profiles based on search and filter type
  */
@@ -261,7 +381,7 @@ function filterProfiles(profiles) {
     
     return profiles.filter(profile => {
         // Filter by type
-        if (currentFilter !== 'all' && profile.engagement_type !== currentFilter) {
+        if (currentFilter !== 'all' && !engagementTypes(profile).includes(currentFilter)) {
             return false;
         }
         
@@ -271,7 +391,7 @@ function filterProfiles(profiles) {
                 profile.name,
                 profile.headline,
                 profile.profile_url,
-                profile.comment_text
+                ...profileComments(profile)
             ].filter(Boolean).join(' ').toLowerCase();
             
             return searchableText.includes(searchTerm);
@@ -344,14 +464,14 @@ async function handleDownloadCsv() {
  * Generate and download CSV on client side (fallback)
  */
 function downloadCsvClientSide() {
-    const headers = ['Profile URL', 'Name', 'Headline', 'Engagement Type', 'Reaction Type', 'Comment'];
+    const headers = ['Profile URL', 'Name', 'Headline', 'Engagement Types', 'Reaction Types', 'Comments'];
     const rows = currentProfiles.map(p => [
         p.profile_url || '',
         p.name || '',
         p.headline || '',
-        p.engagement_type || '',
-        p.reaction_type || '',
-        p.comment_text || ''
+        engagementTypes(p).join(', '),
+        reactionTypes(p).join(', '),
+        profileComments(p).join('\n')
     ]);
     
     const csvContent = [